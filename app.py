@@ -1,102 +1,214 @@
-from configuration.config import load_config
-from configuration.logger import setup_logger
-from sources.asana_to_csv import main as asana_main
-from sources.csv_to_csv import main as csv_main
-from clockify.csv_to_clockify import main as clockify_main
+from configuration.config import ConfigError
+from configuration.context import AppContext, build_context
+from configuration.periods import (
+    ChunkProgress, config_periods, is_range_mode, period_id, range_key, with_period
+)
+from sources.task_records import partition_by_client
+from sources.task_store import open_task_store
+from configuration.metrics import export_metrics
 
 import logging
-import os
-from typing import Dict
-import csv
+import time
+from dataclasses import replace
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
 
-def process_source(source: Dict, config: Dict, output_file: str) -> bool:
-    """Procesa una fuente específica y agrega las tareas al archivo de salida."""
-    logger = logging.getLogger('clockify_automation')
+def process_source(source: Mapping, ctx: AppContext) -> Optional[List[Dict]]:
+    """Procesa una fuente específica y devuelve sus tareas. None si hubo un error."""
+    logger = ctx.logger
     source_type = source.get('type', '').lower()
-    
+
     if not source.get('enabled', False):
         logger.info(f"Fuente {source_type} deshabilitada, saltando...")
-        return True
+        return []
 
     logger.info(f"Procesando fuente: {source_type}")
 
     try:
-        if source_type == 'asana':
-            result = asana_main(output_file)
-            return result
-            
-        elif source_type == 'csv':
-            result = csv_main(output_file)
-            return result
-            
-        else:
-            logger.error(f"Tipo de fuente no soportado: {source_type}")
-            return False
-            
+        # Cada fuente importa su módulo (y el SDK de Asana) solo si está habilitada
+        with ctx.metrics.stage(f'extract_{source_type}'):
+            if source_type == 'asana':
+                from sources.asana_to_csv import extract_tasks as asana_extract
+                tasks = asana_extract(ctx)
+
+            elif source_type == 'csv':
+                from sources.csv_to_csv import read_source as csv_read_source
+                tasks = csv_read_source(source, ctx.config['time'])
+
+            else:
+                logger.error(f"Tipo de fuente no soportado: {source_type}")
+                return None
+
+        if tasks is not None:
+            ctx.metrics.inc('extracted_tasks_total', len(tasks), help="Tareas extraídas por fuente",
+                            source=source_type)
+        return tasks
+
     except Exception as e:
         logger.error(f"Error procesando fuente {source_type}: {str(e)}", exc_info=True)
+        return None
+
+def run_source(source: Mapping, ctx: AppContext) -> Dict:
+    """Ejecuta una fuente y mide su duración."""
+    started = time.monotonic()
+    tasks = process_source(source, ctx)
+    return {
+        'type': source.get('type', ''),
+        'tasks': tasks,
+        'elapsed': time.monotonic() - started
+    }
+
+def extract_sources(sources: List[Mapping], ctx: AppContext, max_workers: Optional[int] = None) -> Tuple[List[Dict], bool]:
+    """
+    Extrae todas las fuentes en paralelo y une sus tareas en el orden configurado,
+    así el resultado no depende de qué fuente termina primero.
+    """
+    logger = ctx.logger
+    enabled = [source for source in sources if source.get('enabled', False)]
+    for source in sources:
+        if not source.get('enabled', False):
+            logger.info(f"Fuente {source.get('type', '').lower()} deshabilitada, saltando...")
+    if not enabled:
+        return [], True
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max_workers or len(enabled)) as executor:
+        results = list(executor.map(lambda source: run_source(source, ctx), enabled))
+    elapsed = time.monotonic() - started
+
+    tasks = []
+    success = True
+    for result in results:
+        if result['tasks'] is None:
+            success = False
+            logger.error(f"Error procesando fuente: {result['type']} ({result['elapsed']:.2f}s)")
+            continue
+        logger.info(f"Fuente {result['type']}: {len(result['tasks'])} tareas en {result['elapsed']:.2f}s")
+        tasks.extend(result['tasks'])
+
+    logger.info(f"Extracción de {len(enabled)} fuentes completada en {elapsed:.2f}s")
+    return tasks, success
+
+def extract_period(ctx: AppContext, sources: List[Mapping], append_debug: bool = False) -> Tuple[List[Dict], bool]:
+    """Extrae las tareas de un tramo y las guarda en el store intermedio si está configurado."""
+    config = ctx.config
+    logger = ctx.logger
+
+    tasks, success = extract_sources(sources, ctx, config['execution'].get('source_workers'))
+
+    if not success:
+        logger.error("Hubo errores procesando algunas fuentes")
+        return tasks, False
+
+    # Verificar si se generaron tareas
+    if not tasks:
+        logger.warning("No se generaron tareas para procesar")
+        return tasks, True
+
+    # El store intermedio (SQLite o CSV) solo se escribe si se configura
+    store_path = config['execution'].get('task_store') or config['execution'].get('debug_csv')
+    if store_path:
+        task_store = open_task_store(store_path)
+        try:
+            written = task_store.write(tasks, append=append_debug, period=config['time'])
+        finally:
+            task_store.close()
+        logger.info(f"Se guardaron {written} tareas en {store_path}")
+    return tasks, True
+
+def run_period(ctx: AppContext, sources: List[Mapping], append_debug: bool = False) -> bool:
+    """Extrae, planifica y envía un tramo de fechas. True si terminó sin errores."""
+    tasks, success = extract_period(ctx, sources, append_debug)
+    if not success or not tasks:
+        return success
+
+    # Ejecutar csv_to_clockify
+    from clockify.csv_to_clockify import main as clockify_main
+    logger = ctx.logger
+    logger.info("Iniciando procesamiento de tareas en Clockify")
+    return clockify_main(partition_by_client(tasks), ctx=ctx)
+
+def run_periods(ctx: AppContext, run_one: Callable[[AppContext, int], bool]) -> bool:
+    """
+    Recorre los tramos configurados: salta los ya completados, ejecuta
+    `run_one(period_ctx, index)` en cada uno y, fuera del dry run, marca los
+    que terminan bien. Se corta en el primer tramo con errores.
+    """
+    config = ctx.config
+    logger = ctx.logger
+
+    # Un solo tramo en el modo clásico; en modo rango, un tramo por mes o semana
+    periods = config_periods(config)
+    progress = None
+    key = range_key(config)
+    if is_range_mode(config['time']):
+        progress = ChunkProgress(config['execution'].get('chunk_progress_file', 'chunk_progress.json'))
+        logger.info(f"Modo rango {key}: {len(periods)} tramos")
+
+    for index, period in enumerate(periods):
+        current = period_id(period)
+        if progress is not None and progress.is_done(key, period):
+            logger.info(f"Tramo {current} ya completado, saltando...")
+            continue
+
+        if len(periods) > 1:
+            logger.info(f"Procesando tramo {current} ({index + 1}/{len(periods)})")
+        # Cada tramo trabaja con su propia sección time; las tareas de un
+        # tramo se liberan antes de pasar al siguiente
+        period_ctx = replace(ctx, config=with_period(config, period))
+        with ctx.metrics.stage('period'):
+            period_ok = run_one(period_ctx, index)
+        if not period_ok:
+            logger.error(f"El tramo {current} terminó con errores; la próxima ejecución lo retoma desde aquí")
+            return False
+
+        # Un dry run no envía nada: marcarlo haría que el envío real saltara el tramo
+        if progress is not None and not config['execution'].get('dry_run', True):
+            progress.mark_done(key, period)
+    return True
+
+def run_pipeline(ctx: AppContext) -> bool:
+    """Ejecuta extracción, planificación y envío para todos los tramos configurados."""
+    config = ctx.config
+    logger = ctx.logger
+
+    # Procesar cada fuente
+    sources = config['execution'].get('sources', [])
+    if not sources:
+        logger.warning("No se encontraron fuentes configuradas")
         return False
 
-def create_output_file(output_file: str) -> bool:
-    """Crea el archivo de salida con los encabezados."""
-    logger = logging.getLogger('clockify_automation')
-    try:
-        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Cliente', 'Tarea', 'Dia']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            logger.info(f"Archivo {output_file} creado exitosamente")
-        return True
-    except Exception as e:
-        logger.error(f"Error creando archivo {output_file}: {str(e)}")
+    if not run_periods(ctx, lambda period_ctx, index: run_period(period_ctx, sources, append_debug=index > 0)):
         return False
 
+    logger.info("Proceso completado exitosamente")
+    return True
+
+def run_with_metrics(ctx: AppContext) -> bool:
+    """Ejecuta el pipeline midiendo la ejecución completa y exporta las métricas al terminar."""
+    success = False
+    started = time.time()
+    try:
+        with ctx.metrics.stage('run'):
+            success = run_pipeline(ctx)
+        return success
+    finally:
+        ctx.metrics.set_gauge('last_run_timestamp_seconds', started, help="Inicio de la última ejecución")
+        ctx.metrics.set_gauge('last_run_success', int(success), help="1 si la última ejecución terminó sin errores")
+        export_metrics(ctx.metrics, ctx.config)
+
 def main():
+    logger = logging.getLogger('clockify_automation')
     try:
-        # Cargar configuración
-        config = load_config()
-        logger = setup_logger(config)
-        logger.info("Iniciando orquestador de tareas")
-
-        # Crear archivo de salida
-        output_file = 'horarios.csv'
-        if os.path.exists(output_file):
-            os.remove(output_file)
-            logger.debug(f"Archivo anterior {output_file} eliminado")
-        
-        if not create_output_file(output_file):
-            logger.error("No se pudo crear el archivo de salida")
-            return
-
-        # Procesar cada fuente
-        sources = config['execution'].get('sources', [])
-        if not sources:
-            logger.warning("No se encontraron fuentes configuradas")
-            return
-
-        success = True
-        for source in sources:
-            if not process_source(source, config, output_file):
-                success = False
-                logger.error(f"Error procesando fuente: {source.get('type')}")
-
-        if not success:
-            logger.error("Hubo errores procesando algunas fuentes")
-            return
-
-        # Verificar si se generaron tareas
-        if os.path.getsize(output_file) <= len('Cliente,Tarea,Dia\n'):
-            logger.error("No se generaron tareas para procesar")
-            return
-
-        # Ejecutar csv_to_clockify
-        logger.info("Iniciando procesamiento de tareas en Clockify")
-        clockify_main()
-
-        logger.info("Proceso completado exitosamente")
+        # Cargar y validar la configuración antes de tocar la red
+        ctx = build_context()
+        ctx.logger.info("Iniciando orquestador de tareas")
+        run_with_metrics(ctx)
 
+    except ConfigError as e:
+        logger.error(str(e))
     except Exception as e:
         logger.error(f"Error en el orquestador: {str(e)}", exc_info=True)
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
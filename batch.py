@@ -0,0 +1,159 @@
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+
+import yaml
+
+from configuration.config import load_config, merge_config, validate_config, ConfigError
+
+# Limitador compartido que recibe cada proceso al arrancar
+_worker_bucket = None
+
+def load_roster(roster_file: str) -> Dict:
+    """Lee el roster de usuarios (YAML)."""
+    with open(roster_file, 'r') as f:
+        return yaml.safe_load(f) or {}
+
+def user_config(roster: Dict, user: Dict, work_dir: str) -> Dict:
+    """
+    Configuración completa de un usuario: su propio archivo o la configuración
+    compartida, más sus overrides. Los archivos de estado (journal, cache, log,
+    salidas del dry run...) van a una carpeta propia salvo que los overrides
+    del usuario los fijen.
+    """
+    if user.get('config'):
+        config = load_config(user['config'])
+    else:
+        config = load_config(roster.get('base_config', 'files/config.yaml'))
+
+    user_dir = os.path.join(work_dir, user['name'])
+    isolated = {
+        'execution': {
+            'journal_file': os.path.join(user_dir, 'submission_journal.jsonl'),
+            'dead_letter_file': os.path.join(user_dir, 'dead_letter.jsonl'),
+            'chunk_progress_file': os.path.join(user_dir, 'chunk_progress.json'),
+            'ledger_file': os.path.join(user_dir, 'ledger.db'),
+            'output_dir': user_dir,
+            'metrics': {
+                'json_file': os.path.join(user_dir, 'metrics.json'),
+                'labels': {'user': user['name']}
+            },
+            'logging': {
+                'console_level': 'WARNING',
+                'file_name': os.path.join(user_dir, 'clockify_automation.log')
+            }
+        },
+        'clockify': {'cache_file': os.path.join(user_dir, 'clockify_cache.json')},
+        'asana': {'store_file': os.path.join(user_dir, 'asana_store.json')}
+    }
+    # Un .prom por usuario en la misma carpeta del textfile collector
+    prometheus_file = ((config.get('execution') or {}).get('metrics') or {}).get('prometheus_file')
+    if prometheus_file:
+        stem, extension = os.path.splitext(prometheus_file)
+        isolated['execution']['metrics']['prometheus_file'] = f"{stem}_{user['name']}{extension or '.prom'}"
+    config = merge_config(config, isolated)
+    # Lo que el usuario haya fijado explícitamente tiene prioridad
+    return merge_config(config, user.get('overrides') or {})
+
+def _init_worker(bucket):
+    global _worker_bucket
+    _worker_bucket = bucket
+
+def run_user(name: str, config: Dict) -> Dict:
+    """Ejecuta el pipeline completo de un usuario dentro de un proceso del pool."""
+    from app import run_with_metrics
+    from configuration.context import build_context
+    from configuration.logger import stop_logging
+
+    started = time.monotonic()
+    result = {'user': name, 'ok': False, 'error': None,
+              'log_file': config['execution']['logging']['file_name']}
+    try:
+        ctx = build_context(config_file=f"<batch:{name}>", config=config, bucket=_worker_bucket)
+        ctx.logger.info(f"Iniciando orquestador de tareas para {name}")
+        result['ok'] = run_with_metrics(ctx)
+    except Exception as e:
+        logging.getLogger('clockify_automation').error(f"Error en el usuario {name}: {str(e)}", exc_info=True)
+        result['error'] = str(e)
+    finally:
+        # El proceso del pool sigue vivo: vaciar la cola de logs antes de devolver el resultado
+        stop_logging()
+    result['elapsed'] = time.monotonic() - started
+    return result
+
+def run_batch(roster_file: str, max_processes: Optional[int] = None) -> List[Dict]:
+    """
+    Corre el pipeline de cada usuario del roster en un pool de procesos, con un
+    único límite de envíos a Clockify compartido por todos.
+    """
+    from clockify.rate_limit import SharedTokenBucket, DEFAULT_RATE_LIMIT
+
+    logger = logging.getLogger('clockify_automation')
+    roster = load_roster(roster_file)
+    work_dir = roster.get('work_dir', 'batch')
+    users = roster.get('users') or []
+
+    # Validar a todos antes de lanzar nada
+    configs = []
+    errors = []
+    for index, user in enumerate(users):
+        if not user.get('name'):
+            errors.append(f"Falta 'users[{index}].name' en el roster")
+            continue
+        config = user_config(roster, user, work_dir)
+        errors.extend(f"{user['name']}: {error}" for error in validate_config(config))
+        configs.append((user['name'], config))
+    if errors:
+        raise ConfigError(errors)
+
+    for name, _ in configs:
+        os.makedirs(os.path.join(work_dir, name), exist_ok=True)
+
+    bucket = SharedTokenBucket(roster.get('rate_limit', DEFAULT_RATE_LIMIT))
+    processes = max_processes or roster.get('max_processes') or os.cpu_count()
+    logger.info(f"Procesando {len(configs)} usuarios con {processes} procesos")
+
+    started = time.monotonic()
+    with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(bucket,)) as executor:
+        futures = [executor.submit(run_user, name, config) for name, config in configs]
+        results = [future.result() for future in futures]
+    elapsed = time.monotonic() - started
+
+    for result in results:
+        status = "OK" if result['ok'] else "ERROR"
+        logger.info(f"{result['user']}: {status} en {result['elapsed']:.2f}s (log: {result['log_file']})")
+    failed = sum(1 for result in results if not result['ok'])
+    logger.info(f"Batch completado en {elapsed:.2f}s: {len(results) - failed} usuarios OK, {failed} con errores")
+
+    results_file = os.path.join(work_dir, 'batch_results.json')
+    with open(results_file, 'w', encoding='utf-8') as f:
+        json.dump({'elapsed': elapsed, 'results': results}, f, ensure_ascii=False, indent=2)
+    logger.info(f"Resultados guardados en {results_file}")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Carga horas de varios usuarios en paralelo")
+    parser.add_argument('roster', nargs='?', default='files/roster.yaml', help="Archivo YAML con los usuarios")
+    parser.add_argument('--processes', type=int, default=None, help="Cantidad de procesos (default: roster o CPUs)")
+    args = parser.parse_args()
+
+    logger = logging.getLogger('clockify_automation')
+    logger.setLevel(logging.INFO)
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(levelname)s: %(message)s'))
+    logger.handlers = [handler]
+
+    try:
+        results = run_batch(args.roster, args.processes)
+    except ConfigError as e:
+        logger.error(str(e))
+        raise SystemExit(1)
+    if not all(result['ok'] for result in results):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
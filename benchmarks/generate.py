@@ -0,0 +1,112 @@
+"""
+Generador de cargas sintéticas para los benchmarks: N clientes × M tareas
+por día × D días, en formato horarios.csv, CSV de fuente y payloads tipo Asana.
+"""
+import argparse
+import csv
+import datetime
+import random
+from typing import Dict, List
+
+from sources.task_records import write_tasks_csv
+
+def make_clients(n_clients: int, seed: int = 0) -> List[Dict]:
+    """Clientes como en workspace.clients, con una o dos daily meetings cada uno."""
+    rng = random.Random(seed)
+    clients = []
+    for index in range(n_clients):
+        start_time = rng.choice([8, 8.5, 9, 9.5])
+        meetings = [{'description': 'Daily Scrum', 'start_time': 10, 'end_time': 10.25}]
+        if rng.random() < 0.5:
+            meetings.append({'description': 'Sync', 'start_time': 15, 'end_time': 15.5})
+        clients.append({
+            'name': f'cliente-{index:03d}',
+            'project': f'Proyecto {index:03d}',
+            'task': 'Desarrollo',
+            'start_time': start_time,
+            'end_time': start_time + 9,
+            'daily_meetings': meetings
+        })
+    return clients
+
+def make_time_config(n_days: int, year: int = 2025, month: int = 3) -> Dict:
+    """Sección time para los primeros `n_days` días del mes (máximo el mes completo)."""
+    last_day = (datetime.date(year, month % 12 + 1, 1) if month < 12 else datetime.date(year + 1, 1, 1)) \
+        - datetime.timedelta(days=1)
+    return {
+        'year': year,
+        'month': month,
+        'start_day': 1,
+        'end_day': min(n_days, last_day.day),
+        'lunch_start': 12.5,
+        'lunch_end': 13.5
+    }
+
+def make_tasks(clients: List[Dict], tasks_per_day: int, time_config: Dict) -> List[Dict]:
+    """Tareas en formato horarios.csv (Cliente, Tarea, Dia)."""
+    return [
+        {'Cliente': client['name'], 'Tarea': f"Tarea {day}-{index} de {client['name']}", 'Dia': day}
+        for client in clients
+        for day in range(time_config['start_day'], time_config['end_day'] + 1)
+        for index in range(tasks_per_day)
+    ]
+
+# Mapeo de fuente CSV que corresponde a write_source_csv
+SOURCE_MAPPING = {
+    'client': {'type': 'column', 'value': 'Cliente'},
+    'task': {'type': 'column', 'value': 'Descripcion'},
+    'day': {'type': 'column', 'value': 'Fecha'}
+}
+
+def write_source_csv(path: str, tasks: List[Dict], time_config: Dict) -> int:
+    """CSV de fuente manual (con columnas extra y fechas completas), para csv_to_csv."""
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['Fecha', 'Cliente', 'Descripcion', 'Horas', 'Notas'])
+        for task in tasks:
+            date = datetime.date(time_config['year'], time_config['month'], task['Dia'])
+            writer.writerow([date.isoformat(), task['Cliente'], task['Tarea'], '1', 'generado'])
+    return len(tasks)
+
+def make_asana_payloads(clients: List[Dict], n_tasks: int, time_config: Dict, seed: int = 0) -> List[Dict]:
+    """Tareas crudas como las devuelve TasksApi.get_tasks, con status, cliente y proyecto."""
+    rng = random.Random(seed)
+    first = datetime.datetime(time_config['year'], time_config['month'], time_config['start_day'])
+    span = time_config['end_day'] - time_config['start_day']
+    payloads = []
+    for index in range(n_tasks):
+        client = clients[index % len(clients)]
+        start = first + datetime.timedelta(days=rng.randint(0, span))
+        end = start + datetime.timedelta(days=rng.randint(0, 3), hours=rng.randint(0, 8))
+        completed = rng.random() < 0.6
+        payloads.append({
+            'gid': str(1000000 + index),
+            'name': f'Tarea Asana {index}',
+            'completed': completed,
+            'completed_at': end.isoformat() + '.000Z' if completed else None,
+            'due_on': end.date().isoformat() if rng.random() < 0.5 else None,
+            'start_on': start.date().isoformat() if rng.random() < 0.7 else None,
+            'modified_at': end.isoformat() + '.000Z',
+            'custom_fields': [
+                {'name': 'Status', 'display_value': 'Completed' if completed else 'In Progress'},
+                {'name': 'Cliente', 'display_value': client['name'] if rng.random() < 0.5 else None}
+            ],
+            'projects': [{'name': f"{client['name']} - Web"}]
+        })
+    return payloads
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera un horarios.csv sintético")
+    parser.add_argument('--clients', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=4, help="Tareas por cliente y día")
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--output', default='horarios_sintetico.csv')
+    args = parser.parse_args()
+
+    time_config = make_time_config(args.days)
+    tasks = make_tasks(make_clients(args.clients), args.tasks, time_config)
+    write_tasks_csv(tasks, args.output)
+    print(f"{len(tasks)} tareas escritas en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Suite de benchmarks del pipeline extract→schedule→submit con datos
+sintéticos. Escribe los resultados en JSON para comparar versiones:
+
+    python -m benchmarks.run --clients 10 --tasks 5 --days 28 --output bench.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.generate import (
+    SOURCE_MAPPING, make_asana_payloads, make_clients, make_tasks, make_time_config, write_source_csv
+)
+from benchmarks.standin import StandInClockifyClient
+from benchmarks.standin_server import StandInState, start_server
+from clockify import csv_to_clockify
+from clockify.clockify_api import ClockifyClient, set_default_client
+from clockify.submission import submit_time_entries
+from clockify.time_utils import hours_to_minutes
+from sources.asana_to_csv import AsanaTaskExtractor, ClientMatcher, _compact_task
+from sources.csv_to_csv import process_csv_tasks
+
+def measure(func: Callable[[], int], repeat: int, setup: Optional[Callable[[], None]] = None) -> Dict:
+    """Corre `func` `repeat` veces; `func` devuelve la cantidad de ítems procesados."""
+    timings = []
+    items = 0
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        items = func()
+        timings.append(time.perf_counter() - started)
+    best = min(timings)
+    return {
+        'runs': timings,
+        'min': best,
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+        'items': items,
+        'items_per_second': items / best if best else None
+    }
+
+def _clear_scheduler_caches():
+    csv_to_clockify._block_template.cache_clear()
+    csv_to_clockify._meeting_index.cache_clear()
+
+def bench_available_blocks(clients: List[Dict], time_config: Dict, repeat: int) -> Dict:
+    lunch_start = hours_to_minutes(time_config['lunch_start'])
+    lunch_end = hours_to_minutes(time_config['lunch_end'])
+
+    def run() -> int:
+        count = 0
+        for client in clients:
+            start_time = hours_to_minutes(client['start_time'])
+            end_time = hours_to_minutes(client['end_time'])
+            for day in range(time_config['start_day'], time_config['end_day'] + 1):
+                csv_to_clockify.get_available_blocks(day, start_time, end_time, lunch_start, lunch_end,
+                                                     client, time_config['year'], time_config['month'])
+                count += 1
+        return count
+
+    return measure(run, repeat, _clear_scheduler_caches)
+
+def bench_scheduler(engine: str, clients: List[Dict], tasks: List[Dict], time_config: Dict, repeat: int) -> Dict:
+    schedule_entries = csv_to_clockify.get_scheduler(engine)
+    tasks_by_client = {}
+    for task in tasks:
+        tasks_by_client.setdefault(task['Cliente'].lower(), []).append(task)
+
+    def run() -> int:
+        count = 0
+        for client in clients:
+            count += len(schedule_entries(
+                entries_wo_time=tasks_by_client.get(client['name'].lower(), []),
+                workspace_id='ws-bench',
+                year=time_config['year'],
+                month=time_config['month'],
+                start_day=time_config['start_day'],
+                end_day=time_config['end_day'],
+                start_time=hours_to_minutes(client['start_time']),
+                end_time=hours_to_minutes(client['end_time']),
+                lunch_start=hours_to_minutes(time_config['lunch_start']),
+                lunch_end=hours_to_minutes(time_config['lunch_end']),
+                client=client
+            ))
+        return count
+
+    return measure(run, repeat, _clear_scheduler_caches)
+
+def bench_process_csv(tasks: List[Dict], time_config: Dict, work_dir: str, repeat: int,
+                      engine: str = 'csv') -> Dict:
+    source_file = os.path.join(work_dir, 'fuente.csv')
+    output_file = os.path.join(work_dir, 'horarios.csv')
+    rows = write_source_csv(source_file, tasks, time_config)
+
+    def setup():
+        open(output_file, 'w').close()
+
+    def run() -> int:
+        process_csv_tasks(source_file, output_file, SOURCE_MAPPING, engine=engine)
+        return rows
+
+    result = measure(run, repeat, setup)
+    result['bytes'] = os.path.getsize(source_file)
+    return result
+
+def bench_asana_normalization(clients: List[Dict], payloads: List[Dict], time_config: Dict, repeat: int) -> Dict:
+    extractor = AsanaTaskExtractor('benchmark')
+    matcher = ClientMatcher(clients)
+    start_date = datetime.datetime(time_config['year'], time_config['month'], time_config['start_day'])
+    end_date = datetime.datetime(time_config['year'], time_config['month'], time_config['end_day'])
+
+    def run() -> int:
+        extractor.normalize_tasks((_compact_task(task) for task in payloads), start_date, end_date, matcher)
+        return len(payloads)
+
+    return measure(run, repeat)
+
+def bench_submission(entries: List[Dict], client: StandInClockifyClient, repeat: int,
+                     max_workers: int, rate_limit: float) -> Dict:
+    def run() -> int:
+        results = submit_time_entries('ws-bench', entries, client=client, max_workers=max_workers)
+        return sum(1 for result in results if result['ok'])
+
+    result = measure(run, repeat)
+    result.update({'latency': client.latency, 'max_workers': max_workers, 'rate_limit': rate_limit})
+    return result
+
+def bench_submission_http(entries: List[Dict], clients: List[Dict], repeat: int, max_workers: int,
+                          rate_limit: float, latency: float, server_rate_limit: Optional[float],
+                          error_rate: float) -> Dict:
+    """Envío con el ClockifyClient real contra el stand-in HTTP local (sesión, reintentos y Retry-After)."""
+    state = StandInState('Benchmark', clients)
+    server = start_server(state, latency=latency, rate_limit=server_rate_limit, error_rate=error_rate, seed=0)
+    client = ClockifyClient('benchmark', api_url=f'{server.base_url}/api/v1', global_api_url=server.base_url,
+                            pool_maxsize=max_workers, backoff_base=0.05, backoff_max=1, cache_file=None,
+                            rate_limit=rate_limit)
+    workspace_id = state.workspace['id']
+    try:
+        result = measure(lambda: sum(1 for result in submit_time_entries(
+            workspace_id, entries, client=client, max_workers=max_workers
+        ) if result['ok']), repeat)
+    finally:
+        client.close()
+        server.shutdown()
+        server.server_close()
+    result.update({'latency': latency, 'max_workers': max_workers, 'rate_limit': rate_limit,
+                   'server_rate_limit': server_rate_limit, 'error_rate': error_rate,
+                   'responses': dict(server.stats)})
+    return result
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(n_clients: int, tasks_per_day: int, n_days: int, repeat: int = 3, asana_tasks: int = 2000,
+              submit_entries: int = 500, latency: float = 0.01, max_workers: int = 8,
+              rate_limit: float = 1000, http: bool = False, server_rate_limit: Optional[float] = None,
+              error_rate: float = 0.0) -> Dict:
+    """
+    Corre todos los benchmarks y devuelve un dict listo para serializar en JSON.
+    Con `http` también mide el envío por HTTP contra el stand-in local.
+    """
+    clients = make_clients(n_clients)
+    time_config = make_time_config(n_days)
+    tasks = make_tasks(clients, tasks_per_day, time_config)
+    payloads = make_asana_payloads(clients, asana_tasks, time_config)
+
+    # Los lookups de IDs del scheduler van a un cliente en memoria, sin latencia
+    set_default_client(StandInClockifyClient(clients))
+
+    results = {}
+    results['get_available_blocks'] = bench_available_blocks(clients, time_config, repeat)
+    results['dummy_to_time_entries'] = bench_scheduler('python', clients, tasks, time_config, repeat)
+    try:
+        results['dummy_to_time_entries_pandas'] = bench_scheduler('pandas', clients, tasks, time_config, repeat)
+    except ImportError:
+        results['dummy_to_time_entries_pandas'] = None
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        results['process_csv_tasks'] = bench_process_csv(tasks, time_config, work_dir, repeat)
+
+    results['asana_normalization'] = bench_asana_normalization(clients, payloads, time_config, repeat)
+
+    # Envío contra el stand-in con latencia simulada
+    client_config = clients[0]
+    entries = csv_to_clockify.get_scheduler('python')(
+        entries_wo_time=[task for task in tasks if task['Cliente'] == client_config['name']],
+        workspace_id='ws-bench', year=time_config['year'], month=time_config['month'],
+        start_day=time_config['start_day'], end_day=time_config['end_day'],
+        start_time=hours_to_minutes(client_config['start_time']),
+        end_time=hours_to_minutes(client_config['end_time']),
+        lunch_start=hours_to_minutes(time_config['lunch_start']),
+        lunch_end=hours_to_minutes(time_config['lunch_end']),
+        client=client_config
+    )
+    entries = (entries * (submit_entries // max(1, len(entries)) + 1))[:submit_entries]
+    results['submit_time_entries'] = bench_submission(
+        entries, StandInClockifyClient(clients, latency=latency, rate_limit=rate_limit), repeat, max_workers, rate_limit
+    )
+    if http:
+        results['submit_time_entries_http'] = bench_submission_http(
+            entries, clients, repeat, max_workers, rate_limit, latency, server_rate_limit, error_rate
+        )
+    set_default_client(None)
+
+    return {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {
+            'clients': n_clients, 'tasks_per_day': tasks_per_day, 'days': time_config['end_day'],
+            'repeat': repeat, 'asana_tasks': asana_tasks, 'submit_entries': submit_entries,
+            'latency': latency, 'max_workers': max_workers, 'rate_limit': rate_limit,
+            'http': http, 'server_rate_limit': server_rate_limit, 'error_rate': error_rate
+        },
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline con datos sintéticos")
+    parser.add_argument('--clients', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=5, help="Tareas por cliente y día")
+    parser.add_argument('--days', type=int, default=28)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--asana-tasks', type=int, default=2000)
+    parser.add_argument('--submit-entries', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.01, help="Latencia simulada por request (s)")
+    parser.add_argument('--max-workers', type=int, default=8)
+    parser.add_argument('--rate-limit', type=float, default=1000)
+    parser.add_argument('--http', action='store_true', help="Mide también el envío contra el stand-in HTTP")
+    parser.add_argument('--server-rate-limit', type=float, default=None,
+                        help="Requests por segundo que acepta el stand-in antes de responder 429")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probabilidad de 503 en el stand-in")
+    parser.add_argument('--output', default='bench_results.json')
+    args = parser.parse_args()
+
+    # Los benchmarks no deben medir el logging
+    logging.getLogger('clockify_automation').setLevel(logging.WARNING)
+
+    report = run_suite(args.clients, args.tasks, args.days, args.repeat, args.asana_tasks,
+                       args.submit_entries, args.latency, args.max_workers, args.rate_limit,
+                       args.http, args.server_rate_limit, args.error_rate)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in report['results'].items():
+        if result is None:
+            print(f"{name:32s} (no disponible)")
+            continue
+        print(f"{name:32s} {result['min'] * 1000:10.1f} ms  {result['items']:8d} ítems")
+    print(f"Resultados guardados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Cliente de Clockify en memoria para medir el pipeline sin tocar la API real."""
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from clockify.rate_limit import TokenBucket
+
+class StandInClockifyClient:
+    """
+    Implementa los métodos de ClockifyClient que usan el scheduler, la cache de
+    metadatos y el envío. `latency` simula el tiempo de respuesta de cada request
+    y `rate_limit`, igual que en ClockifyClient, limita todas las requests.
+    """
+
+    def __init__(self, clients: List[Dict], workspace_name: str = 'Benchmark', latency: float = 0.0,
+                 rate_limit: Optional[float] = None):
+        self.latency = latency
+        self.bucket = TokenBucket(rate_limit) if rate_limit else None
+        self.cache_ttl = 0
+        self.cache_file = None
+        self.cache_refresh_interval = 0
+        self.workspace = {'id': 'ws-bench', 'name': workspace_name}
+        self.clients = [
+            {
+                'client': {'id': f'cl-{index}', 'name': client['name']},
+                'projects': [{'id': f'pr-{index}', 'name': client['project']}]
+            }
+            for index, client in enumerate(clients)
+        ]
+        self.tasks = {
+            f'pr-{index}': [{'id': f'tk-{index}', 'name': client['task']}]
+            for index, client in enumerate(clients)
+        }
+        self.created: List[Dict] = []
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+
+    def _wait(self):
+        if self.bucket is not None:
+            self.bucket.acquire()
+        if self.latency:
+            time.sleep(self.latency)
+
+    def get_workspaces(self) -> List[Dict]:
+        self._wait()
+        return [self.workspace]
+
+    def get_clients(self, workspace_id: str) -> List[Dict]:
+        self._wait()
+        return self.clients
+
+    def get_project_tasks(self, workspace_id: str, project_id: str) -> List[Dict]:
+        self._wait()
+        return self.tasks.get(project_id, [])
+
+    def create_time_entry(self, workspace_id: str, time_entry: Dict) -> Dict:
+        self._wait()
+        with self.lock:
+            entry = dict(time_entry, id=f'te-{next(self.ids)}')
+            self.created.append(entry)
+        return entry
+
+    def close(self):
+        pass
@@ -0,0 +1,275 @@
+"""
+Stand-in local de la API de Clockify para pruebas de carga y benchmarks
+offline. Implementa los endpoints que usa clockify_api.py, con latencia,
+paginación, rate limit con Retry-After y errores 5xx configurables:
+
+    python -m benchmarks.standin_server --port 8765 --latency 0.02 --rate-limit 50 --error-rate 0.01
+
+Y en files/config.yaml:
+
+    clockify:
+      api_url: "http://127.0.0.1:8765/api/v1"
+      global_api_url: "http://127.0.0.1:8765"
+"""
+import argparse
+import collections
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from clockify.time_utils import parse_clockify_time
+
+class StandInState:
+    """Datos del stand-in: usuario, workspace, clientes con proyectos, tareas y entradas."""
+
+    def __init__(self, workspace_name: str, clients: List[Mapping]):
+        self.lock = threading.Lock()
+        self.ids = itertools.count(1)
+        self.user = {'id': 'user-1', 'name': 'Stand-in', 'email': 'standin@example.com',
+                     'defaultWorkspace': 'ws-1'}
+        self.workspace = {'id': 'ws-1', 'name': workspace_name}
+        self.clients = []
+        self.tasks: Dict[str, List[Dict]] = {}
+        for index, client in enumerate(clients):
+            project = {'id': f'pr-{index}', 'name': client['project'], 'clientName': client['name']}
+            self.clients.append({'client': {'id': f'cl-{index}', 'name': client['name']}, 'projects': [project]})
+            self.tasks[project['id']] = [{'id': f'tk-{index}', 'name': client['task'], 'projectId': project['id']}]
+        self.time_entries: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> 'StandInState':
+        """Replica el workspace y los clientes de la configuración, así el pipeline encuentra todo."""
+        return cls(config['workspace']['name'], config['workspace']['clients'])
+
+    def create_time_entry(self, body: Dict) -> Dict:
+        with self.lock:
+            entry_id = f'te-{next(self.ids)}'
+            entry = {
+                'id': entry_id,
+                'description': body.get('description', ''),
+                'projectId': body.get('projectId'),
+                'taskId': body.get('taskId'),
+                'billable': body.get('billable', False),
+                'userId': self.user['id'],
+                'workspaceId': self.workspace['id'],
+                'timeInterval': {'start': body['start'], 'end': body.get('end')}
+            }
+            self.time_entries[entry_id] = entry
+        return entry
+
+    def delete_time_entry(self, entry_id: str) -> bool:
+        with self.lock:
+            return self.time_entries.pop(entry_id, None) is not None
+
+    def list_time_entries(self, start: Optional[str], end: Optional[str]) -> List[Dict]:
+        low = parse_clockify_time(start) if start else None
+        high = parse_clockify_time(end) if end else None
+        with self.lock:
+            entries = list(self.time_entries.values())
+        selected = []
+        for entry in entries:
+            entry_start = parse_clockify_time(entry['timeInterval']['start'])
+            if (low is None or entry_start >= low) and (high is None or entry_start <= high):
+                selected.append(entry)
+        # Clockify devuelve las más recientes primero
+        return sorted(selected, key=lambda entry: entry['timeInterval']['start'], reverse=True)
+
+class RateLimiter:
+    """Ventana deslizante de un segundo por API key."""
+
+    def __init__(self, rate: Optional[float]):
+        self.rate = rate
+        self.lock = threading.Lock()
+        self.calls: Dict[str, collections.deque] = collections.defaultdict(collections.deque)
+
+    def check(self, key: str) -> Optional[float]:
+        """None si la request pasa; si no, los segundos a esperar (para Retry-After)."""
+        if not self.rate:
+            return None
+        now = time.monotonic()
+        with self.lock:
+            calls = self.calls[key]
+            while calls and now - calls[0] >= 1.0:
+                calls.popleft()
+            if len(calls) >= self.rate:
+                return max(0.0, 1.0 - (now - calls[0]))
+            calls.append(now)
+        return None
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], state: StandInState, latency: float = 0.0,
+                 jitter: float = 0.0, rate_limit: Optional[float] = None, error_rate: float = 0.0,
+                 max_page_size: int = 5000, seed: Optional[int] = None):
+        super().__init__(address, StandInHandler)
+        self.state = state
+        self.latency = latency
+        self.jitter = jitter
+        self.limiter = RateLimiter(rate_limit)
+        self.error_rate = error_rate
+        self.max_page_size = max_page_size
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.stats = collections.Counter()
+        self.stats_lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def count(self, key: str):
+        with self.stats_lock:
+            self.stats[key] += 1
+
+    def roll(self) -> float:
+        with self.random_lock:
+            return self.random.random()
+
+# Rutas: (método, regex) -> nombre del handler. El prefijo /api/v1 es opcional
+ROUTES = [
+    ('GET', re.compile(r'^/user$'), 'get_user'),
+    ('GET', re.compile(r'^/workspaces$'), 'get_workspaces'),
+    ('GET', re.compile(r'^/workspaces/(?P<ws>[^/]+)/project-picker/clients$'), 'get_picker_clients'),
+    ('GET', re.compile(r'^/workspaces/(?P<ws>[^/]+)/projects$'), 'get_projects'),
+    ('GET', re.compile(r'^/workspaces/(?P<ws>[^/]+)/projects/(?P<project>[^/]+)/tasks$'), 'get_tasks'),
+    ('GET', re.compile(r'^/workspaces/(?P<ws>[^/]+)/user/(?P<user>[^/]+)/time-entries$'), 'get_time_entries'),
+    ('POST', re.compile(r'^/workspaces/(?P<ws>[^/]+)/time-entries$'), 'create_time_entry'),
+    ('DELETE', re.compile(r'^/workspaces/(?P<ws>[^/]+)/time-entries/(?P<entry>[^/]+)$'), 'delete_time_entry'),
+]
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload=None, headers: Optional[Dict[str, str]] = None):
+        body = b'' if payload is None else json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(str(status))
+
+    def _page(self, items: List[Dict], query: Dict, page_param: str) -> List[Dict]:
+        page = int(query.get('page', ['1'])[0])
+        page_size = min(int(query.get(page_param, ['50'])[0]), self.server.max_page_size)
+        return items[(page - 1) * page_size:page * page_size]
+
+    def _dispatch(self, method: str):
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(server.latency + server.jitter * server.roll())
+
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            body = json.loads(self.rfile.read(length) or b'null')
+
+        if not self.headers.get('x-api-key'):
+            return self._send(401, {'message': 'Falta x-api-key', 'code': 401})
+
+        wait = server.limiter.check(self.headers['x-api-key'])
+        if wait is not None:
+            return self._send(429, {'message': 'Too many requests', 'code': 429},
+                              {'Retry-After': f'{wait:.3f}'})
+
+        if server.error_rate and server.roll() < server.error_rate:
+            return self._send(503, {'message': 'Error simulado', 'code': 503})
+
+        url = urlparse(self.path)
+        path = url.path[len('/api/v1'):] if url.path.startswith('/api/v1/') else url.path
+        query = parse_qs(url.query, keep_blank_values=True)
+        for route_method, pattern, name in ROUTES:
+            match = pattern.match(path)
+            if route_method == method and match:
+                return getattr(self, f'handle_{name}')(query, body, **match.groupdict())
+        return self._send(404, {'message': f'No existe {method} {path}', 'code': 404})
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def handle_get_user(self, query, body):
+        self._send(200, self.server.state.user)
+
+    def handle_get_workspaces(self, query, body):
+        self._send(200, [self.server.state.workspace])
+
+    def handle_get_picker_clients(self, query, body, ws):
+        self._send(200, self._page(self.server.state.clients, query, 'pageSize'))
+
+    def handle_get_projects(self, query, body, ws):
+        projects = [project for client in self.server.state.clients for project in client['projects']]
+        self._send(200, self._page(projects, query, 'page-size'))
+
+    def handle_get_tasks(self, query, body, ws, project):
+        self._send(200, self._page(self.server.state.tasks.get(project, []), query, 'page-size'))
+
+    def handle_get_time_entries(self, query, body, ws, user):
+        entries = self.server.state.list_time_entries(query.get('start', [None])[0], query.get('end', [None])[0])
+        self._send(200, self._page(entries, query, 'page-size'))
+
+    def handle_create_time_entry(self, query, body, ws):
+        if not body or not body.get('start'):
+            return self._send(400, {'message': 'Falta start', 'code': 400})
+        self._send(201, self.server.state.create_time_entry(body))
+
+    def handle_delete_time_entry(self, query, body, ws, entry):
+        if self.server.state.delete_time_entry(entry):
+            return self._send(204)
+        self._send(404, {'message': f'No existe la entrada {entry}', 'code': 404})
+
+def start_server(state: StandInState, host: str = '127.0.0.1', port: int = 0, **options) -> StandInServer:
+    """Levanta el stand-in en un hilo de fondo (port=0 elige un puerto libre)."""
+    server = StandInServer((host, port), state, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+def main():
+    from configuration.config import load_config
+
+    parser = argparse.ArgumentParser(description="Stand-in local de la API de Clockify")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--config', default='files/config.yaml', help="Workspace y clientes a replicar")
+    parser.add_argument('--latency', type=float, default=0.0, help="Latencia fija por request (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Latencia aleatoria extra, hasta N segundos")
+    parser.add_argument('--rate-limit', type=float, default=None, help="Requests por segundo por API key")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="Probabilidad de responder 503")
+    parser.add_argument('--max-page-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    state = StandInState.from_config(load_config(args.config))
+    server = StandInServer((args.host, args.port), state, latency=args.latency, jitter=args.jitter,
+                           rate_limit=args.rate_limit, error_rate=args.error_rate,
+                           max_page_size=args.max_page_size)
+    print(f"Stand-in de Clockify en {server.base_url} (api_url: {server.base_url}/api/v1)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Respuestas: {dict(server.stats)}")
+
+if __name__ == "__main__":
+    main()
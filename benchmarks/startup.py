@@ -0,0 +1,110 @@
+"""
+Tiempo de arranque de la CLI: cuánto tarda cada invocación en un proceso
+nuevo y qué módulos pesados termina importando.
+
+    python -m benchmarks.startup --repeat 10 --output startup_results.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import yaml
+
+from benchmarks.generate import SOURCE_MAPPING, make_clients, make_time_config
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que una invocación rápida no debería cargar
+HEAVY_MODULES = ('asana', 'requests', 'pandas', 'numpy', 'sources.asana_to_csv', 'clockify.clockify_api')
+
+def write_config(path: str, work_dir: str):
+    """Configuración de ejemplo con una fuente CSV habilitada y Asana deshabilitada."""
+    config = {
+        'workspace': {'name': 'Benchmark', 'clients': make_clients(5)},
+        'time': make_time_config(28),
+        'execution': {
+            'dry_run': True,
+            'task_store': os.path.join(work_dir, 'tareas.db'),
+            'logging': {'console_level': 'WARNING', 'file_name': os.path.join(work_dir, 'startup.log')},
+            'sources': [
+                {'type': 'csv', 'enabled': True, 'file_path': os.path.join(work_dir, 'fuente.csv'),
+                 'mapping': SOURCE_MAPPING},
+                {'type': 'asana', 'enabled': False}
+            ]
+        },
+        'clockify': {'api_key': 'benchmark'}
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        yaml.safe_dump(config, f, allow_unicode=True)
+
+def time_command(command: List[str], repeat: int) -> Dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(command, cwd=ROOT_DIR, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - started)
+    return {'command': ' '.join(command[1:]), 'runs': timings, 'min': min(timings),
+            'median': statistics.median(timings)}
+
+def loaded_modules(code: str) -> List[str]:
+    """Módulos pesados presentes en sys.modules después de correr `code` en un proceso nuevo."""
+    probe = f"{code}\nimport sys\nprint('MODULES:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    output = subprocess.run([sys.executable, '-c', probe], cwd=ROOT_DIR, check=True,
+                            capture_output=True, text=True).stdout
+    line = next((line for line in output.splitlines() if line.startswith('MODULES:')), 'MODULES:')
+    return [module for module in line[len('MODULES:'):].split(',') if module]
+
+def run_startup(repeat: int = 10) -> Dict:
+    from benchmarks.run import _git_revision
+
+    python = sys.executable
+    with tempfile.TemporaryDirectory() as work_dir:
+        config_file = os.path.join(work_dir, 'config.yaml')
+        write_config(config_file, work_dir)
+        cases = {
+            'python': [python, '-c', 'pass'],
+            'cli_help': [python, 'cli.py', '--help'],
+            'cli_plan': [python, 'cli.py', '--config', config_file, 'plan'],
+            'import_app': [python, '-c', 'import app'],
+            'import_asana_source': [python, '-c', 'import sources.asana_to_csv'],
+        }
+        results = {name: time_command(command, repeat) for name, command in cases.items()}
+        results['cli_plan']['modules'] = loaded_modules(
+            f"import cli\ncli.main(['--config', {config_file!r}, 'plan'])")
+        results['import_app']['modules'] = loaded_modules('import app')
+
+    return {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': {'repeat': repeat},
+        'results': results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la CLI")
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--output', default='startup_results.json')
+    args = parser.parse_args()
+
+    report = run_startup(args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in report['results'].items():
+        modules = result.get('modules')
+        loaded = f"  carga: {', '.join(modules) or 'nada pesado'}" if modules is not None else ''
+        print(f"{name:22s} {result['median'] * 1000:8.1f} ms{loaded}")
+    print(f"Resultados guardados en {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Línea de comandos de ClokiFai, con un subcomando por etapa:
+
+    python cli.py plan                 # qué se va a procesar, sin red ni SDKs
+    python cli.py extract              # fuentes -> store de tareas
+    python cli.py schedule             # store de tareas -> entradas (dry run)
+    python cli.py submit               # store de tareas -> Clockify
+    python cli.py run [--dry-run]      # todo el pipeline, como app.py
+
+Cada subcomando importa solo lo que usa: `plan` no carga requests, pandas
+ni el SDK de Asana, y `extract` solo importa las fuentes habilitadas.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Dict, List, Mapping, Optional
+
+from configuration.config import ConfigError, load_config, merge_config, validate_config
+from configuration.periods import ChunkProgress, config_periods, is_range_mode, period_id, range_key
+
+DEFAULT_TASK_STORE = 'horarios.csv'
+
+def _load(args: argparse.Namespace, overrides: Optional[Dict] = None) -> Dict:
+    """Lee la configuración de --config con los overrides de la línea de comandos."""
+    config = load_config(args.config)
+    return merge_config(config, overrides) if overrides else config
+
+def _context(args: argparse.Namespace, config: Dict, connect: bool = True):
+    from configuration.context import build_context
+    return build_context(config_file=args.config, config=config, connect=connect)
+
+def _task_store_path(config: Mapping, explicit: Optional[str] = None) -> str:
+    execution = config.get('execution') or {}
+    return explicit or execution.get('task_store') or execution.get('debug_csv') or DEFAULT_TASK_STORE
+
+def _period_contexts(ctx):
+    from dataclasses import replace
+    from configuration.periods import with_period
+
+    for period in config_periods(ctx.config):
+        yield period, replace(ctx, config=with_period(ctx.config, period))
+
+def _count_tasks(store, clients: List[Mapping], period: Mapping) -> Dict[str, int]:
+    """Tareas de cada cliente dentro del tramo."""
+    return {
+        client['name']: len(store.tasks_for_client(client['name'], period['start_day'], period['end_day'], period))
+        for client in clients
+    }
+
+def cmd_plan(args: argparse.Namespace) -> int:
+    """Resume qué haría `run` con la configuración actual. No toca la red."""
+    config = _load(args)
+    errors = validate_config(config)
+    if errors:
+        raise ConfigError(errors)
+
+    execution = config['execution']
+    clients = config['workspace']['clients']
+    periods = config_periods(config)
+    progress = None
+    key = range_key(config)
+    if is_range_mode(config['time']):
+        progress = ChunkProgress(execution.get('chunk_progress_file', 'chunk_progress.json'))
+
+    store_path = _task_store_path(config, args.task_store)
+    store = None
+    if os.path.exists(store_path):
+        from sources.task_store import open_task_store
+        store = open_task_store(store_path)
+    plan = {
+        'config': args.config,
+        'workspace': config['workspace']['name'],
+        'clients': [client['name'] for client in clients],
+        'dry_run': execution.get('dry_run', True),
+        'scheduler': execution.get('scheduler', 'python'),
+        'sources': [
+            {'type': source.get('type'), 'enabled': bool(source.get('enabled', False))}
+            for source in execution.get('sources') or []
+        ],
+        'task_store': store_path if store is not None else None,
+        'periods': []
+    }
+    try:
+        for period in periods:
+            entry = {
+                'period': period_id(period),
+                'done': bool(progress is not None and progress.is_done(key, period))
+            }
+            if store is not None:
+                entry['tasks'] = _count_tasks(store, clients, period)
+            plan['periods'].append(entry)
+    finally:
+        if store is not None:
+            store.close()
+
+    if args.json:
+        print(json.dumps(plan, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"Workspace: {plan['workspace']} ({len(plan['clients'])} clientes)")
+    print(f"Modo: {'dry run' if plan['dry_run'] else 'envío a Clockify'} - motor {plan['scheduler']}")
+    for source in plan['sources']:
+        print(f"Fuente {source['type']}: {'habilitada' if source['enabled'] else 'deshabilitada'}")
+    print(f"Store de tareas: {store_path}{'' if store is not None else ' (no existe todavía)'}")
+    for entry in plan['periods']:
+        status = 'completado' if entry['done'] else 'pendiente'
+        print(f"Tramo {entry['period']}: {status}")
+        for client, count in (entry.get('tasks') or {}).items():
+            print(f"  {client}: {count} tareas")
+    return 0
+
+def cmd_extract(args: argparse.Namespace) -> int:
+    """Extrae las fuentes habilitadas y guarda las tareas en el store, sin conectarse a Clockify."""
+    from app import extract_period
+
+    config = _load(args)
+    store_path = _task_store_path(config, args.output)
+    ctx = _context(args, merge_config(config, {'execution': {'task_store': store_path}}), connect=False)
+    sources = ctx.config['execution'].get('sources', [])
+    total = 0
+    for index, (period, period_ctx) in enumerate(_period_contexts(ctx)):
+        tasks, success = extract_period(period_ctx, sources, append_debug=index > 0)
+        if not success:
+            ctx.logger.error(f"La extracción del tramo {period_id(period)} terminó con errores")
+            return 1
+        total += len(tasks)
+    ctx.logger.info(f"Extracción completada: {total} tareas en {store_path}")
+    return 0
+
+def _schedule(args: argparse.Namespace, dry_run: bool) -> int:
+    from app import run_periods
+    from clockify.csv_to_clockify import main as clockify_main
+
+    ctx = _context(args, _load(args, {'execution': {'dry_run': dry_run}}))
+    store_path = _task_store_path(ctx.config, args.input)
+    # Mismo progreso de tramos que `run`: salta los completados y marca los enviados
+    success = run_periods(ctx, lambda period_ctx, index: clockify_main(input_file=store_path, ctx=period_ctx))
+    if success:
+        ctx.logger.info("Proceso completado exitosamente")
+    return 0 if success else 1
+
+def cmd_schedule(args: argparse.Namespace) -> int:
+    """Planifica las tareas del store y guarda las entradas en CSV (siempre en dry run)."""
+    return _schedule(args, dry_run=True)
+
+def cmd_submit(args: argparse.Namespace) -> int:
+    """Planifica y envía a Clockify las tareas del store, o reenvía el dead-letter."""
+    if args.dead_letters:
+        from clockify.submission import replay_dead_letters
+
+        ctx = _context(args, _load(args))
+        return 0 if replay_dead_letters(ctx.config, ctx.clockify) else 1
+    return _schedule(args, dry_run=False)
+
+def cmd_run(args: argparse.Namespace) -> int:
+    """Pipeline completo (extracción, planificación y envío), como `python app.py`."""
+    from app import run_with_metrics
+
+    overrides = {'execution': {'dry_run': args.dry_run}} if args.dry_run is not None else None
+    ctx = _context(args, _load(args, overrides))
+    ctx.logger.info("Iniciando orquestador de tareas")
+    return 0 if run_with_metrics(ctx) else 1
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description="Carga horas en Clockify desde Asana y CSV")
+    parser.add_argument('--config', default='files/config.yaml', help="Archivo de configuración")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    plan = subparsers.add_parser('plan', help="Muestra qué se va a procesar, sin conectarse a nada")
+    plan.add_argument('--task-store', default=None, help="Store de tareas a inspeccionar")
+    plan.add_argument('--json', action='store_true', help="Salida en JSON")
+    plan.set_defaults(func=cmd_plan)
+
+    extract = subparsers.add_parser('extract', help="Extrae las fuentes al store de tareas")
+    extract.add_argument('--output', default=None,
+                         help=f"Store de tareas (default: execution.task_store o {DEFAULT_TASK_STORE})")
+    extract.set_defaults(func=cmd_extract)
+
+    schedule = subparsers.add_parser('schedule', help="Planifica las tareas del store (dry run)")
+    schedule.add_argument('--input', default=None, help="Store de tareas a leer")
+    schedule.set_defaults(func=cmd_schedule)
+
+    submit = subparsers.add_parser('submit', help="Planifica y envía a Clockify las tareas del store")
+    submit.add_argument('--input', default=None, help="Store de tareas a leer")
+    submit.add_argument('--dead-letters', action='store_true', help="Reenvía las entradas del dead-letter")
+    submit.set_defaults(func=cmd_submit)
+
+    run = subparsers.add_parser('run', help="Pipeline completo")
+    run.add_argument('--dry-run', action=argparse.BooleanOptionalAction, default=None,
+                     help="Fuerza (o desactiva) el dry run de la configuración")
+    run.set_defaults(func=cmd_run)
+    return parser
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logger = logging.getLogger('clockify_automation')
+    try:
+        return args.func(args)
+    except ConfigError as e:
+        logger.error(str(e))
+        return 2
+    except FileNotFoundError as e:
+        logger.error(f"No se encontró el archivo: {e.filename}")
+        return 2
+    except Exception as e:
+        logger.error(f"Error en {args.command}: {str(e)}", exc_info=True)
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,95 +1,374 @@
 import requests
+from requests.adapters import HTTPAdapter
 import datetime
+import email.utils
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
 from configuration.config import load_config
+from configuration.metrics import bind, current_stage, get_metrics
+from clockify.metadata_cache import MetadataCache
+from clockify.rate_limit import DEFAULT_RATE_LIMIT, TokenBucket
+from clockify.time_utils import (
+    UTC_OFFSET_MINUTES, parse_clockify_time, datetime_to_epoch_minutes, format_clockify_time
+)
+
+API_URL = 'https://api.clockify.me/api/v1'
+GLOBAL_API_URL = 'https://global.api.clockify.me'
 
 def get_api_key(config_file='files/config.yaml'):
     """Obtiene la API key de Clockify desde el archivo de configuración."""
     config = load_config(config_file)
     return config['clockify']['api_key']
 
+class ClockifyClient:
+    """Cliente de Clockify con sesión HTTP persistente y pool de conexiones."""
+
+    def __init__(self, api_key: str, pool_connections: int = 4, pool_maxsize: int = 10,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0,
+                 timeout: float = 30.0, page_size: int = 200, prefetch: bool = True,
+                 cache_ttl: float = 86400, cache_file: Optional[str] = 'clockify_cache.json',
+                 cache_refresh_interval: float = 60, rate_limit: Optional[float] = DEFAULT_RATE_LIMIT,
+                 bucket=None, api_url: str = API_URL, global_api_url: str = GLOBAL_API_URL):
+        self.api_key = api_key
+        # Sobrescribibles para apuntar a un stand-in local
+        self.api_url = api_url.rstrip('/')
+        self.global_api_url = global_api_url.rstrip('/')
+        self.cache_ttl = cache_ttl
+        self.cache_file = cache_file
+        self.cache_refresh_interval = cache_refresh_interval
+        self.page_size = page_size
+        self.prefetch = prefetch
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        # Un token por cada request HTTP, reintentos y GETs incluidos. `bucket`
+        # permite compartir el limitador (p. ej. entre procesos del modo batch)
+        self.bucket = bucket if bucket is not None else (TokenBucket(rate_limit) if rate_limit else None)
+        self.logger = logging.getLogger('clockify_automation')
+        self.session = requests.Session()
+        self.session.headers.update({'x-api-key': api_key})
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    @classmethod
+    def from_config(cls, config: Dict, bucket=None) -> 'ClockifyClient':
+        """
+        Crea el cliente a partir de la sección `clockify` de la configuración.
+        Si se pasa `bucket`, se usa en lugar de crear uno con `rate_limit`.
+        """
+        clockify_config = config['clockify']
+        return cls(
+            clockify_config['api_key'],
+            pool_connections=clockify_config.get('pool_connections', 4),
+            pool_maxsize=clockify_config.get('pool_maxsize', 10),
+            max_retries=clockify_config.get('max_retries', 5),
+            backoff_base=clockify_config.get('backoff_base', 0.5),
+            backoff_max=clockify_config.get('backoff_max', 30.0),
+            timeout=clockify_config.get('timeout', 30.0),
+            page_size=clockify_config.get('page_size', 200),
+            prefetch=clockify_config.get('prefetch', True),
+            cache_ttl=clockify_config.get('cache_ttl', 86400),
+            cache_file=clockify_config.get('cache_file', 'clockify_cache.json'),
+            cache_refresh_interval=clockify_config.get('cache_refresh_interval', 60),
+            rate_limit=clockify_config.get('rate_limit', DEFAULT_RATE_LIMIT),
+            bucket=bucket,
+            api_url=clockify_config.get('api_url', API_URL),
+            global_api_url=clockify_config.get('global_api_url', GLOBAL_API_URL)
+        )
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _backoff(self, attempt: int) -> float:
+        """Backoff exponencial con jitter completo."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> Optional[float]:
+        """Interpreta el header Retry-After (segundos o fecha HTTP)."""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        now = datetime.datetime.now(retry_at.tzinfo)
+        return max(0.0, (retry_at - now).total_seconds())
+
+    def _endpoint(self, url: str) -> str:
+        """Ruta del endpoint con los IDs reemplazados, para no crear una serie por ID."""
+        path = url.split('://', 1)[-1].split('/', 1)[-1].split('?', 1)[0]
+        parts = path.split('/')
+        for index in range(1, len(parts)):
+            if parts[index - 1] in ('workspaces', 'projects', 'user', 'time-entries', 'tasks'):
+                parts[index] = '{id}'
+        return '/' + '/'.join(part for part in parts if part not in ('api', 'v1'))
+
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Ejecuta la request reintentando ante 429, 5xx y errores de conexión."""
+        metrics = get_metrics()
+        stage = current_stage()
+        endpoint = self._endpoint(url)
+        attempt = 0
+        while True:
+            if self.bucket is not None:
+                waited = time.perf_counter()
+                self.bucket.acquire()
+                metrics.inc('clockify_rate_limit_wait_seconds_total', time.perf_counter() - waited,
+                            help="Tiempo esperado por el rate limit local", stage=stage)
+            started = time.perf_counter()
+            try:
+                r = self.session.request(method, url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                metrics.inc('clockify_http_requests_total', help="Requests HTTP a Clockify",
+                            method=method, endpoint=endpoint, status='error', stage=stage)
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                reason = 'connection'
+                self.logger.warning(f"Error de conexión con Clockify ({str(e)}), reintentando en {delay:.1f}s")
+            else:
+                metrics.observe('clockify_http_request_seconds', time.perf_counter() - started,
+                                help="Latencia de las requests a Clockify", method=method, endpoint=endpoint)
+                metrics.inc('clockify_http_requests_total', help="Requests HTTP a Clockify",
+                            method=method, endpoint=endpoint, status=r.status_code, stage=stage)
+                metrics.inc('clockify_http_bytes_total', len(r.request.body or b''),
+                            help="Bytes enviados y recibidos de Clockify", direction='sent', stage=stage)
+                metrics.inc('clockify_http_bytes_total', len(r.content),
+                            help="Bytes enviados y recibidos de Clockify", direction='received', stage=stage)
+                if (r.status_code != 429 and r.status_code < 500) or attempt >= self.max_retries:
+                    return r
+                retry_after = self._retry_after(r)
+                delay = retry_after if retry_after is not None else self._backoff(attempt)
+                reason = str(r.status_code)
+                self.logger.warning(f"Clockify respondió {r.status_code}, reintentando en {delay:.1f}s")
+            metrics.inc('clockify_http_retries_total', help="Reintentos de requests a Clockify",
+                        reason=reason, stage=stage)
+            metrics.inc('clockify_http_retry_wait_seconds_total', delay,
+                        help="Tiempo esperado entre reintentos", stage=stage)
+            time.sleep(delay)
+            attempt += 1
+
+    def _get_page(self, url: str, params: Dict) -> Tuple[List[Dict], bool]:
+        """Items de una página y si el servidor la marcó como la última (header Last-Page)."""
+        r = self._request('GET', url, params=params)
+        if r.status_code >= 400:
+            raise Exception(f"GET {url} {params}: " + r.text)
+        return r.json(), r.headers.get('Last-Page', '').lower() == 'true'
+
+    def _paginate(self, url: str, params: Optional[Dict] = None, page_size: Optional[int] = None,
+                  page_param: str = 'page-size') -> Iterator[Dict]:
+        """
+        Recorre un endpoint paginado página por página. Con `prefetch` activo,
+        la página siguiente se descarga en segundo plano mientras se consume la actual.
+        Termina con una página vacía o marcada como la última: una página corta no
+        alcanza, porque Clockify puede devolver menos items que `page_size` si lo limita.
+        """
+        page_size = page_size or self.page_size
+        params = dict(params or {})
+
+        # El prefetch corre en otro hilo: se le pasa la etapa actual
+        @bind
+        def fetch(page: int) -> Tuple[List[Dict], bool]:
+            return self._get_page(url, {**params, 'page': page, page_param: page_size})
+
+        if not self.prefetch:
+            page = 1
+            while True:
+                items, last_page = fetch(page)
+                yield from items
+                if not items or last_page:
+                    return
+                page += 1
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            page = 1
+            future = executor.submit(fetch, page)
+            while future is not None:
+                items, last_page = future.result()
+                page += 1
+                # Pedir la siguiente antes de entregar la actual, salvo que esta sea la última
+                future = executor.submit(fetch, page) if items and not last_page else None
+                yield from items
+
+    def iter_clients(self, workspace_id: str, page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Clientes del project-picker, cada uno con sus proyectos."""
+        params = {'excludedProjects': '', 'excludedTasks': '', 'search': '', 'userId': '', 'archived': 'false'}
+        return self._paginate(f'{self.global_api_url}/workspaces/{workspace_id}/project-picker/clients',
+                              params, page_size, page_param='pageSize')
+
+    def iter_projects(self, workspace_id: str, page_size: Optional[int] = None) -> Iterator[Dict]:
+        return self._paginate(f'{self.api_url}/workspaces/{workspace_id}/projects',
+                              {'archived': 'false'}, page_size)
+
+    def iter_tasks(self, workspace_id: str, project_id: str, page_size: Optional[int] = None) -> Iterator[Dict]:
+        return self._paginate(f'{self.api_url}/workspaces/{workspace_id}/projects/{project_id}/tasks',
+                              None, page_size)
+
+    def iter_time_entries(self, workspace_id: str, user_id: str, start: Optional[str] = None,
+                          end: Optional[str] = None, page_size: Optional[int] = None) -> Iterator[Dict]:
+        """Entradas de tiempo del usuario, opcionalmente filtradas por rango (ISO, UTC)."""
+        params = {}
+        if start:
+            params['start'] = start
+        if end:
+            params['end'] = end
+        return self._paginate(f'{self.api_url}/workspaces/{workspace_id}/user/{user_id}/time-entries',
+                              params, page_size)
+
+    def get_user(self) -> Dict:
+        r = self._request('GET', f'{self.api_url}/user')
+        if r.status_code >= 400:
+            raise Exception("GET /user: " + r.text)
+        return r.json()
+
+    def get_workspaces(self) -> List[Dict]:
+        r = self._request('GET', f'{self.api_url}/workspaces')
+        if r.status_code >= 400:
+            raise Exception("GET /workspaces: " + r.text)
+        return r.json()
+
+    def get_workspace_by_name(self, workspace_name: str) -> Optional[Dict]:
+        for workspace in self.get_workspaces():
+            if workspace['name'].lower().strip() == workspace_name.lower().strip():
+                return workspace
+        return None
+
+    def get_clients(self, workspace_id: str) -> List[Dict]:
+        return list(self.iter_clients(workspace_id))
+
+    def get_client_by_name(self, workspace_id: str, client_name: str) -> Optional[Dict]:
+        for client in self.get_clients(workspace_id):
+            if client['client']['name'].lower().strip() == client_name.lower().strip():
+                return client
+        return None
+
+    def get_project_by_name(self, workspace_id: str, client_name: str, project_name: str) -> Optional[Dict]:
+        client = self.get_client_by_name(workspace_id, client_name)
+        for project in client['projects']:
+            if project['name'].lower().strip() == project_name.lower().strip():
+                return project
+        return None
+
+    def get_project_tasks(self, workspace_id: str, project_id: str) -> List[Dict]:
+        return list(self.iter_tasks(workspace_id, project_id))
+
+    def get_project_task_by_name(self, workspace_id: str, project_id: str, task_name: str) -> Optional[Dict]:
+        for task in self.get_project_tasks(workspace_id, project_id):
+            if task['name'].lower().strip() == task_name.lower().strip():
+                return task
+        return None
+
+    def create_time_entry(self, workspace_id: str, time_entry: Dict) -> Dict:
+        # Crear una copia del time_entry para no modificar el original
+        entry_to_send = time_entry.copy()
+
+        # Aplicar UTC+3 sobre minutos enteros y formatear como espera Clockify
+        for field in ('start', 'end'):
+            value = entry_to_send[field]
+            if isinstance(value, str):
+                minutes = parse_clockify_time(value)
+            else:
+                minutes = datetime_to_epoch_minutes(value)
+            entry_to_send[field] = format_clockify_time(minutes + UTC_OFFSET_MINUTES)
+
+        r = self._request(
+            'POST',
+            f'{self.api_url}/workspaces/{workspace_id}/time-entries',
+            json=entry_to_send
+        )
+
+        if r.status_code >= 400:
+            raise Exception(f"{time_entry}: " + str(r.json()))
+        return r.json()
+
+    def delete_time_entry(self, workspace_id: str, entry_id: str):
+        r = self._request('DELETE', f'{self.api_url}/workspaces/{workspace_id}/time-entries/{entry_id}')
+        if r.status_code >= 400:
+            raise Exception(f"DELETE {entry_id}: " + r.text)
+
+_default_client = None
+_default_cache = None
+
+def get_default_client() -> ClockifyClient:
+    """Devuelve el cliente compartido, creándolo (y leyendo la configuración) una sola vez."""
+    global _default_client
+    if _default_client is None:
+        _default_client = ClockifyClient.from_config(load_config())
+    return _default_client
+
+def set_default_client(client: Optional[ClockifyClient]):
+    """Reemplaza el cliente compartido que usan las funciones del módulo."""
+    global _default_client, _default_cache
+    _default_client = client
+    _default_cache = None
+
+def get_default_cache() -> MetadataCache:
+    """Devuelve la cache de metadatos compartida por las búsquedas por nombre."""
+    global _default_cache
+    if _default_cache is None:
+        client = get_default_client()
+        _default_cache = MetadataCache(client, ttl=client.cache_ttl, path=client.cache_file,
+                                       refresh_interval=client.cache_refresh_interval)
+    return _default_cache
+
 def get_user():
-    api_key = get_api_key()
-    data = {'x-api-key': api_key}
-    r = requests.get('https://api.clockify.me/api/v1/user', headers=data)
-    return r.json()
+    return get_default_client().get_user()
 
 def get_workspaces():
-    api_key = get_api_key()
-    data = {'x-api-key': api_key}
-    r = requests.get('https://api.clockify.me/api/v1/workspaces', headers=data)
-    return r.json()
+    return get_default_client().get_workspaces()
 
 def get_workspace_by_name(workspace_name):
-    workspaces = get_workspaces()
-    for workspace in workspaces:
-        if workspace['name'].lower().strip() == workspace_name.lower().strip():
-            return workspace
-    return None
+    return get_default_cache().get_workspace_by_name(workspace_name)
 
 def get_clients(workspace_id):
-    api_key = get_api_key()
-    data = {'x-api-key': api_key}
-    r = requests.get(f'https://global.api.clockify.me/workspaces/{workspace_id}/project-picker/clients?page=1&excludedProjects=&excludedTasks=&search=&userId=&archived=false', headers=data)
-    return r.json()
+    return get_default_client().get_clients(workspace_id)
 
 def get_client_by_name(workspace_id, client_name):
-    clients = get_clients(workspace_id)
-    for client in clients:
-        if client['client']['name'].lower().strip() == client_name.lower().strip():
-            return client
-    return None
+    return get_default_cache().get_client_by_name(workspace_id, client_name)
 
 def get_project_by_name(workspace_id, client_name, project_name):
-    client = get_client_by_name(workspace_id, client_name)
-    for project in client['projects']:
-        if project['name'].lower().strip() == project_name.lower().strip():
-            return project
-    return None
+    return get_default_cache().get_project_by_name(workspace_id, client_name, project_name)
 
 def get_project_tasks(workspace_id, project_id):
-    api_key = get_api_key()
-    data = {'x-api-key': api_key}
-    r = requests.get(f'https://api.clockify.me/api/v1/workspaces/{workspace_id}/projects/{project_id}/tasks', headers=data)
-    return r.json()
+    return get_default_client().get_project_tasks(workspace_id, project_id)
 
 def get_project_task_by_name(workspace_id, project_id, task_name):
-    tasks = get_project_tasks(workspace_id, project_id)
-    for task in tasks:
-        if task['name'].lower().strip() == task_name.lower().strip():
-            return task
-    return None
+    return get_default_cache().get_project_task_by_name(workspace_id, project_id, task_name)
 
-def create_time_entry(workspace_id, time_entry):
-    api_key = get_api_key()
-    data = {'x-api-key': api_key}
+def iter_clients(workspace_id, page_size=None):
+    return get_default_client().iter_clients(workspace_id, page_size)
 
-    # Crear una copia del time_entry para no modificar el original
-    entry_to_send = time_entry.copy()
+def iter_projects(workspace_id, page_size=None):
+    return get_default_client().iter_projects(workspace_id, page_size)
 
-    # Convertir las fechas al formato correcto si son strings
-    if isinstance(entry_to_send['start'], str):
-        start_time = datetime.datetime.fromisoformat(entry_to_send['start'].replace('Z', ''))
-    else:
-        start_time = entry_to_send['start']
+def iter_tasks(workspace_id, project_id, page_size=None):
+    return get_default_client().iter_tasks(workspace_id, project_id, page_size)
 
-    if isinstance(entry_to_send['end'], str):
-        end_time = datetime.datetime.fromisoformat(entry_to_send['end'].replace('Z', ''))
-    else:
-        end_time = entry_to_send['end']
+def iter_time_entries(workspace_id, user_id, start=None, end=None, page_size=None):
+    return get_default_client().iter_time_entries(workspace_id, user_id, start, end, page_size)
 
-    # Aplicar UTC+3 y formatear correctamente
-    entry_to_send['start'] = utc_3(start_time).strftime('%Y-%m-%dT%H:%M:00Z')
-    entry_to_send['end'] = utc_3(end_time).strftime('%Y-%m-%dT%H:%M:00Z')
-
-    r = requests.post(
-        f'https://api.clockify.me/api/v1/workspaces/{workspace_id}/time-entries', 
-        headers=data, 
-        json=entry_to_send
-    )
+def create_time_entry(workspace_id, time_entry):
+    return get_default_client().create_time_entry(workspace_id, time_entry)
 
-    if r.status_code >= 400:
-        raise Exception(f"{time_entry}: " + str(r.json()))
-    return r.json()
+def delete_time_entry(workspace_id, entry_id):
+    return get_default_client().delete_time_entry(workspace_id, entry_id)
 
 def utc_3(some_date):
     return some_date + datetime.timedelta(hours=3)
@@ -100,4 +379,4 @@ def dummy_entry(project_id, project_task_id, description):
         "projectId": project_id,
         "taskId": project_task_id,
         "description": description
-    }
\ No newline at end of file
+    }
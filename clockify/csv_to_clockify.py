@@ -1,37 +1,50 @@
 import csv
 import datetime
+import functools
 from clockify.clockify_api import (
     get_workspace_by_name, get_project_by_name, 
-    get_project_task_by_name, create_time_entry,
-    dummy_entry
+    get_project_task_by_name, dummy_entry
 )
-from configuration.config import load_config
-from configuration.logger import setup_logger
+from clockify.submission import submit_time_entries, DEFAULT_MAX_WORKERS
+from clockify.journal import entry_hash, journal_from_config
+from clockify.ledger import (
+    ledger_from_config, STATUS_ALREADY_SUBMITTED, STATUS_DRY_RUN, STATUS_PLANNED
+)
+from clockify.overlap import build_existing_index, filter_existing
+from clockify.intervals import IntervalIndex
+from clockify.time_utils import (
+    hours_to_minutes, format_minutes, epoch_minutes, format_clockify_time
+)
+from sources.task_store import open_task_store
+from configuration.context import AppContext, build_context
+from configuration.metrics import timed
+from configuration.periods import is_range_mode, period_id
 import logging
-from typing import List, Tuple, Dict
+import os
+from typing import List, Tuple, Dict, Optional
+
+# Duración mínima de una entrada de tiempo
+MIN_ENTRY_MINUTES = 15
 
-logger = None
+# Logger de los loops calientes, para no buscarlo en cada llamada
+_logger = logging.getLogger('clockify_automation')
 
 def create_task_entry(task, start_time, end_time, last_task, last_task_start, year, month, day):
-    task_start = datetime.datetime(year, month, day, 
-                                int(start_time), 
-                                int((start_time % 1) * 60))
-    
-    task_end = datetime.datetime(year, month, day,
-                                int(end_time),
-                                int((end_time % 1) * 60))
+    day_start = epoch_minutes(datetime.date(year, month, day))
+    task_start = day_start + start_time
     
     time_entry = task.copy()
-    time_entry['start'] = task_start.isoformat() + 'Z'
-    time_entry['end'] = task_end.isoformat() + 'Z'
+    time_entry['start'] = format_clockify_time(task_start)
+    time_entry['end'] = format_clockify_time(day_start + end_time)
     
     return task['description'], task_start, time_entry
 
 def create_daily_time_entries(project_id: str, project_task_id: str, description: str, 
-                            start_date: datetime.datetime, end_date: datetime.datetime,
-                            start_time: float, end_time: float) -> List[Dict]:
+                            start_date: datetime.date, end_date: datetime.date,
+                            start_time: int, end_time: int) -> List[Dict]:
     """
     Crea entradas de tiempo diarias para un período específico usando el horario configurado.
+    Los horarios se expresan en minutos desde medianoche.
     """
     logger = logging.getLogger('clockify_automation')
     time_entry = {
@@ -44,29 +57,13 @@ def create_daily_time_entries(project_id: str, project_task_id: str, description
     current_date = start_date
 
     while current_date <= end_date:
-        logger.debug(f"Creando time entry para {current_date}")
+        logger.debug("Creando time entry para %s", current_date)
         if current_date.weekday() < 5:  # Solo días laborables (Lun-Vie)
-            entry_start = datetime.datetime(
-                current_date.year, 
-                current_date.month, 
-                current_date.day,
-                int(start_time),
-                int((start_time % 1) * 60),
-                0  # Agregamos segundos explícitamente
-            )
-            entry_end = datetime.datetime(
-                current_date.year, 
-                current_date.month, 
-                current_date.day,
-                int(end_time),
-                int((end_time % 1) * 60),
-                0  # Agregamos segundos explícitamente
-            )
-            
+            day_start = epoch_minutes(current_date)
             entry = time_entry.copy()
-            # Formato exacto que requiere Clockify: "2018-11-29T13:00:46Z"
-            entry['start'] = entry_start.strftime('%Y-%m-%dT%H:%M:00Z')
-            entry['end'] = entry_end.strftime('%Y-%m-%dT%H:%M:00Z')
+            # Formato exacto que requiere Clockify: "2018-11-29T13:00:00Z"
+            entry['start'] = format_clockify_time(day_start + start_time)
+            entry['end'] = format_clockify_time(day_start + end_time)
             entries.append(entry)
             
         current_date += datetime.timedelta(days=1)
@@ -90,50 +87,63 @@ def csv_to_dummy_entries(csv_file, project_id, project_task_id, client_name):
                 entries.append(entry)
     
     if not entries:
-        print(f"No se encontraron entradas para el cliente {client_name}")
+        logging.getLogger('clockify_automation').warning(f"No se encontraron entradas para el cliente {client_name}")
         
     return entries
 
-def format_time(hours: float) -> str:
-    """Convierte horas decimales a formato HH:MM."""
-    h = int(hours)
-    m = int((hours - h) * 60)
-    return f"{h:02d}:{m:02d}"
-
-def is_time_range_blocked(day: int, start_time: float, end_time: float, lunch_start: float, lunch_end: float, 
+def _meetings_key(day: int, client: Dict, year: int, month: int) -> Tuple[Tuple[str, int, int], ...]:
+    """Daily meetings del día en minutos, como tupla inmutable para memoizar por cliente y tipo de día."""
+    return tuple(
+        (meeting['description'], hours_to_minutes(meeting['start_time']), hours_to_minutes(meeting['end_time']))
+        for meeting in get_daily_meetings_for_day(day, client, year, month)
+    )
+
+@functools.lru_cache(maxsize=None)
+def _meeting_index(meetings: Tuple[Tuple[str, int, int], ...]) -> Optional[IntervalIndex]:
+    """Índice de intervalos de las meetings; None si alguna está vacía o invertida."""
+    if any(end <= start for _, start, end in meetings):
+        return None
+    return IntervalIndex((start, end) for _, start, end in meetings)
+
+def _overlaps_meeting(start_time: int, end_time: int, meeting_start: int, meeting_end: int) -> bool:
+    return (
+        (start_time >= meeting_start and start_time < meeting_end) or
+        (end_time > meeting_start and end_time <= meeting_end) or
+        (start_time <= meeting_start and end_time >= meeting_end)
+    )
+
+def is_time_range_blocked(day: int, start_time: int, end_time: int, lunch_start: int, lunch_end: int, 
                          client: Dict, year: int, month: int) -> bool:
-    """Verifica si un rango de tiempo está bloqueado por almuerzo o daily meetings."""
-    logger = logging.getLogger('clockify_automation')
-    logger.debug(f"Verificando bloqueo para: {format_time(start_time)} - {format_time(end_time)}")
+    """Verifica si un rango de tiempo (en minutos) está bloqueado por almuerzo o daily meetings."""
+    # Se llama por cada tramo de cada tarea: sin DEBUG activo no se formatea nada
+    debug = _logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        _logger.debug("Verificando bloqueo para: %s - %s", format_minutes(start_time), format_minutes(end_time))
     
     # Verificar almuerzo
     if start_time < lunch_end and end_time > lunch_start:
-        logger.debug(f"Bloqueo por almuerzo: {format_time(start_time)} - {format_time(end_time)}")
-        logger.debug(f"Horario almuerzo: {format_time(lunch_start)} - {format_time(lunch_end)}")
+        if debug:
+            _logger.debug("Bloqueo por almuerzo: %s - %s", format_minutes(start_time), format_minutes(end_time))
+            _logger.debug("Horario almuerzo: %s - %s", format_minutes(lunch_start), format_minutes(lunch_end))
         return True
         
     # Verificar daily meetings
-    daily_meetings = get_daily_meetings_for_day(day, client, year, month)
-    logger.debug(f"Daily meetings para el día {day}: {len(daily_meetings)}")
-    
-    for meeting in daily_meetings:
-        meeting_start = float(meeting['start_time'])
-        meeting_end = float(meeting['end_time'])
-        
-        logger.debug(f"Comparando con daily meeting: {format_time(meeting_start)} - {format_time(meeting_end)}")
-        
-        if (
-            (start_time >= meeting_start and start_time < meeting_end) or
-            (end_time > meeting_start and end_time <= meeting_end) or
-            (start_time <= meeting_start and end_time >= meeting_end)
-        ):
-            logger.debug("¡BLOQUEO! Solapamiento detectado con daily meeting")
-            logger.debug(f"Tarea: {format_time(start_time)} - {format_time(end_time)}")
-            logger.debug(f"Meeting: {format_time(meeting_start)} - {format_time(meeting_end)}")
-            return True
-            
-    logger.debug("No se detectó bloqueo")
-    return False
+    meetings = _meetings_key(day, client, year, month)
+    if not meetings:
+        return False
+
+    index = _meeting_index(meetings)
+    if index is not None and start_time < end_time:
+        blocked = index.overlaps(start_time, end_time)
+    elif index is not None and start_time == end_time:
+        # Un rango vacío queda bloqueado si cae dentro de una meeting, bordes incluidos
+        blocked = index.contains(start_time)
+    else:
+        blocked = any(_overlaps_meeting(start_time, end_time, start, end) for _, start, end in meetings)
+
+    if blocked and debug:
+        _logger.debug("¡BLOQUEO! Solapamiento detectado con daily meeting")
+    return blocked
 
 def get_daily_meetings_for_day(day: int, client: Dict, year: int, month: int) -> List[Dict]:
     """Obtiene las daily meetings para un día específico del cliente."""
@@ -146,42 +156,36 @@ def get_daily_meetings_for_day(day: int, client: Dict, year: int, month: int) ->
         
     return client['daily_meetings']
 
-def get_available_blocks(day: int, start_time: float, end_time: float, lunch_start: float, lunch_end: float, 
-                        client: Dict, year: int, month: int) -> List[Tuple[float, float]]:
-    """Obtiene todos los bloques de tiempo disponibles en el día."""
-    logger = logging.getLogger('clockify_automation')
-    logger.info(f"Analizando bloques disponibles para el día {day}")
+@functools.lru_cache(maxsize=None)
+def _block_template(start_time: int, end_time: int, lunch_start: int, lunch_end: int,
+                    meetings: Tuple[Tuple[str, int, int], ...]) -> Tuple[Tuple[int, int], ...]:
+    """
+    Bloques libres de un día, en minutos. Solo dependen del horario del cliente
+    y de sus meetings (ninguna los fines de semana), así que se calculan una vez.
+    """
+    debug = _logger.isEnabledFor(logging.DEBUG)
     blocks = []
     
     # Crear lista ordenada de todos los eventos bloqueados
-    blocked_periods = []
-    
-    # Agregar almuerzo
-    blocked_periods.append({
-        'type': 'lunch',
-        'start': lunch_start,
-        'end': lunch_end
-    })
-    
-    # Agregar daily meetings del día
-    daily_meetings = get_daily_meetings_for_day(day, client, year, month)
-    for meeting in daily_meetings:
+    blocked_periods = [{'type': 'lunch', 'start': lunch_start, 'end': lunch_end}]
+    for description, meeting_start, meeting_end in meetings:
         blocked_periods.append({
             'type': 'meeting',
-            'description': meeting['description'],
-            'start': float(meeting['start_time']),
-            'end': float(meeting['end_time'])
+            'description': description,
+            'start': meeting_start,
+            'end': meeting_end
         })
     
     blocked_periods.sort(key=lambda x: x['start'])
     
-    logger.debug("Períodos bloqueados:")
-    for period in blocked_periods:
-        period_type = period['type']
-        if period_type == 'meeting':
-            logger.debug(f"Daily Meeting '{period['description']}': {format_time(period['start'])} - {format_time(period['end'])}")
-        else:
-            logger.debug(f"Almuerzo: {format_time(period['start'])} - {format_time(period['end'])}")
+    if debug:
+        _logger.debug("Períodos bloqueados:")
+        for period in blocked_periods:
+            if period['type'] == 'meeting':
+                _logger.debug("Daily Meeting '%s': %s - %s", period['description'],
+                              format_minutes(period['start']), format_minutes(period['end']))
+            else:
+                _logger.debug("Almuerzo: %s - %s", format_minutes(period['start']), format_minutes(period['end']))
     
     # Encontrar bloques disponibles entre eventos bloqueados
     current_time = start_time
@@ -193,7 +197,9 @@ def get_available_blocks(day: int, start_time: float, end_time: float, lunch_sta
         # Si hay tiempo disponible antes del período bloqueado
         if current_time < period_start:
             blocks.append((current_time, period_start))
-            logger.debug(f"Agregando bloque disponible: {format_time(current_time)} - {format_time(period_start)}")
+            if debug:
+                _logger.debug("Agregando bloque disponible: %s - %s",
+                              format_minutes(current_time), format_minutes(period_start))
         
         # Actualizar el tiempo actual al final del período bloqueado
         current_time = max(current_time, period_end)
@@ -201,53 +207,89 @@ def get_available_blocks(day: int, start_time: float, end_time: float, lunch_sta
     # Agregar bloque final si queda tiempo disponible
     if current_time < end_time:
         blocks.append((current_time, end_time))
-        logger.debug(f"Agregando bloque final disponible: {format_time(current_time)} - {format_time(end_time)}")
+        if debug:
+            _logger.debug("Agregando bloque final disponible: %s - %s",
+                          format_minutes(current_time), format_minutes(end_time))
     
-    # Verificar y ajustar bloques
-    final_blocks = []
-    for start, end in blocks:
-        # Solo agregar bloques que tengan al menos 15 minutos
-        if end - start >= 0.25:
-            final_blocks.append((start, end))
+    # Solo conservar bloques que tengan al menos 15 minutos
+    final_blocks = tuple((start, end) for start, end in blocks if end - start >= MIN_ENTRY_MINUTES)
             
-    logger.debug("\nBloques disponibles finales:")
-    for start, end in final_blocks:
-        logger.debug(f"{format_time(start)} - {format_time(end)}")
+    if debug:
+        _logger.debug("Bloques disponibles finales:")
+        for start, end in final_blocks:
+            _logger.debug("%s - %s", format_minutes(start), format_minutes(end))
     
     return final_blocks
 
-def dummy_to_time_entries(entries_wo_time: List[Dict], workspace_id: str, year: int, month: int, 
-                         start_day: int, end_day: int, start_time: float, end_time: float, 
-                         lunch_start: float, lunch_end: float, client: Dict) -> List[Dict]:
-    """
-    Genera entradas de tiempo evitando solapamientos y maximizando el uso del tiempo disponible.
-    """
+def get_available_blocks(day: int, start_time: int, end_time: int, lunch_start: int, lunch_end: int, 
+                        client: Dict, year: int, month: int) -> List[Tuple[int, int]]:
+    """Obtiene todos los bloques de tiempo disponibles en el día, en minutos desde medianoche."""
+    _logger.debug("Analizando bloques disponibles para el día %s", day)
+    meetings = _meetings_key(day, client, year, month)
+    return list(_block_template(start_time, end_time, lunch_start, lunch_end, meetings))
+
+def group_tasks_by_day(entries_wo_time: List[Dict], start_day: int, end_day: int,
+                       project_id: str, task_id: str) -> Dict[int, List[Dict]]:
+    """Agrupa las tareas por día en una sola pasada, conservando el orden de entrada."""
     logger = logging.getLogger('clockify_automation')
     tasks_by_day = {}
-    time_entries = []
+    for entry in entries_wo_time:
+        try:
+            entry_day = int(entry['Dia'])
+            description = entry['Tarea']
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Error procesando entrada: {entry}. Error: {str(e)}")
+            continue
+        if start_day <= entry_day <= end_day:
+            tasks_by_day.setdefault(entry_day, []).append({
+                'description': description,
+                'projectId': project_id,
+                'taskId': task_id,
+                'billable': True
+            })
+    return tasks_by_day
 
-    # Obtener IDs de Clockify
+def get_clockify_ids(workspace_id: str, client: Dict) -> Optional[Tuple[str, str]]:
+    """Obtiene los IDs de proyecto y tarea de Clockify configurados para el cliente."""
+    logger = logging.getLogger('clockify_automation')
     try:
         project = get_project_by_name(workspace_id, client['name'], client['project'])
         if not project:
             logger.error(f"No se encontró el proyecto: {client['project']}")
-            return []
+            return None
         project_id = project['id']
 
         task = get_project_task_by_name(workspace_id, project_id, client['task'])
         if not task:
             logger.error(f"No se encontró la tarea: {client['task']}")
-            return []
-        task_id = task['id']
+            return None
+        return project_id, task['id']
 
     except Exception as e:
         logger.error(f"Error obteniendo IDs de Clockify: {str(e)}")
+        return None
+
+@timed('schedule')
+def dummy_to_time_entries(entries_wo_time: List[Dict], workspace_id: str, year: int, month: int, 
+                         start_day: int, end_day: int, start_time: int, end_time: int, 
+                         lunch_start: int, lunch_end: int, client: Dict) -> List[Dict]:
+    """
+    Genera entradas de tiempo evitando solapamientos y maximizando el uso del tiempo disponible.
+    Todos los horarios se reciben y se reparten en minutos enteros desde medianoche.
+    """
+    logger = logging.getLogger('clockify_automation')
+    time_entries = []
+
+    # Obtener IDs de Clockify
+    ids = get_clockify_ids(workspace_id, client)
+    if not ids:
         return []
+    project_id, task_id = ids
 
     # Procesar daily meetings primero si están configuradas
     if client.get('daily_meetings'):
-        start_date = datetime.datetime(year, month, start_day)
-        end_date = datetime.datetime(year, month, end_day)
+        start_date = datetime.date(year, month, start_day)
+        end_date = datetime.date(year, month, end_day)
         
         for meeting in client['daily_meetings']:
             daily_entries = create_daily_time_entries(
@@ -256,50 +298,42 @@ def dummy_to_time_entries(entries_wo_time: List[Dict], workspace_id: str, year:
                 meeting['description'],
                 start_date,
                 end_date,
-                meeting['start_time'],    # Usar start_time de la configuración
-                meeting['end_time']       # Usar end_time de la configuración
+                hours_to_minutes(meeting['start_time']),    # Usar start_time de la configuración
+                hours_to_minutes(meeting['end_time'])       # Usar end_time de la configuración
             )
             time_entries.extend(daily_entries)
             logger.info(f"Agregadas {len(daily_entries)} entradas para daily meeting: {meeting['description']}")
 
     # Agrupar tareas por día
-    for day in range(start_day, end_day + 1):
-        tasks_by_day[day] = []
-        for entry in entries_wo_time:
-            try:
-                entry_day = int(entry['Dia'])
-                if entry_day == day:
-                    task_entry = {
-                        'description': entry['Tarea'],
-                        'projectId': project_id,
-                        'taskId': task_id,
-                        'billable': True
-                    }
-                    tasks_by_day[day].append(task_entry)
-            except (ValueError, KeyError) as e:
-                logger.warning(f"Error procesando entrada: {entry}. Error: {str(e)}")
-                continue
+    tasks_by_day = group_tasks_by_day(entries_wo_time, start_day, end_day, project_id, task_id)
 
     # Procesar cada día
     for day in range(start_day, end_day + 1):
-        if day not in tasks_by_day or not tasks_by_day[day]:
+        if not tasks_by_day.get(day):
+            continue
+
+        # Los fines de semana no se registran horas
+        date = datetime.date(year, month, day)
+        if date.weekday() >= 5:
             continue
             
-        logger.info(f"Procesando día {day}")
+        logger.info("Procesando día %s", day)
         daily_tasks = tasks_by_day[day]
+        day_start = epoch_minutes(date)
         available_blocks = get_available_blocks(
             day, start_time, end_time, lunch_start, lunch_end, 
             client, year, month
         )
         
         if not available_blocks:
-            logger.warning(f"No hay bloques disponibles para el día {day}")
+            logger.warning("No hay bloques disponibles para el día %s", day)
             continue
 
         total_available_time = sum(end - start for start, end in available_blocks)
-        avg_duration = total_available_time / len(daily_tasks)
-        logger.info(f"Tiempo total disponible: {format_time(total_available_time)}")
-        logger.debug(f"Duración promedio por tarea: {format_time(avg_duration)}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("Tiempo total disponible: %s", format_minutes(total_available_time))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Duración promedio por tarea: %s", format_minutes(total_available_time // len(daily_tasks)))
         
         if len(daily_tasks) == 1:
             task = daily_tasks[0]
@@ -309,66 +343,55 @@ def dummy_to_time_entries(entries_wo_time: List[Dict], workspace_id: str, year:
                 if is_time_range_blocked(day, block_start, block_end, lunch_start, lunch_end, client, year, month):
                     continue
                 
-                if block_end - block_start >= 0.25:  # Mínimo 15 minutos
-                    time_entry = task.copy()
-                    time_entry['start'] = datetime.datetime(
-                        year, month, day,
-                        int(block_start),
-                        int((block_start % 1) * 60)
-                    ).isoformat() + 'Z'
-                    
-                    time_entry['end'] = datetime.datetime(
-                        year, month, day,
-                        int(block_end),
-                        int((block_end % 1) * 60)
-                    ).isoformat() + 'Z'
-                    
-                    if datetime.datetime(year, month, day).weekday() < 5:
-                        time_entries.append(time_entry)
+                time_entry = task.copy()
+                time_entry['start'] = format_clockify_time(day_start + block_start)
+                time_entry['end'] = format_clockify_time(day_start + block_end)
+                time_entries.append(time_entry)
         else:
             current_task_index = 0
             for block_start, block_end in available_blocks:
                 block_duration = block_end - block_start
-                tasks_in_block = max(1, int(block_duration / avg_duration))
+                # Equivale a int(block_duration / duración promedio), sin floats
+                tasks_in_block = max(1, block_duration * len(daily_tasks) // total_available_time)
                 
                 if current_task_index >= len(daily_tasks):
                     break
-                    
-                time_per_task = block_duration / tasks_in_block
                 
-                for _ in range(tasks_in_block):
+                for slot in range(tasks_in_block):
                     if current_task_index >= len(daily_tasks):
                         break
                         
                     task = daily_tasks[current_task_index]
-                    task_start = block_start
-                    task_end = min(block_end, task_start + time_per_task)
+                    # Cortes exactos: el último termina justo al final del bloque
+                    task_start = block_start + slot * block_duration // tasks_in_block
+                    task_end = block_start + (slot + 1) * block_duration // tasks_in_block
                     
+                    if task_end - task_start < MIN_ENTRY_MINUTES:
+                        current_task_index += 1
+                        continue
+
                     if is_time_range_blocked(day, task_start, task_end, lunch_start, lunch_end, client, year, month):
                         continue
                     
-                    if task_end - task_start >= 0.25:  # Mínimo 15 minutos
-                        time_entry = task.copy()
-                        time_entry['start'] = datetime.datetime(
-                            year, month, day,
-                            int(task_start),
-                            int((task_start % 1) * 60)
-                        ).isoformat() + 'Z'
-                        
-                        time_entry['end'] = datetime.datetime(
-                            year, month, day,
-                            int(task_end),
-                            int((task_end % 1) * 60)
-                        ).isoformat() + 'Z'
-                        
-                        if datetime.datetime(year, month, day).weekday() < 5:
-                            time_entries.append(time_entry)
-                    
-                    block_start = task_end
+                    time_entry = task.copy()
+                    time_entry['start'] = format_clockify_time(day_start + task_start)
+                    time_entry['end'] = format_clockify_time(day_start + task_end)
+                    time_entries.append(time_entry)
                     current_task_index += 1
 
     return time_entries
 
+def get_scheduler(name: str):
+    """Devuelve la función de planificación configurada en `execution.scheduler`."""
+    if name == 'pandas':
+        # Import diferido: pandas solo se carga si se elige este motor
+        from clockify.vectorized_scheduler import dummy_to_time_entries_vectorized
+        return dummy_to_time_entries_vectorized
+    if name != 'python':
+        logging.getLogger('clockify_automation').warning(
+            f"Motor de planificación desconocido: {name}, se usa 'python'")
+    return dummy_to_time_entries
+
 def save_entries_to_csv(entries, output_file='time_entries.csv'):
     # Define las columnas que queremos guardar
     fieldnames = ['description', 'start', 'end', 'billable', 'projectId', 'taskId']
@@ -392,17 +415,24 @@ def save_entries_to_csv(entries, output_file='time_entries.csv'):
                 'taskId': entry['taskId']
             })
     
-    print(f"Entries saved to {output_file}")
+    # Por el logger y no con print: el QueueListener escribe en otro hilo y se mezclarían las líneas
+    logging.getLogger('clockify_automation').info(f"Entradas guardadas en {output_file}")
 
-def main() -> bool:
-    """Función principal para procesar el CSV y crear entradas en Clockify."""
+def main(tasks_by_client: Optional[Dict[str, List[Dict]]] = None, input_file: Optional[str] = None,
+         ctx: Optional[AppContext] = None) -> bool:
+    """
+    Función principal para crear entradas en Clockify.
+    Recibe las tareas ya agrupadas por cliente (en minúsculas); si no se pasan,
+    se consultan por cliente en el store de tareas `input_file` (por defecto
+    `execution.task_store` o horarios.csv). Sin `ctx` se construye uno propio.
+    """
+    logger = logging.getLogger('clockify_automation')
+    task_store = None
+    ledger = None
     try:
-        global logger
-
-        config = load_config()
-
-        if not logger:
-            logger = setup_logger(config)
+        ctx = ctx or build_context()
+        config = ctx.config
+        logger = ctx.logger
 
         logger.info("Iniciando procesamiento de tareas para Clockify")
 
@@ -419,6 +449,9 @@ def main() -> bool:
             return False
 
         logger.info(f"Procesando para workspace: {workspace_name}")
+
+        if tasks_by_client is None:
+            task_store = open_task_store(input_file or config['execution'].get('task_store') or 'horarios.csv')
         
         # Obtener workspace_id
         workspace = get_workspace_by_name(workspace_name)
@@ -429,16 +462,44 @@ def main() -> bool:
         workspace_id = workspace['id']
         logger.debug(f"Workspace ID: {workspace_id}")
 
+        clockify_config = config.get('clockify', {})
+        journal = journal_from_config(config)
+        success = True
+
+        # Registro local del plan y de lo enviado en esta ejecución
+        dry_run = config['execution'].get('dry_run', True)
+        ledger = ledger_from_config(config)
+        run_id = ledger.start_run(workspace_id, dry_run, time_config) if ledger is not None else None
+        period_days = tuple(
+            datetime.date(time_config['year'], time_config['month'], time_config[day]).isoformat()
+            for day in ('start_day', 'end_day')
+        )
+
+        # Motor de planificación: 'python' (por defecto) o 'pandas'
+        schedule_entries = get_scheduler(config['execution'].get('scheduler', 'python'))
+
+        # Entradas que ya existen en Clockify para el período, en un solo barrido
+        overlap_policy = config['execution'].get('overlap_policy', 'skip')
+        existing_index = None
+        if overlap_policy != 'off':
+            with ctx.metrics.stage('overlap'):
+                existing_index = build_existing_index(
+                    ctx.clockify, workspace_id,
+                    time_config['year'], time_config['month'],
+                    time_config['start_day'], time_config['end_day']
+                )
+
         # Procesar cada cliente
         for client_config in clients:
             client_name = client_config['name']
             logger.info(f"Procesando cliente: {client_name}")
             
-            # Leer tareas del CSV
-            entries_wo_time = []
-            with open('horarios.csv', 'r', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-                entries_wo_time = [row for row in reader if row['Cliente'].lower() == client_name.lower()]
+            if task_store is not None:
+                entries_wo_time = task_store.tasks_for_client(
+                    client_name, time_config['start_day'], time_config['end_day'], time_config
+                )
+            else:
+                entries_wo_time = tasks_by_client.get(client_name.lower(), [])
 
             if not entries_wo_time:
                 logger.warning(f"No se encontraron tareas para el cliente: {client_name}")
@@ -447,17 +508,17 @@ def main() -> bool:
             logger.info(f"Se encontraron {len(entries_wo_time)} tareas para {client_name}")
 
             # Generar entradas de tiempo
-            time_entries = dummy_to_time_entries(
+            time_entries = schedule_entries(
                 entries_wo_time=entries_wo_time,
                 workspace_id=workspace_id,
                 year=time_config['year'],
                 month=time_config['month'],
                 start_day=time_config['start_day'],
                 end_day=time_config['end_day'],
-                start_time=client_config.get('start_time', 9),
-                end_time=client_config.get('end_time', 18),
-                lunch_start=time_config['lunch_start'],
-                lunch_end=time_config['lunch_end'],
+                start_time=hours_to_minutes(client_config.get('start_time', 9)),
+                end_time=hours_to_minutes(client_config.get('end_time', 18)),
+                lunch_start=hours_to_minutes(time_config['lunch_start']),
+                lunch_end=hours_to_minutes(time_config['lunch_end']),
                 client=client_config
             )
 
@@ -466,27 +527,74 @@ def main() -> bool:
                 continue
 
             logger.info(f"Se generaron {len(time_entries)} entradas de tiempo para {client_name}")
+            ctx.metrics.inc('scheduled_entries_total', len(time_entries),
+                            help="Entradas de tiempo generadas por el scheduler", client=client_name)
+
+            if existing_index is not None:
+                time_entries = filter_existing(time_entries, existing_index, overlap_policy)
+                if not time_entries:
+                    logger.info(f"Todas las entradas de {client_name} ya existen en Clockify")
+                    continue
+
+            if ledger is not None:
+                ledger.record_plan(run_id, client_name, time_entries, STATUS_DRY_RUN if dry_run else STATUS_PLANNED)
 
             # Si no es dry run, crear entradas en Clockify
-            if not config['execution'].get('dry_run', True):
-                for entry in time_entries:
-                    try:
-                        create_time_entry(workspace_id, entry)
-                        logger.debug(f"Entrada creada: {entry.get('description', 'Sin descripción')}")
-                    except Exception as e:
-                        logger.error(f"Error creando entrada: {str(e)}")
-                        return False
-                logger.info(f"Entradas creadas exitosamente para {client_name}")
+            if not dry_run:
+                pending_entries = journal.pending(client_name, time_entries)
+                if ledger is not None:
+                    # El ledger también sabe qué aceptó Clockify, aunque el journal se haya borrado
+                    submitted = ledger.submitted_hashes(client_name, *period_days)
+                    pending_entries = [entry for entry in pending_entries
+                                       if entry_hash(client_name, entry) not in submitted]
+                skipped = len(time_entries) - len(pending_entries)
+                if skipped:
+                    logger.info(f"Se omiten {skipped} entradas ya enviadas en ejecuciones anteriores")
+                    if ledger is not None:
+                        pending_ids = {id(entry) for entry in pending_entries}
+                        ledger.mark(run_id, client_name,
+                                    [entry for entry in time_entries if id(entry) not in pending_ids],
+                                    STATUS_ALREADY_SUBMITTED)
+
+                results = submit_time_entries(
+                    workspace_id,
+                    pending_entries,
+                    client=ctx.clockify,
+                    max_workers=clockify_config.get('max_workers', DEFAULT_MAX_WORKERS),
+                    journal=journal,
+                    client_name=client_name
+                )
+                if ledger is not None:
+                    ledger.record_results(run_id, client_name, results)
+                failed = [result for result in results if not result['ok']]
+                if failed:
+                    logger.error(f"No se pudieron crear {len(failed)} entradas para {client_name}")
+                    success = False
+                else:
+                    logger.info(f"Entradas creadas exitosamente para {client_name}")
             else:
                 logger.info("Modo dry run - No se crearon entradas en Clockify")
-                save_entries_to_csv(time_entries, f'time_entries_{client_name}.csv')
+                output_dir = config['execution'].get('output_dir', '.')
+                # En modo rango, un archivo por tramo para que el siguiente no lo pise
+                suffix = f"_{period_id(time_config).split('/')[0]}" if is_range_mode(time_config) else ''
+                save_entries_to_csv(time_entries, os.path.join(output_dir, f'time_entries_{client_name}{suffix}.csv'))
+
+        if not success:
+            logger.error("Proceso completado con errores de envío")
+            return False
 
-        logger.info("Proceso completado exitosamente")
+        # El mensaje final de éxito lo registra quien llama (app, cli o __main__), una sola vez por ejecución
         return True
 
     except Exception as e:
         logger.error(f"Error en el procesamiento: {str(e)}", exc_info=True)
         return False
+    finally:
+        if task_store is not None:
+            task_store.close()
+        if ledger is not None:
+            ledger.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if main():
+        logging.getLogger('clockify_automation').info("Proceso completado exitosamente")
\ No newline at end of file
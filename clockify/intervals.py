@@ -0,0 +1,31 @@
+import bisect
+from typing import Iterable, List, Tuple
+
+class IntervalIndex:
+    """
+    Conjunto estático de intervalos ordenados por inicio, con el máximo
+    acumulado de los fines. Cada consulta de solapamiento es una búsqueda binaria.
+    Sirve para cualquier tipo comparable (horas decimales, minutos, datetimes).
+    """
+
+    def __init__(self, intervals: Iterable[Tuple]):
+        ordered = sorted(intervals)
+        self.starts: List = [start for start, _ in ordered]
+        self.max_ends: List = []
+        current = None
+        for _, end in ordered:
+            current = end if current is None or end > current else current
+            self.max_ends.append(current)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def overlaps(self, start, end) -> bool:
+        """True si algún intervalo se solapa con [start, end) (bordes que solo se tocan no cuentan)."""
+        i = bisect.bisect_left(self.starts, end)
+        return i > 0 and self.max_ends[i - 1] > start
+
+    def contains(self, point) -> bool:
+        """True si algún intervalo cerrado [inicio, fin] contiene el punto."""
+        i = bisect.bisect_right(self.starts, point)
+        return i > 0 and self.max_ends[i - 1] >= point
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Set
+
+def entry_hash(client_name: str, entry: Dict) -> str:
+    """Hash de contenido de una entrada: cliente, descripción, inicio y fin."""
+    key = '\x1f'.join([
+        client_name.lower().strip(),
+        entry.get('description', ''),
+        str(entry['start']),
+        str(entry['end'])
+    ])
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+class SubmissionJournal:
+    """
+    Journal append-only (JSONL) de los envíos a Clockify.
+    Permite que una nueva ejecución omita las entradas que ya se crearon y
+    guarda en un archivo dead-letter las que fallaron definitivamente.
+    """
+
+    def __init__(self, path: str = 'submission_journal.jsonl', dead_letter_path: str = 'dead_letter.jsonl'):
+        self.path = path
+        self.dead_letter_path = dead_letter_path
+        self.lock = threading.Lock()
+        self.succeeded: Set[str] = set()
+        self.logger = logging.getLogger('clockify_automation')
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Una línea truncada por un corte a mitad de escritura
+                    self.logger.warning(f"Línea inválida en el journal {self.path}, se ignora")
+                    continue
+                if record.get('status') == 'ok':
+                    self.succeeded.add(record['hash'])
+        self.logger.debug(f"Journal cargado: {len(self.succeeded)} entradas ya enviadas")
+
+    def _append(self, path: str, record: Dict):
+        with self.lock:
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def is_done(self, entry_hash: str) -> bool:
+        return entry_hash in self.succeeded
+
+    def pending(self, client_name: str, entries: List[Dict]) -> List[Dict]:
+        """Filtra las entradas que todavía no se enviaron con éxito."""
+        return [entry for entry in entries if not self.is_done(entry_hash(client_name, entry))]
+
+    def record_success(self, client_name: str, entry: Dict, response: Dict):
+        h = entry_hash(client_name, entry)
+        self._append(self.path, {
+            'hash': h,
+            'status': 'ok',
+            'client': client_name,
+            'id': (response or {}).get('id')
+        })
+        with self.lock:
+            self.succeeded.add(h)
+
+    def record_failure(self, client_name: str, workspace_id: str, entry: Dict, error: str):
+        h = entry_hash(client_name, entry)
+        self._append(self.path, {'hash': h, 'status': 'failed', 'client': client_name, 'error': error})
+        self._append(self.dead_letter_path, {
+            'hash': h,
+            'client': client_name,
+            'workspace_id': workspace_id,
+            'entry': entry,
+            'error': error
+        })
+
+    def load_dead_letters(self) -> List[Dict]:
+        """Devuelve las entradas del dead-letter que todavía no se enviaron con éxito."""
+        if not os.path.exists(self.dead_letter_path):
+            return []
+        pending = {}
+        with open(self.dead_letter_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if not self.is_done(record['hash']):
+                    pending[record['hash']] = record
+        return list(pending.values())
+
+    def compact_dead_letters(self) -> int:
+        """
+        Reescribe el dead-letter solo con las entradas que siguen sin enviarse.
+        Se escribe a un temporal y se renombra, así un corte nunca lo deja a
+        medias. Devuelve cuántas entradas quedan.
+        """
+        records = self.load_dead_letters()
+        tmp_path = f"{self.dead_letter_path}.tmp"
+        with self.lock:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.dead_letter_path)
+        return len(records)
+
+def journal_from_config(config: Dict) -> SubmissionJournal:
+    execution_config = config.get('execution', {})
+    return SubmissionJournal(
+        execution_config.get('journal_file', 'submission_journal.jsonl'),
+        execution_config.get('dead_letter_file', 'dead_letter.jsonl')
+    )
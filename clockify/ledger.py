@@ -0,0 +1,172 @@
+import datetime
+import logging
+import sqlite3
+import uuid
+from typing import Dict, Iterable, List, Mapping, Optional
+
+from clockify.journal import entry_hash
+
+# Estados de una entrada en el ledger
+STATUS_PLANNED = 'planned'
+STATUS_DRY_RUN = 'dry_run'
+STATUS_SUBMITTED = 'submitted'
+STATUS_FAILED = 'failed'
+STATUS_ALREADY_SUBMITTED = 'already_submitted'
+
+class Ledger:
+    """
+    Registro local (SQLite) de las entradas generadas y enviadas a Clockify:
+    el plan de cada ejecución, el estado del envío y el ID que devolvió
+    Clockify. Se escribe en transacciones por lote, una por cliente.
+    """
+
+    def __init__(self, path: str = 'ledger.db'):
+        self.path = path
+        self.logger = logging.getLogger('clockify_automation')
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                workspace_id TEXT,
+                dry_run INTEGER NOT NULL,
+                period_start TEXT,
+                period_end TEXT
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                id INTEGER PRIMARY KEY,
+                run_id TEXT NOT NULL REFERENCES runs (run_id),
+                client TEXT NOT NULL,
+                client_key TEXT NOT NULL,
+                day TEXT NOT NULL,
+                start TEXT NOT NULL,
+                end TEXT NOT NULL,
+                description TEXT,
+                project_id TEXT,
+                task_id TEXT,
+                entry_hash TEXT NOT NULL,
+                status TEXT NOT NULL,
+                clockify_id TEXT,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entries_run ON entries (run_id);
+            CREATE INDEX IF NOT EXISTS idx_entries_client_day ON entries (client_key, day);
+            CREATE INDEX IF NOT EXISTS idx_entries_clockify_id ON entries (clockify_id);
+            CREATE INDEX IF NOT EXISTS idx_entries_hash ON entries (entry_hash, status);
+        """)
+
+    def close(self):
+        self.connection.close()
+
+    def start_run(self, workspace_id: str, dry_run: bool, period: Optional[Mapping] = None) -> str:
+        """Registra una ejecución nueva y devuelve su run_id."""
+        run_id = uuid.uuid4().hex
+        period_start = period_end = None
+        if period:
+            period_start = datetime.date(period['year'], period['month'], period['start_day']).isoformat()
+            period_end = datetime.date(period['year'], period['month'], period['end_day']).isoformat()
+        with self.connection:
+            self.connection.execute(
+                "INSERT INTO runs (run_id, started_at, workspace_id, dry_run, period_start, period_end) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, _now(), workspace_id, int(dry_run), period_start, period_end)
+            )
+        self.logger.debug(f"Ledger: ejecución {run_id}")
+        return run_id
+
+    def record_plan(self, run_id: str, client_name: str, entries: Iterable[Dict],
+                    status: str = STATUS_PLANNED) -> int:
+        """Guarda las entradas generadas para un cliente en una sola transacción."""
+        now = _now()
+        rows = [
+            (run_id, client_name, client_name.lower(), entry['start'][:10], entry['start'], entry['end'],
+             entry.get('description'), entry.get('projectId'), entry.get('taskId'),
+             entry_hash(client_name, entry), status, now)
+            for entry in entries
+        ]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO entries (run_id, client, client_key, day, start, end, description, "
+                "project_id, task_id, entry_hash, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+
+    def record_results(self, run_id: str, client_name: str, results: Iterable[Dict]) -> int:
+        """Actualiza estado, ID de Clockify y error de los envíos, en una sola transacción."""
+        now = _now()
+        rows = []
+        for result in results:
+            response = result.get('response') or {}
+            rows.append((
+                STATUS_SUBMITTED if result['ok'] else STATUS_FAILED,
+                response.get('id') if isinstance(response, dict) else None,
+                result.get('error'),
+                now,
+                run_id,
+                entry_hash(client_name, result['entry'])
+            ))
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE entries SET status = ?, clockify_id = ?, error = ?, updated_at = ? "
+                "WHERE run_id = ? AND entry_hash = ?",
+                rows
+            )
+        return len(rows)
+
+    def mark(self, run_id: str, client_name: str, entries: Iterable[Dict], status: str) -> int:
+        """Cambia el estado de un grupo de entradas del plan (p. ej. las ya enviadas antes)."""
+        now = _now()
+        rows = [(status, now, run_id, entry_hash(client_name, entry)) for entry in entries]
+        with self.connection:
+            self.connection.executemany(
+                "UPDATE entries SET status = ?, updated_at = ? WHERE run_id = ? AND entry_hash = ?", rows
+            )
+        return len(rows)
+
+    def entries_for(self, client_name: str, start_day: Optional[str] = None, end_day: Optional[str] = None,
+                    status: Optional[str] = STATUS_SUBMITTED) -> List[Dict]:
+        """
+        Entradas de un cliente entre dos días ('YYYY-MM-DD', inclusive), sin
+        llamar a la API. Por defecto, solo las enviadas con éxito.
+        """
+        query = "SELECT * FROM entries WHERE client_key = ?"
+        params: List = [client_name.lower()]
+        if start_day:
+            query += " AND day >= ?"
+            params.append(start_day)
+        if end_day:
+            query += " AND day <= ?"
+            params.append(end_day)
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY start"
+        return [dict(row) for row in self.connection.execute(query, params)]
+
+    def submitted_hashes(self, client_name: str, start_day: Optional[str] = None,
+                         end_day: Optional[str] = None) -> set:
+        """Hashes de las entradas de un cliente que Clockify ya aceptó, opcionalmente entre dos días."""
+        query = "SELECT DISTINCT entry_hash FROM entries WHERE client_key = ? AND status = ?"
+        params: List = [client_name.lower(), STATUS_SUBMITTED]
+        if start_day:
+            query += " AND day >= ?"
+            params.append(start_day)
+        if end_day:
+            query += " AND day <= ?"
+            params.append(end_day)
+        return {row[0] for row in self.connection.execute(query, params)}
+
+def _now() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+
+def ledger_from_config(config: Mapping) -> Optional[Ledger]:
+    """Ledger de `execution.ledger_file` (default: ledger.db). None si se desactiva con null."""
+    execution_config = config.get('execution', {})
+    path = execution_config.get('ledger_file', 'ledger.db')
+    if not path:
+        return None
+    return Ledger(path)
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from configuration.names import normalize_name
+
+class MetadataCache:
+    """
+    Cache de metadatos de Clockify (workspaces, clientes, proyectos y tareas)
+    con índices nombre→objeto en memoria y snapshot JSON en disco con TTL.
+    """
+
+    def __init__(self, client, ttl: float = 86400, path: Optional[str] = 'clockify_cache.json',
+                 refresh_interval: float = 60):
+        self.client = client
+        self.ttl = ttl
+        self.path = path
+        # Mínimo de segundos entre dos refrescos forzados de la misma colección
+        self.refresh_interval = refresh_interval
+        self.lock = threading.RLock()
+        self.logger = logging.getLogger('clockify_automation')
+        # Colecciones crudas: clave -> {'fetched_at': ts, 'items': [...]}
+        self.collections: Dict[str, Dict] = {}
+        # Índices derivados: clave -> {nombre normalizado: objeto}
+        self.indexes: Dict[str, Dict[str, Dict]] = {}
+        # Último refresco forzado (time.monotonic) de cada colección tras un miss
+        self.refreshed: Dict[str, float] = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                collections = json.load(f)
+            self.logger.debug(f"Cache de metadatos cargada desde {self.path}")
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"No se pudo leer la cache de metadatos {self.path}: {str(e)}")
+            return
+        # Una colección sin lista de items (p. ej. un error guardado por una versión anterior) se descarta
+        if not isinstance(collections, dict):
+            collections = {}
+        self.collections = {
+            key: collection for key, collection in collections.items()
+            if isinstance(collection, dict) and isinstance(collection.get('items'), list)
+        }
+
+    def save(self):
+        if not self.path:
+            return
+        with self.lock:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.collections, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    def clear(self):
+        with self.lock:
+            self.collections = {}
+            self.indexes = {}
+            self.refreshed = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _is_fresh(self, key: str) -> bool:
+        collection = self.collections.get(key)
+        return collection is not None and time.time() - collection['fetched_at'] < self.ttl
+
+    def _collection(self, key: str, fetch, force: bool = False) -> List[Dict]:
+        with self.lock:
+            if force or not self._is_fresh(key):
+                self.logger.debug(f"Descargando metadatos de Clockify: {key}")
+                # Si la descarga falla, la excepción sale antes de tocar la cache
+                items = fetch()
+                if not isinstance(items, list):
+                    raise ValueError(f"Respuesta inesperada de Clockify para {key}: {items!r}")
+                self.collections[key] = {'fetched_at': time.time(), 'items': items}
+                self.indexes = {k: v for k, v in self.indexes.items() if k != key and not k.startswith(key + ':')}
+                self.save()
+            return self.collections[key]['items']
+
+    def _index(self, key: str, items: List[Dict], name_of) -> Dict[str, Dict]:
+        if key not in self.indexes:
+            self.indexes[key] = {normalize_name(name_of(item)): item for item in items}
+        return self.indexes[key]
+
+    def _can_refresh(self, key: str) -> bool:
+        """Permite un refresco forzado de `key` cada `refresh_interval` segundos como máximo."""
+        now = time.monotonic()
+        last = self.refreshed.get(key)
+        if last is not None and now - last < self.refresh_interval:
+            return False
+        self.refreshed[key] = now
+        return True
+
+    def _lookup(self, key: str, fetch, name_of, name: str) -> Optional[Dict]:
+        """Busca por nombre; ante un miss refresca la colección (con un mínimo entre refrescos)."""
+        with self.lock:
+            index = self._index(key, self._collection(key, fetch), name_of)
+            found = index.get(normalize_name(name))
+            if found is None and self._can_refresh(key):
+                index = self._index(key, self._collection(key, fetch, force=True), name_of)
+                found = index.get(normalize_name(name))
+            return found
+
+    def get_workspace_by_name(self, workspace_name: str) -> Optional[Dict]:
+        return self._lookup('workspaces', self.client.get_workspaces,
+                            lambda workspace: workspace['name'], workspace_name)
+
+    def get_client_by_name(self, workspace_id: str, client_name: str) -> Optional[Dict]:
+        return self._lookup(f'clients:{workspace_id}', lambda: self.client.get_clients(workspace_id),
+                            lambda client: client['client']['name'], client_name)
+
+    def get_project_by_name(self, workspace_id: str, client_name: str, project_name: str) -> Optional[Dict]:
+        """Los proyectos vienen dentro de cada cliente: un miss refresca la colección de clientes."""
+        clients_key = f'clients:{workspace_id}'
+        index_key = f'{clients_key}:projects:{normalize_name(client_name)}'
+        with self.lock:
+            client = self.get_client_by_name(workspace_id, client_name)
+            if client is None:
+                return None
+            index = self._index(index_key, client['projects'], lambda project: project['name'])
+            found = index.get(normalize_name(project_name))
+            if found is None and self._can_refresh(clients_key):
+                # Un proyecto creado después de descargar la colección
+                self._collection(clients_key, lambda: self.client.get_clients(workspace_id), force=True)
+                client = self.get_client_by_name(workspace_id, client_name)
+                if client is None:
+                    return None
+                index = self._index(index_key, client['projects'], lambda project: project['name'])
+                found = index.get(normalize_name(project_name))
+            return found
+
+    def get_project_task_by_name(self, workspace_id: str, project_id: str, task_name: str) -> Optional[Dict]:
+        return self._lookup(f'tasks:{workspace_id}:{project_id}',
+                            lambda: self.client.get_project_tasks(workspace_id, project_id),
+                            lambda task: task['name'], task_name)
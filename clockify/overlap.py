@@ -0,0 +1,97 @@
+import datetime
+import logging
+from typing import Dict, Iterable, List, Tuple
+
+from clockify.intervals import IntervalIndex
+from clockify.time_utils import (
+    MINUTES_PER_DAY, UTC_OFFSET_MINUTES, epoch_minutes, format_clockify_time, parse_clockify_time
+)
+
+def generated_interval(entry: Dict) -> Tuple[int, int]:
+    """Intervalo en minutos UTC de una entrada generada, con el mismo ajuste que aplica create_time_entry."""
+    return (parse_clockify_time(entry['start']) + UTC_OFFSET_MINUTES,
+            parse_clockify_time(entry['end']) + UTC_OFFSET_MINUTES)
+
+class ExistingEntryIndex:
+    """
+    Índice de intervalos de las entradas que ya existen en Clockify, en
+    minutos absolutos UTC; cada consulta de solapamiento es una búsqueda
+    binaria. Un único índice (y no uno por día) encuentra también las
+    entradas que cruzan varias medianoches, como un timer que quedó corriendo.
+    """
+
+    def __init__(self, existing_entries: Iterable[Dict]):
+        intervals: List[Tuple[int, int]] = []
+        self.exact = set()
+        self.size = 0
+
+        for entry in existing_entries:
+            interval = entry.get('timeInterval') or {}
+            if not interval.get('start') or not interval.get('end'):
+                # Entradas con el timer corriendo no tienen fin
+                continue
+            start = parse_clockify_time(interval['start'])
+            end = parse_clockify_time(interval['end'])
+            intervals.append((start, end))
+            self.exact.add((start, end, (entry.get('description') or '').strip().casefold()))
+            self.size += 1
+
+        self.index = IntervalIndex(intervals)
+
+    def is_duplicate(self, start: int, end: int, description: str) -> bool:
+        return (start, end, (description or '').strip().casefold()) in self.exact
+
+    def overlaps(self, start: int, end: int) -> bool:
+        return self.index.overlaps(start, end)
+
+def filter_existing(time_entries: List[Dict], index: ExistingEntryIndex, policy: str = 'skip') -> List[Dict]:
+    """
+    Aplica la política de solapamiento a las entradas generadas:
+    - 'skip': descarta duplicados y solapamientos
+    - 'flag': los registra como advertencia pero los mantiene
+    """
+    logger = logging.getLogger('clockify_automation')
+    kept = []
+    duplicates = 0
+    overlaps = 0
+
+    for entry in time_entries:
+        start, end = generated_interval(entry)
+        if index.is_duplicate(start, end, entry.get('description', '')):
+            duplicates += 1
+            reason = 'duplicada'
+        elif index.overlaps(start, end):
+            overlaps += 1
+            reason = 'solapada'
+        else:
+            kept.append(entry)
+            continue
+
+        logger.debug("Entrada %s con Clockify: %s %s - %s", reason, entry.get('description'),
+                     entry['start'], entry['end'])
+        if policy == 'flag':
+            kept.append(entry)
+
+    if duplicates or overlaps:
+        action = 'se mantienen' if policy == 'flag' else 'se descartan'
+        logger.warning(f"Entradas ya existentes en Clockify: {duplicates} duplicadas, "
+                       f"{overlaps} solapadas ({action})")
+    return kept
+
+def build_existing_index(client, workspace_id: str, year: int, month: int,
+                         start_day: int, end_day: int) -> ExistingEntryIndex:
+    """Descarga en un solo barrido paginado las entradas del usuario en el rango configurado."""
+    logger = logging.getLogger('clockify_automation')
+    user_id = client.get_user()['id']
+    # Clockify filtra por inicio: se pide también el día anterior para ver lo que cruza la medianoche
+    range_start = epoch_minutes(datetime.date(year, month, start_day)) - MINUTES_PER_DAY + UTC_OFFSET_MINUTES
+    range_end = epoch_minutes(datetime.date(year, month, end_day)) + MINUTES_PER_DAY + UTC_OFFSET_MINUTES
+
+    entries = client.iter_time_entries(
+        workspace_id, user_id,
+        start=format_clockify_time(range_start),
+        end=format_clockify_time(range_end)
+    )
+    index = ExistingEntryIndex(entries)
+    logger.info(f"Se encontraron {index.size} entradas existentes en Clockify para el período")
+    return index
@@ -0,0 +1,60 @@
+import multiprocessing
+import threading
+import time
+from typing import Optional
+
+# Límite documentado por Clockify: 50 requests por segundo por API key
+DEFAULT_RATE_LIMIT = 50
+
+class TokenBucket:
+    """Limitador token-bucket seguro entre hilos."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Bloquea hasta que haya un token disponible y lo consume."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket con el estado en memoria compartida: un único límite para
+    varios procesos. Se crea antes de lanzar los procesos y se les pasa al
+    inicializarlos.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self.lock = multiprocessing.Lock()
+        self._tokens = multiprocessing.RawValue('d', self.capacity)
+        self._last = multiprocessing.RawValue('d', time.monotonic())
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens.value
+
+    @tokens.setter
+    def tokens(self, value: float):
+        self._tokens.value = value
+
+    @property
+    def last(self) -> float:
+        return self._last.value
+
+    @last.setter
+    def last(self, value: float):
+        self._last.value = value
@@ -0,0 +1,106 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from clockify.clockify_api import ClockifyClient, get_default_client
+from clockify.journal import SubmissionJournal, journal_from_config
+from clockify.rate_limit import DEFAULT_RATE_LIMIT, SharedTokenBucket, TokenBucket
+from configuration.metrics import bind, get_metrics
+
+DEFAULT_MAX_WORKERS = 8
+
+def submit_time_entries(workspace_id: str, time_entries: List[Dict], client: Optional[ClockifyClient] = None,
+                        max_workers: int = DEFAULT_MAX_WORKERS, journal: Optional[SubmissionJournal] = None,
+                        client_name: str = '') -> List[Dict]:
+    """
+    Envía las entradas de tiempo en paralelo. El rate limit lo aplica el
+    cliente, que toma un token por cada request (reintentos incluidos).
+    Devuelve un resultado por entrada, en el mismo orden que `time_entries`.
+    Si se pasa un `journal`, cada resultado queda registrado ahí.
+    """
+    logger = logging.getLogger('clockify_automation')
+    client = client or get_default_client()
+
+    def submit(entry: Dict) -> Dict:
+        started = time.monotonic()
+        try:
+            response = client.create_time_entry(workspace_id, entry)
+            logger.debug("Entrada creada: %s", entry.get('description', 'Sin descripción'))
+            if journal:
+                journal.record_success(client_name, entry, response)
+            return {'entry': entry, 'ok': True, 'response': response, 'error': None,
+                    'elapsed': time.monotonic() - started}
+        except Exception as e:
+            logger.error(f"Error creando entrada: {str(e)}")
+            if journal:
+                journal.record_failure(client_name, workspace_id, entry, str(e))
+            return {'entry': entry, 'ok': False, 'response': None, 'error': str(e),
+                    'elapsed': time.monotonic() - started}
+
+    metrics = get_metrics()
+    started = time.monotonic()
+    with metrics.stage('submit'), ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # Los hilos de envío heredan la etapa para atribuirle sus requests
+        results = list(executor.map(bind(submit), time_entries))
+    elapsed = time.monotonic() - started
+
+    for result in results:
+        metrics.inc('submitted_entries_total', help="Entradas enviadas a Clockify",
+                    result='ok' if result['ok'] else 'failed')
+        metrics.observe('submission_seconds', result['elapsed'],
+                        help="Tiempo de envío de cada entrada, con reintentos")
+    log_submission_summary(results, elapsed)
+    return results
+
+def log_submission_summary(results: List[Dict], elapsed: float):
+    """Registra el resumen de envío: éxitos, errores y throughput."""
+    logger = logging.getLogger('clockify_automation')
+    succeeded = sum(1 for result in results if result['ok'])
+    failed = len(results) - succeeded
+    throughput = len(results) / elapsed if elapsed > 0 else 0.0
+
+    logger.info(f"Envío finalizado: {succeeded} creadas, {failed} con error "
+                f"en {elapsed:.2f}s ({throughput:.1f} entradas/s)")
+
+def replay_dead_letters(config: Dict, client: Optional[ClockifyClient] = None) -> bool:
+    """Reenvía las entradas del dead-letter que todavía no se crearon."""
+    logger = logging.getLogger('clockify_automation')
+    journal = journal_from_config(config)
+    records = journal.load_dead_letters()
+    if not records:
+        logger.info("No hay entradas pendientes en el dead-letter")
+        return True
+
+    logger.info(f"Reenviando {len(records)} entradas del dead-letter")
+
+    # Agrupar por workspace y cliente para enviar cada grupo en un solo lote
+    groups = {}
+    for record in records:
+        groups.setdefault((record['workspace_id'], record['client']), []).append(record['entry'])
+
+    clockify_config = config.get('clockify', {})
+    success = True
+    try:
+        for (workspace_id, client_name), entries in groups.items():
+            results = submit_time_entries(
+                workspace_id,
+                entries,
+                client=client,
+                max_workers=clockify_config.get('max_workers', DEFAULT_MAX_WORKERS),
+                journal=journal,
+                client_name=client_name
+            )
+            success = success and all(result['ok'] for result in results)
+    finally:
+        # El dead-letter se reescribe recién al final: si el replay se corta,
+        # las entradas que no se llegaron a enviar siguen ahí
+        remaining = journal.compact_dead_letters()
+        logger.info(f"Quedan {remaining} entradas en el dead-letter")
+    return success
+
+if __name__ == "__main__":
+    from configuration.context import build_context
+
+    ctx = build_context()
+    replay_dead_letters(ctx.config, ctx.clockify)
@@ -0,0 +1,45 @@
+import datetime
+import functools
+
+MINUTES_PER_DAY = 1440
+# Los horarios se configuran en UTC-3; Clockify espera UTC
+UTC_OFFSET_MINUTES = 180
+
+def hours_to_minutes(hours: float) -> int:
+    """Convierte horas decimales de la configuración (12.5) a minutos desde medianoche (750)."""
+    return round(float(hours) * 60)
+
+def format_minutes(minutes: int) -> str:
+    """Convierte minutos desde medianoche a formato HH:MM."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+def epoch_minutes(date: datetime.date, minutes: int = 0) -> int:
+    """Minutos absolutos (desde el día 1 del calendario) para una fecha y hora del día."""
+    return date.toordinal() * MINUTES_PER_DAY + minutes
+
+def datetime_to_epoch_minutes(value: datetime.datetime) -> int:
+    return epoch_minutes(value.date(), value.hour * 60 + value.minute)
+
+@functools.lru_cache(maxsize=4096)
+def _date_prefix(ordinal: int) -> str:
+    return datetime.date.fromordinal(ordinal).strftime('%Y-%m-%dT')
+
+def format_clockify_time(value: int) -> str:
+    """Formatea minutos absolutos como '%Y-%m-%dT%H:%M:00Z' (el formato de Clockify)."""
+    day, minutes = divmod(value, MINUTES_PER_DAY)
+    return f"{_date_prefix(day)}{minutes // 60:02d}:{minutes % 60:02d}:00Z"
+
+def parse_clockify_time(value: str) -> int:
+    """
+    Convierte un timestamp ISO ('2025-02-04T12:00:00Z', con o sin offset) a
+    minutos absolutos en UTC. Los segundos se descartan.
+    """
+    if len(value) == 20 and value[-1] == 'Z':
+        # Camino rápido para el formato que genera el scheduler
+        date = datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+        return epoch_minutes(date, int(value[11:13]) * 60 + int(value[14:16]))
+
+    parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return datetime_to_epoch_minutes(parsed)
@@ -0,0 +1,162 @@
+import datetime
+import logging
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from clockify.csv_to_clockify import (
+    get_clockify_ids, get_available_blocks, dummy_to_time_entries,
+    MIN_ENTRY_MINUTES
+)
+from clockify.time_utils import hours_to_minutes
+from configuration.metrics import timed
+
+def _to_day(value):
+    """Mismo criterio que el motor original: int() o descartar la fila."""
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return None
+
+def _format_times(dates: pd.Series, minutes: np.ndarray) -> np.ndarray:
+    """
+    Formatea fecha + minutos desde medianoche como '%Y-%m-%dT%H:%M:00Z'. El
+    minuto 1440 (end_time: 24) pasa al día siguiente, igual que format_clockify_time.
+    """
+    timestamps = dates.reset_index(drop=True) + pd.to_timedelta(minutes, unit='m')
+    return timestamps.dt.strftime('%Y-%m-%dT%H:%M:00Z').to_numpy(dtype=object)
+
+def _is_degenerate(meetings: List[Dict], lunch_start: int, lunch_end: int) -> bool:
+    """Períodos vacíos o invertidos: el motor vectorizado no replica ese caso."""
+    if lunch_end <= lunch_start:
+        return True
+    return any(hours_to_minutes(meeting['end_time']) <= hours_to_minutes(meeting['start_time'])
+               for meeting in meetings)
+
+def _slice_plan(blocks: List[Tuple[int, int]], n_tasks: int) -> pd.DataFrame:
+    """
+    Reparte `n_tasks` tareas en los bloques de un día laborable con la misma
+    aritmética entera que dummy_to_time_entries. Los cortes caen dentro de
+    bloques libres, así que nunca quedan bloqueados por almuerzo o meetings.
+    """
+    if n_tasks == 1:
+        return pd.DataFrame({
+            'task_idx': np.zeros(len(blocks), dtype=np.int64),
+            'start': np.array([start for start, _ in blocks], dtype=np.int64),
+            'end': np.array([end for _, end in blocks], dtype=np.int64)
+        })
+
+    total_available_time = sum(end - start for start, end in blocks)
+    task_idx, starts, ends = [], [], []
+    current_task_index = 0
+
+    for block_start, block_end in blocks:
+        block_duration = block_end - block_start
+        tasks_in_block = max(1, block_duration * n_tasks // total_available_time)
+        if current_task_index >= n_tasks:
+            break
+
+        iterations = min(tasks_in_block, n_tasks - current_task_index)
+        cuts = block_start + np.arange(iterations + 1, dtype=np.int64) * block_duration // tasks_in_block
+        keep = np.flatnonzero(cuts[1:] - cuts[:-1] >= MIN_ENTRY_MINUTES)
+        task_idx.append(current_task_index + keep)
+        starts.append(cuts[:-1][keep])
+        ends.append(cuts[1:][keep])
+        current_task_index += iterations
+
+    return pd.DataFrame({
+        'task_idx': np.concatenate(task_idx),
+        'start': np.concatenate(starts),
+        'end': np.concatenate(ends)
+    })
+
+@timed('schedule_pandas')
+def dummy_to_time_entries_vectorized(entries_wo_time: List[Dict], workspace_id: str, year: int, month: int,
+                                     start_day: int, end_day: int, start_time: int, end_time: int,
+                                     lunch_start: int, lunch_end: int, client: Dict) -> List[Dict]:
+    """
+    Versión con pandas/NumPy de dummy_to_time_entries. Genera exactamente las
+    mismas entradas: los bloques de un día laborable dependen solo del cliente,
+    así que el reparto se calcula una vez por cantidad de tareas y se aplica a
+    todos los días con esa cantidad.
+    """
+    logger = logging.getLogger('clockify_automation')
+    meetings = client.get('daily_meetings') or []
+
+    if _is_degenerate(meetings, lunch_start, lunch_end):
+        logger.warning("Horarios de almuerzo o daily inválidos, se usa el motor estándar")
+        return dummy_to_time_entries(entries_wo_time, workspace_id, year, month, start_day, end_day,
+                                     start_time, end_time, lunch_start, lunch_end, client)
+
+    ids = get_clockify_ids(workspace_id, client)
+    if not ids:
+        return []
+    project_id, task_id = ids
+
+    days = pd.Series(pd.date_range(datetime.datetime(year, month, start_day),
+                                   datetime.datetime(year, month, end_day), freq='D'))
+    weekdays = days[days.dt.weekday < 5].reset_index(drop=True)
+    frames = []
+
+    # Daily meetings: producto cartesiano reunión × día laborable
+    if meetings and not weekdays.empty:
+        meeting_df = pd.DataFrame({
+            'description': [meeting['description'] for meeting in meetings],
+            'start': [hours_to_minutes(meeting['start_time']) for meeting in meetings],
+            'end': [hours_to_minutes(meeting['end_time']) for meeting in meetings]
+        }).merge(pd.DataFrame({'date': weekdays}), how='cross')
+        frames.append(meeting_df)
+        for meeting in meetings:
+            logger.info(f"Agregadas {len(weekdays)} entradas para daily meeting: {meeting['description']}")
+
+    # Tareas: agrupar por día en una sola pasada
+    tasks = pd.DataFrame({
+        'description': [entry.get('Tarea') for entry in entries_wo_time],
+        'has_task': [('Tarea' in entry) for entry in entries_wo_time],
+        'day': pd.array([_to_day(entry.get('Dia')) for entry in entries_wo_time], dtype='Int64')
+    })
+    tasks = tasks[tasks['has_task'] & tasks['day'].between(start_day, end_day).fillna(False)]
+    tasks = tasks.assign(date=pd.to_datetime(dict(year=year, month=month, day=tasks['day'].astype('int64'))))
+    tasks = tasks[tasks['date'].dt.weekday < 5]
+
+    if not tasks.empty:
+        blocks = get_available_blocks(int(tasks['day'].iloc[0]), start_time, end_time,
+                                      lunch_start, lunch_end, client, year, month)
+        if blocks:
+            tasks = tasks.assign(
+                task_idx=tasks.groupby('day').cumcount(),
+                n_tasks=tasks.groupby('day')['day'].transform('size')
+            )
+            plans = []
+            for n_tasks in tasks['n_tasks'].unique():
+                plan = _slice_plan(blocks, int(n_tasks))
+                plans.append(plan.assign(n_tasks=n_tasks, slot=np.arange(len(plan))))
+            plan_df = pd.concat(plans, ignore_index=True)
+            plan_df['task_idx'] = plan_df['task_idx'].astype(tasks['task_idx'].dtype)
+            plan_df['n_tasks'] = plan_df['n_tasks'].astype(tasks['n_tasks'].dtype)
+
+            scheduled = tasks.merge(plan_df, on=['n_tasks', 'task_idx'])
+            scheduled = scheduled.sort_values(['day', 'slot'], kind='stable')
+            frames.append(scheduled[['description', 'start', 'end', 'date']])
+        else:
+            logger.warning("No hay bloques disponibles en los días laborables")
+
+    if not frames:
+        return []
+
+    result = pd.concat(frames, ignore_index=True)
+    starts = _format_times(result['date'], result['start'].to_numpy(dtype=np.int64))
+    ends = _format_times(result['date'], result['end'].to_numpy(dtype=np.int64))
+
+    return [
+        {
+            'description': description,
+            'projectId': project_id,
+            'taskId': task_id,
+            'billable': True,
+            'start': start,
+            'end': end
+        }
+        for description, start, end in zip(result['description'].tolist(), starts, ends)
+    ]
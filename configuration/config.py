@@ -1,12 +1,148 @@
 import yaml
-from typing import Dict
+from types import MappingProxyType
+from typing import Any, Dict, List
+import datetime
 import os
 
+from configuration.names import normalize_name
+from configuration.periods import CHUNK_SIZES, parse_date
+
+class ConfigError(Exception):
+    """La configuración no cumple el esquema esperado."""
+
+    def __init__(self, errors: List[str]):
+        self.errors = errors
+        super().__init__("Configuración inválida:\n- " + "\n- ".join(errors))
+
 def load_config(config_file: str = 'files/config.yaml') -> Dict:
     """Carga la configuración desde el archivo YAML."""
     # Obtener el directorio raíz del proyecto
     root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     config_path = os.path.join(root_dir, config_file)
-    
+
     with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
\ No newline at end of file
+        return yaml.safe_load(f)
+
+def merge_config(base: Dict, overrides: Dict) -> Dict:
+    """Combina dos configuraciones: los dicts se mezclan recursivamente, el resto se reemplaza."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def validate_config(config: Dict) -> List[str]:
+    """Valida la estructura de la configuración. Devuelve la lista de errores encontrados."""
+    errors = []
+    if not isinstance(config, dict):
+        return ["El archivo de configuración está vacío o no es un diccionario"]
+
+    # workspace
+    workspace = config.get('workspace')
+    if not isinstance(workspace, dict):
+        errors.append("Falta la sección 'workspace'")
+    else:
+        if not workspace.get('name'):
+            errors.append("Falta 'workspace.name'")
+        clients = workspace.get('clients')
+        if not isinstance(clients, list) or not clients:
+            errors.append("'workspace.clients' debe ser una lista no vacía")
+        else:
+            for i, client in enumerate(clients):
+                for field in ('name', 'project', 'task'):
+                    if not isinstance(client, dict) or not client.get(field):
+                        errors.append(f"Falta 'workspace.clients[{i}].{field}'")
+                if not isinstance(client, dict):
+                    continue
+                for field in ('start_time', 'end_time'):
+                    if field in client and not _is_number(client[field]):
+                        errors.append(f"'workspace.clients[{i}].{field}' debe ser un número")
+                for j, meeting in enumerate(client.get('daily_meetings') or []):
+                    for field in ('start_time', 'end_time'):
+                        if not _is_number(meeting.get(field)):
+                            errors.append(f"'workspace.clients[{i}].daily_meetings[{j}].{field}' debe ser un número")
+
+    # time
+    time_config = config.get('time')
+    if not isinstance(time_config, dict):
+        errors.append("Falta la sección 'time'")
+    else:
+        if 'start_date' in time_config or 'end_date' in time_config:
+            # Modo rango: start_date/end_date en lugar de year/month/start_day/end_day
+            try:
+                start = parse_date(time_config.get('start_date'))
+                end = parse_date(time_config.get('end_date'))
+                if start > end:
+                    errors.append("'time.start_date' es posterior a 'time.end_date'")
+            except (TypeError, ValueError) as e:
+                errors.append(f"'time.start_date' y 'time.end_date' deben ser fechas YYYY-MM-DD: {str(e)}")
+            if time_config.get('chunk', 'month') not in CHUNK_SIZES:
+                errors.append(f"'time.chunk' debe ser uno de {', '.join(CHUNK_SIZES)}")
+        else:
+            for field in ('year', 'month', 'start_day', 'end_day'):
+                if not isinstance(time_config.get(field), int):
+                    errors.append(f"'time.{field}' debe ser un entero")
+        for field in ('lunch_start', 'lunch_end'):
+            if not _is_number(time_config.get(field)):
+                errors.append(f"'time.{field}' debe ser un número")
+        if all(isinstance(time_config.get(field), int) for field in ('year', 'month', 'start_day', 'end_day')):
+            try:
+                start = datetime.date(time_config['year'], time_config['month'], time_config['start_day'])
+                end = datetime.date(time_config['year'], time_config['month'], time_config['end_day'])
+                if start > end:
+                    errors.append("'time.start_day' es posterior a 'time.end_day'")
+            except ValueError as e:
+                errors.append(f"Fechas inválidas en 'time': {str(e)}")
+
+    # execution
+    execution = config.get('execution')
+    if not isinstance(execution, dict):
+        errors.append("Falta la sección 'execution'")
+    else:
+        for i, source in enumerate(execution.get('sources') or []):
+            source_type = str(source.get('type', '')).lower()
+            if source_type not in ('asana', 'csv'):
+                errors.append(f"Tipo de fuente no soportado en 'execution.sources[{i}]': {source_type}")
+                continue
+            if not source.get('enabled', False):
+                continue
+            if source_type == 'asana':
+                asana_config = config.get('asana') or {}
+                if not asana_config.get('access_token') or not asana_config.get('workspace_id'):
+                    errors.append("Falta configuración de Asana (access_token o workspace_id)")
+                client_names = {
+                    normalize_name(str(client.get('name', '')))
+                    for client in (workspace or {}).get('clients') or [] if isinstance(client, dict)
+                }
+                targets = list((asana_config.get('client_mapping') or {}).values())
+                if asana_config.get('default_client'):
+                    targets.append(asana_config['default_client'])
+                for target in targets:
+                    if normalize_name(str(target)) not in client_names:
+                        errors.append(f"El cliente '{target}' de la configuración de Asana no está en 'workspace.clients'")
+            elif source_type == 'csv':
+                if not source.get('file_path'):
+                    errors.append(f"Falta 'execution.sources[{i}].file_path'")
+                mapping = source.get('mapping')
+                if not isinstance(mapping, dict) or not all(key in mapping for key in ('client', 'task', 'day')):
+                    errors.append(f"'execution.sources[{i}].mapping' debe definir client, task y day")
+
+    # clockify
+    clockify_config = config.get('clockify')
+    if not isinstance(clockify_config, dict) or not clockify_config.get('api_key'):
+        errors.append("Falta 'clockify.api_key'")
+
+    return errors
+
+def freeze(value: Any) -> Any:
+    """Copia inmutable de la configuración: dicts de solo lectura y tuplas en lugar de listas."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
@@ -0,0 +1,54 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Mapping, Optional, TYPE_CHECKING
+
+from configuration.config import load_config, validate_config, freeze, ConfigError
+from configuration.logger import setup_logger
+from configuration.metrics import Metrics, get_metrics, metrics_from_config, set_metrics
+
+if TYPE_CHECKING:
+    from clockify.clockify_api import ClockifyClient
+
+@dataclass(frozen=True)
+class AppContext:
+    """Configuración validada, logger y clientes HTTP compartidos por todas las etapas."""
+    config: Mapping
+    logger: logging.Logger
+    # None si el contexto se creó sin conexión (p. ej. `cli.py extract` o `plan`)
+    clockify: Optional['ClockifyClient']
+    config_file: str = 'files/config.yaml'
+    # Limitador de requests compartido (p. ej. entre procesos del modo batch);
+    # el cliente de Clockify toma un token en cada request
+    bucket: Optional[Any] = None
+    # Métricas de la ejecución; también es el registro por defecto del proceso
+    metrics: Metrics = field(default_factory=get_metrics)
+
+def build_context(config_file: str = 'files/config.yaml', config: Optional[Dict] = None,
+                  bucket: Optional[Any] = None, connect: bool = True) -> AppContext:
+    """
+    Carga y valida la configuración una sola vez, configura el logger y crea el
+    cliente de Clockify. Lanza ConfigError antes de hacer cualquier request.
+    Si se pasa `config`, se usa en lugar de leer `config_file`. Con
+    `connect=False` no se crea el cliente (ni se importa requests).
+    """
+    if config is None:
+        config = load_config(config_file)
+    errors = validate_config(config)
+    if errors:
+        raise ConfigError(errors)
+
+    frozen = freeze(config)
+    logger = setup_logger(frozen)
+    # Registro nuevo por ejecución (un proceso del modo batch corre varias)
+    metrics = metrics_from_config(frozen)
+    set_metrics(metrics)
+
+    clockify = None
+    if connect:
+        from clockify.clockify_api import ClockifyClient, set_default_client
+        clockify = ClockifyClient.from_config(frozen, bucket=bucket)
+        # Las funciones de módulo de clockify_api usan este mismo cliente
+        set_default_client(clockify)
+
+    return AppContext(config=frozen, logger=logger, clockify=clockify, config_file=config_file, bucket=bucket,
+                      metrics=metrics)
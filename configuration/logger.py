@@ -1,5 +1,106 @@
+import atexit
+import copy
+import datetime
+import gzip
+import json
 import logging
-from typing import Dict
+import logging.handlers
+import os
+import queue
+import shutil
+from typing import Dict, Optional
+
+from configuration.metrics import current_stage
+
+# Listener que escribe los logs en segundo plano; uno por proceso
+_listener: Optional[logging.handlers.QueueListener] = None
+
+# Tipos que se pueden formatear más tarde sin riesgo de que cambien
+_IMMUTABLE_ARGS = (str, int, float, bool, type(None), datetime.date)
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler que no formatea el mensaje en el hilo que loguea: la cola es
+    en memoria, así que el listener recibe el record tal cual y el formateo
+    ocurre en su hilo. Si algún argumento es mutable se formatea antes, para
+    no registrar un valor que cambió después.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args if isinstance(record.args, tuple) else (record.args,)
+        if all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args):
+            return record
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+class StageFilter(logging.Filter):
+    """Agrega al record la etapa del pipeline en curso (se lee en el hilo que loguea)."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.stage = current_stage()
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Una línea JSON por mensaje, para herramientas de análisis de logs."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            'time': datetime.datetime.fromtimestamp(record.created, datetime.timezone.utc)
+                    .isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'module': record.module,
+            'function': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+            'process': record.process
+        }
+        stage = getattr(record, 'stage', 'none')
+        if stage != 'none':
+            payload['stage'] = stage
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+def _gzip_rotator(source: str, dest: str):
+    """Comprime el archivo rotado en lugar de solo renombrarlo."""
+    with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+        shutil.copyfileobj(f_in, f_out)
+    os.remove(source)
+
+def _file_handler(logging_config: Dict) -> logging.Handler:
+    """Archivo de log con rotación por tamaño; los archivos rotados se comprimen con gzip."""
+    file_name = logging_config.get('file_name', 'clockify_automation.log')
+    max_bytes = logging_config.get('max_bytes', 10 * 1024 * 1024)
+    backup_count = logging_config.get('backup_count', 5)
+    if not max_bytes:
+        return logging.FileHandler(file_name, encoding='utf-8')
+
+    handler = logging.handlers.RotatingFileHandler(file_name, maxBytes=max_bytes,
+                                                   backupCount=backup_count, encoding='utf-8')
+    if logging_config.get('compress', True):
+        handler.namer = lambda name: name + '.gz'
+        handler.rotator = _gzip_rotator
+    return handler
+
+def stop_logging():
+    """Vacía la cola de logs y cierra los archivos. Se llama sola al salir del proceso."""
+    global _listener
+    if _listener is None:
+        return
+    # Sin el QueueHandler, lo que se loguee después va al handler de último recurso
+    logger = logging.getLogger('clockify_automation')
+    logger.handlers = [handler for handler in logger.handlers
+                       if not isinstance(handler, logging.handlers.QueueHandler)]
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+atexit.register(stop_logging)
 
 def setup_logger(config: Dict) -> logging.Logger:
     """Configura el logger según las especificaciones del config.yaml"""
@@ -12,13 +113,14 @@ def setup_logger(config: Dict) -> logging.Logger:
     }
 
     logger = logging.getLogger('clockify_automation')
-    logger.setLevel(logging.DEBUG)  # El nivel más bajo posible para capturar todo
 
-    # Limpiar handlers existentes para evitar duplicados
+    # Cerrar la configuración anterior (p. ej. otro usuario en el mismo proceso del batch)
+    stop_logging()
     logger.handlers = []
 
     # Obtener configuración de logging
     logging_config = config['execution'].get('logging', {})
+    log_format = str(logging_config.get('format', 'text')).lower()
 
     # Handler para consola
     console_handler = logging.StreamHandler()
@@ -26,16 +128,31 @@ def setup_logger(config: Dict) -> logging.Logger:
     console_handler.setLevel(log_levels.get(console_level, logging.INFO))
     console_format = logging.Formatter('%(levelname)s: %(message)s')
     console_handler.setFormatter(console_format)
-    logger.addHandler(console_handler)
 
     # Handler para archivo
-    file_name = logging_config.get('file_name', 'clockify_automation.log')
-    file_handler = logging.FileHandler(file_name)
+    file_handler = _file_handler(logging_config)
     file_level = logging_config.get('file_level', 'DEBUG').upper()
     file_handler.setLevel(log_levels.get(file_level, logging.DEBUG))
-    file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    if log_format == 'json':
+        file_format = JsonFormatter()
+    else:
+        file_format = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(file_format)
-    logger.addHandler(file_handler)
 
-    logger.info(f"Logger configurado - Consola: {console_level}, Archivo: {file_level}")
-    return logger
\ No newline at end of file
+    # El logger solo deja pasar lo que algún handler va a escribir, así los
+    # logger.debug de los loops calientes se descartan sin crear el record
+    logger.setLevel(min(console_handler.level, file_handler.level))
+
+    # Consola y archivo se escriben desde un hilo aparte: loguear solo encola
+    log_queue = queue.SimpleQueue()
+    queue_handler = LazyQueueHandler(log_queue)
+    queue_handler.addFilter(StageFilter())
+    logger.addHandler(queue_handler)
+
+    global _listener
+    _listener = logging.handlers.QueueListener(log_queue, console_handler, file_handler,
+                                               respect_handler_level=True)
+    _listener.start()
+
+    logger.info("Logger configurado - Consola: %s, Archivo: %s", console_level, file_level)
+    return logger
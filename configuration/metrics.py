@@ -0,0 +1,251 @@
+"""
+Métricas de una ejecución: duración de cada etapa, contadores e histogramas
+de latencia. Al terminar se exportan a JSON y, opcionalmente, a un archivo
+para el textfile collector de Prometheus (node_exporter).
+"""
+import bisect
+import contextlib
+import contextvars
+import datetime
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterator, Mapping, Optional, Tuple
+
+# Límites (en segundos) de los buckets de los histogramas
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+# Etapa en curso; las requests HTTP se atribuyen a la etapa más interna
+_current_stage: contextvars.ContextVar[str] = contextvars.ContextVar('metrics_stage', default='none')
+
+Labels = Tuple[Tuple[str, str], ...]
+
+def _labels(labels: Mapping) -> Labels:
+    return tuple(sorted((str(key), str(value)) for key, value in labels.items()))
+
+def _format_value(value: float) -> str:
+    """Enteros sin decimales; el resto con toda su precisión (los timestamps no caben en 'g')."""
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+class Histogram:
+    """Histograma de buckets fijos (no es seguro entre hilos: lo protege Metrics)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        """Pares (le, acumulado) como los espera Prometheus, terminando en +Inf."""
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield format(bound, 'g'), total
+        yield '+Inf', self.count
+
+class Metrics:
+    """Registro de métricas seguro entre hilos."""
+
+    def __init__(self, prefix: str = 'clokifai', labels: Optional[Mapping] = None):
+        self.prefix = prefix
+        # Labels fijos en todas las series (p. ej. el usuario en el modo batch)
+        self.labels = dict(labels or {})
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[Labels, float]] = {}
+        self.gauges: Dict[str, Dict[Labels, float]] = {}
+        self.histograms: Dict[str, Dict[Labels, Histogram]] = {}
+        self.help: Dict[str, str] = {}
+
+    def inc(self, name: str, value: float = 1, help: str = '', **labels):
+        key = _labels(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+            if help:
+                self.help.setdefault(name, help)
+
+    def set_gauge(self, name: str, value: float, help: str = '', **labels):
+        with self.lock:
+            self.gauges.setdefault(name, {})[_labels(labels)] = value
+            if help:
+                self.help.setdefault(name, help)
+
+    def observe(self, name: str, value: float, help: str = '', **labels):
+        key = _labels(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+            if help:
+                self.help.setdefault(name, help)
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        """Mide la duración de una etapa; las requests HTTP de adentro se le atribuyen."""
+        token = _current_stage.set(name)
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.inc('stage_errors_total', help="Etapas que terminaron con una excepción", stage=name)
+            raise
+        finally:
+            self.observe('stage_duration_seconds', time.perf_counter() - started,
+                         help="Duración de cada etapa del pipeline", stage=name)
+            _current_stage.reset(token)
+
+    def stage_summary(self) -> Dict[str, Dict]:
+        """Duración total, ejecuciones y máximo por etapa."""
+        with self.lock:
+            series = dict(self.histograms.get('stage_duration_seconds', {}))
+            return {
+                dict(key)['stage']: {'count': histogram.count, 'total_seconds': histogram.sum,
+                                     'max_seconds': histogram.max}
+                for key, histogram in series.items()
+            }
+
+    def to_dict(self) -> Dict:
+        def flat(series: Dict[str, Dict[Labels, float]]):
+            return [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for name, values in sorted(series.items()) for key, value in sorted(values.items())
+            ]
+
+        with self.lock:
+            histograms = [
+                {'name': name, 'labels': dict(key), 'count': histogram.count, 'sum': histogram.sum,
+                 'max': histogram.max, 'buckets': dict(histogram.cumulative())}
+                for name, values in sorted(self.histograms.items())
+                for key, histogram in sorted(values.items())
+            ]
+            counters = flat(self.counters)
+            gauges = flat(self.gauges)
+        return {
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'labels': self.labels,
+            'stages': self.stage_summary(),
+            'counters': counters,
+            'gauges': gauges,
+            'histograms': histograms
+        }
+
+    def to_prometheus(self) -> str:
+        """Formato de texto de Prometheus (exposition format 0.0.4)."""
+        def series_name(name: str) -> str:
+            return f'{self.prefix}_{name}' if self.prefix else name
+
+        def render_labels(key: Labels, extra: Labels = ()) -> str:
+            pairs = _labels(self.labels) + key + extra
+            if not pairs:
+                return ''
+            escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+                       for _, value in pairs)
+            return '{' + ','.join(f'{label}="{value}"' for (label, _), value in zip(pairs, escaped)) + '}'
+
+        lines = []
+        with self.lock:
+            for kind, families in (('counter', self.counters), ('gauge', self.gauges)):
+                for name, values in sorted(families.items()):
+                    full = series_name(name)
+                    if name in self.help:
+                        lines.append(f'# HELP {full} {self.help[name]}')
+                    lines.append(f'# TYPE {full} {kind}')
+                    lines.extend(f'{full}{render_labels(key)} {_format_value(value)}'
+                                 for key, value in sorted(values.items()))
+            for name, values in sorted(self.histograms.items()):
+                full = series_name(name)
+                if name in self.help:
+                    lines.append(f'# HELP {full} {self.help[name]}')
+                lines.append(f'# TYPE {full} histogram')
+                for key, histogram in sorted(values.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f'{full}_bucket{render_labels(key, (("le", bound),))} {count}')
+                    lines.append(f'{full}_sum{render_labels(key)} {_format_value(histogram.sum)}')
+                    lines.append(f'{full}_count{render_labels(key)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+def _write_atomic(path: str, content: str):
+    """Escribe a un temporal y lo renombra: el textfile collector nunca lee un archivo a medias."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+# Registro por defecto del proceso; build_context lo reemplaza en cada ejecución
+_default_metrics = Metrics()
+
+def get_metrics() -> Metrics:
+    return _default_metrics
+
+def set_metrics(metrics: Metrics):
+    global _default_metrics
+    _default_metrics = metrics
+
+def current_stage() -> str:
+    return _current_stage.get()
+
+def timed(stage: str) -> Callable:
+    """Decorador: mide cada llamada como la etapa `stage` del registro por defecto."""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_metrics().stage(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def bind(func: Callable) -> Callable:
+    """
+    Hace que `func` corra con la etapa actual aunque se ejecute en otro hilo
+    (ThreadPoolExecutor no propaga los contextvars).
+    """
+    context = contextvars.copy_context()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return context.copy().run(func, *args, **kwargs)
+    return wrapper
+
+def metrics_from_config(config: Mapping) -> Metrics:
+    """Registro nuevo con el prefijo y los labels de `execution.metrics`."""
+    metrics_config = config.get('execution', {}).get('metrics') or {}
+    return Metrics(metrics_config.get('prefix', 'clokifai'), metrics_config.get('labels'))
+
+def export_metrics(metrics: Metrics, config: Mapping):
+    """Escribe el resumen en `execution.metrics.json_file` y `prometheus_file` (null desactiva cada uno)."""
+    logger = logging.getLogger('clockify_automation')
+    metrics_config = config.get('execution', {}).get('metrics') or {}
+
+    stages = metrics.stage_summary()
+    if stages:
+        logger.info("Duración por etapa: " + ", ".join(
+            f"{name} {summary['total_seconds']:.2f}s" for name, summary in sorted(stages.items())))
+
+    json_file = metrics_config.get('json_file', 'metrics.json')
+    prometheus_file = metrics_config.get('prometheus_file')
+    try:
+        if json_file:
+            _write_atomic(json_file, json.dumps(metrics.to_dict(), ensure_ascii=False, indent=2))
+            logger.info(f"Métricas guardadas en {json_file}")
+        if prometheus_file:
+            _write_atomic(prometheus_file, metrics.to_prometheus())
+            logger.info(f"Métricas de Prometheus guardadas en {prometheus_file}")
+    except OSError as e:
+        # Las métricas nunca hacen fallar la ejecución
+        logger.error(f"No se pudieron guardar las métricas: {str(e)}")
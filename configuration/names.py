@@ -0,0 +1,3 @@
+def normalize_name(name: str) -> str:
+    """Clave de búsqueda: nombre sin espacios en los extremos y sin mayúsculas."""
+    return name.strip().casefold()
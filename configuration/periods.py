@@ -0,0 +1,115 @@
+import datetime
+import json
+import logging
+import os
+from types import MappingProxyType
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+# Tamaños de tramo soportados en el modo rango
+CHUNK_SIZES = ('month', 'week')
+
+def parse_date(value: Union[str, datetime.date]) -> datetime.date:
+    """Acepta fechas de YAML (datetime.date) o texto 'YYYY-MM-DD'."""
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(str(value).strip())
+
+def is_range_mode(time_config: Mapping) -> bool:
+    return 'start_date' in time_config or 'end_date' in time_config
+
+def _period(start: datetime.date, end: datetime.date) -> Dict:
+    return {'year': start.year, 'month': start.month, 'start_day': start.day, 'end_day': end.day}
+
+def split_range(start: datetime.date, end: datetime.date, chunk: str = 'month') -> List[Dict]:
+    """
+    Divide el rango [start, end] en tramos de un mes o una semana (lunes a
+    domingo). Un tramo nunca cruza un cambio de mes, así cada uno se describe
+    con year/month/start_day/end_day como la configuración de un solo mes.
+    """
+    if chunk not in CHUNK_SIZES:
+        raise ValueError(f"Tamaño de tramo no soportado: {chunk}")
+
+    periods = []
+    current = start
+    while current <= end:
+        next_month = (current.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+        chunk_end = next_month - datetime.timedelta(days=1)
+        if chunk == 'week':
+            chunk_end = min(chunk_end, current + datetime.timedelta(days=6 - current.weekday()))
+        chunk_end = min(chunk_end, end)
+        periods.append(_period(current, chunk_end))
+        current = chunk_end + datetime.timedelta(days=1)
+    return periods
+
+def config_periods(config: Mapping) -> List[Dict]:
+    """Tramos a procesar: uno solo en el modo clásico de un mes, varios en el modo rango."""
+    time_config = config['time']
+    if not is_range_mode(time_config):
+        return [_period(
+            datetime.date(time_config['year'], time_config['month'], time_config['start_day']),
+            datetime.date(time_config['year'], time_config['month'], time_config['end_day'])
+        )]
+    return split_range(
+        parse_date(time_config['start_date']),
+        parse_date(time_config['end_date']),
+        time_config.get('chunk', 'month')
+    )
+
+def period_id(period: Mapping) -> str:
+    start = datetime.date(period['year'], period['month'], period['start_day'])
+    end = datetime.date(period['year'], period['month'], period['end_day'])
+    return f"{start.isoformat()}/{end.isoformat()}"
+
+def with_period(config: Mapping, period: Mapping) -> Mapping:
+    """Copia (inmutable) de la configuración con la sección time acotada a un tramo."""
+    time_config = dict(config['time'])
+    time_config.update(period)
+    return MappingProxyType({**config, 'time': MappingProxyType(time_config)})
+
+def task_day(value: Any, period: Optional[Mapping] = None) -> Optional[Any]:
+    """
+    Día del mes de una tarea. Acepta el número de día o una fecha completa
+    ('YYYY-MM-DD'); con `period`, las fechas de otro mes devuelven None.
+    """
+    text = str(value).strip()
+    if '-' not in text:
+        return value
+    date = parse_date(text[:10])
+    if period is not None and (date.year, date.month) != (period['year'], period['month']):
+        return None
+    return date.day
+
+class ChunkProgress:
+    """Tramos ya completados de un rango, persistidos en JSON para poder reanudar."""
+
+    def __init__(self, path: Optional[str] = 'chunk_progress.json'):
+        self.path = path
+        self.logger = logging.getLogger('clockify_automation')
+        self.data: Dict[str, List[str]] = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    self.data = json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                self.logger.warning(f"No se pudo leer el progreso de tramos {path}: {str(e)}")
+
+    def is_done(self, range_key: str, period: Mapping) -> bool:
+        return period_id(period) in self.data.get(range_key, [])
+
+    def mark_done(self, range_key: str, period: Mapping):
+        done = self.data.setdefault(range_key, [])
+        if period_id(period) not in done:
+            done.append(period_id(period))
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+def range_key(config: Mapping) -> str:
+    """Identifica el rango configurado; otro rango no reutiliza el progreso."""
+    periods = config_periods(config)
+    return f"{period_id(periods[0]).split('/')[0]}/{period_id(periods[-1]).split('/')[1]}"
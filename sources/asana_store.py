@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def _in_window(task: Dict, since: date) -> bool:
+    """Mismo filtro que la consulta a Asana con completed_since y modified_since."""
+    if task.get('completed') and task.get('completed_at') and _parse(task['completed_at']).date() < since:
+        return False
+    return not (task.get('modified_at') and _parse(task['modified_at']).date() < since)
+
+class AsanaTaskStore:
+    """
+    Copia local de las tareas de Asana de un workspace y usuario con una marca
+    de agua (el `modified_at` más reciente visto). Las ejecuciones siguientes
+    solo piden a Asana lo modificado desde la marca y lo combinan por `gid`.
+    La clave no incluye fechas: los tramos de un rango comparten el store y
+    cada uno filtra sus fechas al leer. `since` es la fecha más antigua desde
+    la que el store está sincronizado.
+
+    La consulta incremental no ve las tareas reasignadas a otro usuario ni las
+    borradas: cada `full_sync_interval` segundos se vuelve a traer todo y se
+    descartan las guardadas que ya no vienen.
+    """
+
+    def __init__(self, path: Optional[str] = 'asana_store.json', full_sync_interval: float = 86400):
+        self.path = path
+        self.full_sync_interval = full_sync_interval
+        self.logger = logging.getLogger('clockify_automation')
+        # {'key': ..., 'since': fecha ISO, 'watermark': ISO o None,
+        #  'full_sync_at': epoch de la última descarga completa, 'tasks': {gid: tarea}}
+        self.data: Dict = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.data = json.load(f)
+            self.logger.debug(f"Store de Asana cargado desde {self.path}")
+        except (OSError, json.JSONDecodeError) as e:
+            self.logger.warning(f"No se pudo leer el store de Asana {self.path}: {str(e)}")
+            self.data = {}
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        self.data = {}
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _covers(self, since: date) -> bool:
+        stored_since = self.data.get('since')
+        return stored_since is not None and date.fromisoformat(stored_since) <= since
+
+    def _full_sync_due(self) -> bool:
+        full_sync_at = self.data.get('full_sync_at')
+        return full_sync_at is None or time.time() - full_sync_at >= self.full_sync_interval
+
+    def watermark(self, key: str, since: date) -> Optional[str]:
+        """
+        Marca de agua para la clave (workspace, usuario). None si hay que traer
+        todo desde `since`: otra clave, un tramo anterior a lo sincronizado o
+        una resincronización completa pendiente.
+        """
+        if self.data.get('key') != key or not self._covers(since) or self._full_sync_due():
+            return None
+        return self.data.get('watermark')
+
+    def tasks(self, since: Optional[date] = None) -> List[Dict]:
+        """
+        Tareas guardadas. Con `since` se aplica el mismo filtro que la consulta
+        a Asana (completed_since y modified_since): quedan afuera las
+        completadas o modificadas por última vez antes de esa fecha.
+        """
+        tasks = self.data.get('tasks', {}).values()
+        if since is None:
+            return list(tasks)
+        return [task for task in tasks if _in_window(task, since)]
+
+    def merge(self, key: str, tasks: Iterable[Dict], since: date, full: bool = False) -> int:
+        """
+        Combina las tareas descargadas (sincronizadas desde `since`) con las
+        guardadas y avanza la marca de agua. Con `full`, las tareas son la
+        respuesta completa desde `since`: las guardadas de esa ventana que no
+        vinieron (reasignadas o borradas) se descartan.
+        """
+        if self.data.get('key') != key:
+            # Otro workspace u otro usuario: se descarta lo anterior
+            self.data = {'key': key, 'since': None, 'watermark': None, 'tasks': {}}
+
+        stored = self.data['tasks']
+        watermark = self.data.get('watermark')
+        latest = _parse(watermark) if watermark else None
+        count = 0
+        fetched = set()
+        for task in tasks:
+            stored[task['gid']] = task
+            fetched.add(task['gid'])
+            count += 1
+            modified_at = task.get('modified_at')
+            if modified_at:
+                modified = _parse(modified_at)
+                if latest is None or modified > latest:
+                    latest = modified
+                    watermark = modified_at
+
+        if full:
+            stale = [gid for gid, task in stored.items() if gid not in fetched and _in_window(task, since)]
+            for gid in stale:
+                del stored[gid]
+            if stale:
+                self.logger.info(f"Se descartaron {len(stale)} tareas de Asana que ya no están asignadas al usuario")
+            self.data['full_sync_at'] = time.time()
+
+        if not self._covers(since):
+            self.data['since'] = since.isoformat()
+        self.data['watermark'] = watermark
+        self.save()
+        return count
+
+def store_from_config(config) -> Optional[AsanaTaskStore]:
+    """Crea el store si `asana.incremental` está activo."""
+    asana_config = config.get('asana', {})
+    if not asana_config.get('incremental', False):
+        return None
+    return AsanaTaskStore(asana_config.get('store_file', 'asana_store.json'),
+                          asana_config.get('full_sync_hours', 24) * 3600)
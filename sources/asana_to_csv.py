@@ -1,21 +1,88 @@
-from configuration.config import load_config
-from configuration.logger import setup_logger 
+from configuration.config import ConfigError
+from configuration.context import AppContext, build_context
 
 import asana
 import csv
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence
 import logging
 
+from configuration.names import normalize_name
+from sources.asana_store import AsanaTaskStore, store_from_config
+from sources.task_records import partition_by_client
+
 def between_dates(task_date: datetime, start_date: datetime, end_date: datetime) -> bool:
-    if start_date.year <= task_date.year <= end_date.year:
-        if start_date.month <= task_date.month <= end_date.month:
-            if start_date.day <= task_date.day <= end_date.day:
-                return True
-    return False
+    """Compara fechas de calendario completas, así los rangos que cruzan meses funcionan."""
+    return start_date.date() <= task_date.date() <= end_date.date()
+
+# Campos que realmente lee la normalización de tareas
+TASK_OPT_FIELDS = "name,completed,completed_at,due_on,start_on,modified_at,custom_fields.name,custom_fields.display_value,projects.name"
+
+# Campos personalizados donde se busca el cliente por defecto
+CLIENT_FIELD_NAMES = ['cliente', 'client', 'company']
+
+# Asana acepta como máximo 100 elementos por página
+DEFAULT_PAGE_SIZE = 100
+
+def _parse_asana_date(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value.replace('Z', '+00:00')) if value else None
+
+def _compact_task(task: Dict) -> Dict:
+    """
+    Reduce una tarea de Asana a los campos usados: el status sale del campo
+    personalizado, el resto de campos personalizados queda como nombre→valor
+    y los proyectos como lista de nombres.
+    """
+    compact = {key: task.get(key) for key in ('gid', 'name', 'completed', 'completed_at', 'due_on', 'start_on', 'modified_at')}
+    compact['custom_fields'] = {}
+    for field in task.get('custom_fields') or []:
+        if field['name'].lower()=="status":
+            compact['status'] = field['display_value']
+        elif field.get('display_value'):
+            compact['custom_fields'][field['name'].lower()] = field['display_value']
+    compact['projects'] = [project['name'] for project in task.get('projects') or [] if project.get('name')]
+    return compact
+
+class ClientMatcher:
+    """
+    Asigna cada tarea de Asana a un cliente de `workspace.clients` a partir de
+    los candidatos de la tarea (campos personalizados y proyectos), pasando
+    primero por la tabla `asana.client_mapping`.
+    """
+
+    def __init__(self, clients: Sequence[Mapping], mapping: Optional[Mapping] = None,
+                 default: Optional[str] = None):
+        self.clients = {normalize_name(client['name']): client['name'] for client in clients}
+        # Los destinos de la tabla se escriben igual que en workspace.clients
+        self.mapping = {
+            normalize_name(key): self.clients.get(normalize_name(value), value)
+            for key, value in (mapping or {}).items()
+        }
+        # Con un solo cliente configurado, todo lo que no se reconozca es suyo
+        if default is None and len(clients) == 1:
+            default = clients[0]['name']
+        self.default = default
+
+    @classmethod
+    def from_config(cls, config: Mapping) -> 'ClientMatcher':
+        asana_config = config.get('asana', {})
+        return cls(
+            config['workspace']['clients'],
+            asana_config.get('client_mapping'),
+            asana_config.get('default_client')
+        )
+
+    def match(self, candidates: Iterable[str]) -> Optional[str]:
+        for candidate in candidates:
+            key = normalize_name(candidate)
+            if key in self.mapping:
+                return self.mapping[key]
+            if key in self.clients:
+                return self.clients[key]
+        return self.default
 
 class AsanaTaskExtractor:
-    def __init__(self, access_token: str):
+    def __init__(self, access_token: str, page_size: int = DEFAULT_PAGE_SIZE):
         """Inicializa el cliente de Asana con un token de acceso."""
         self.logger = logging.getLogger('clockify_automation')
         self.logger.debug("Inicializando cliente de Asana")
@@ -23,115 +90,147 @@ class AsanaTaskExtractor:
         config.access_token = access_token
         self.client = asana.ApiClient(config)
         self.client.headers={'asana-enable': 'new_user_task_lists'}
-        
-    def get_my_tasks(self, workspace_id: str, start_date: datetime, end_date: datetime, client_name: str) -> List[Dict]:
-        """Obtiene todas las tareas del usuario en el rango de fechas especificado."""
-        users_api_instance = asana.UsersApi(self.client)
-        tasks_api_instance = asana.TasksApi(self.client)
-
-        me = users_api_instance.get_user("me", {})
-        user_id = me['gid']
-        self.logger.debug(f"ID de usuario obtenido: {user_id}")
+        self.page_size = min(max(1, page_size), DEFAULT_PAGE_SIZE)
 
+    def iter_raw_tasks(self, workspace_id: str, user_id: str, start_date: datetime,
+                       modified_since: Optional[str] = None) -> Iterator[Dict]:
+        """Recorre las tareas del usuario página a página, ya compactadas."""
+        tasks_api_instance = asana.TasksApi(self.client)
         opts = {
-            'limit': 100,
+            'limit': self.page_size,
             'assignee': user_id,
             'workspace': workspace_id,
             'completed_since': start_date.isoformat(),
-            'modified_since': start_date.isoformat(),
-            'opt_fields': "name,assignee,assignee.name,assignee_status,custom_fields,custom_fields.name,custom_fields.display_value,custom_fields.enum_value,custom_fields.enum_value.name,completed,completed_at,completed_by,completed_by.name,created_at,created_by,due_at,due_on,start_at,start_on,modified_at,workspace,workspace.name",
+            'modified_since': modified_since or start_date.isoformat(),
+            'opt_fields': TASK_OPT_FIELDS,
         }
-        
         self.logger.debug("Consultando tareas en Asana")
-        tasks_search = tasks_api_instance.get_tasks(opts)
-        tasks = []
-        for task in tasks_search:
-            for field in task['custom_fields']:
-                if field['name'].lower()=="status":
-                    task.update({'status':field['display_value']})
+        for task in tasks_api_instance.get_tasks(opts):
+            yield _compact_task(task)
+
+    def format_task(self, task: Dict, start_date: datetime, end_date: datetime, client_name: str) -> List[Dict]:
+        """Convierte una tarea en una fila por día trabajado dentro del rango."""
+        is_completed = task.get('completed', False)
+
+        task_status = task.get('status')
+        if task_status:
+            task_status = task_status.replace('Completed','Completada').replace('In Progress','En Progreso')
+        else:
+            task_status = 'Completada' if is_completed else 'No iniciada'
+
+        if task_status not in ['En Progreso','Completada']:
+            return []
+
+        # Cada fecha se parsea una sola vez
+        task_modified_date = _parse_asana_date(task.get('modified_at'))
+        if not between_dates(task_modified_date,start_date,end_date):
+            return []
+        due_date = _parse_asana_date(task.get('due_on'))
 
-            task.pop('custom_fields',None)
-            tasks.append(task)
+        if is_completed and task.get('completed_at'):
+            task_end_date = _parse_asana_date(task['completed_at'])
+        elif due_date:
+            task_end_date = due_date
+        else:
+            task_end_date = task_modified_date
 
-        self.logger.debug(f"Se encontraron {len(tasks)} tareas en total")
+        task_start_date = _parse_asana_date(task.get('start_on'))
+        if task_start_date:
+            task_start_date = task_modified_date if task_modified_date.isoformat() < task_start_date.isoformat() else task_start_date
+        else:
+            task_start_date = task_modified_date
 
+        if due_date and due_date.isoformat() < task_start_date.isoformat():
+            task_start_date = due_date
+
+        self.logger.debug("Procesando tarea: %s", task['name'])
+        # Días trabajados dentro del período; el período nunca cruza un cambio de mes
+        first_worked_date = max(task_start_date.date(), start_date.date())
+        last_worked_date = min(task_end_date.date(), end_date.date())
+
+        return [
+            {
+                'Dia': day,
+                'Cliente': client_name,
+                'Tarea': task['name'],
+                'Estado': task_status
+            }
+            for day in range(first_worked_date.day, last_worked_date.day + 1)
+        ] if first_worked_date <= last_worked_date else []
+
+    def get_my_tasks(self, workspace_id: str, start_date: datetime, end_date: datetime, matcher: ClientMatcher,
+                     store: Optional[AsanaTaskStore] = None,
+                     client_fields: Sequence[str] = CLIENT_FIELD_NAMES) -> List[Dict]:
+        """
+        Obtiene todas las tareas del usuario en el rango de fechas especificado,
+        asignando cada una a un cliente configurado con `matcher`. Una sola
+        consulta sirve para todos los clientes.
+        Las tareas se procesan a medida que llegan las páginas, sin guardar la
+        respuesta completa. Con `store`, solo se piden las tareas modificadas
+        desde la última sincronización.
+        """
+        users_api_instance = asana.UsersApi(self.client)
+
+        me = users_api_instance.get_user("me", {'opt_fields': 'gid'})
+        user_id = me['gid']
+        self.logger.debug(f"ID de usuario obtenido: {user_id}")
+
+        # Los campos pedidos forman parte de la clave: si cambian, el store se regenera.
+        # Las fechas no: en modo rango todos los tramos comparten la marca de agua
+        store_key = f"{workspace_id}:{user_id}:{TASK_OPT_FIELDS}"
+        watermark = store.watermark(store_key, start_date.date()) if store is not None else None
+        if watermark:
+            self.logger.info(f"Sincronización incremental de Asana desde {watermark}")
+
+        tasks = self.iter_raw_tasks(workspace_id, user_id, start_date, watermark)
+        if store is not None:
+            fetched = store.merge(store_key, tasks, start_date.date(), full=watermark is None)
+            self.logger.info(f"Se descargaron {fetched} tareas nuevas o modificadas")
+            tasks = store.tasks(start_date.date())
+
+        return self.normalize_tasks(tasks, start_date, end_date, matcher, client_fields)
+
+    def normalize_tasks(self, tasks: Iterable[Dict], start_date: datetime, end_date: datetime,
+                        matcher: ClientMatcher, client_fields: Sequence[str] = CLIENT_FIELD_NAMES) -> List[Dict]:
+        """Asigna cliente y convierte tareas ya compactadas en filas Cliente/Tarea/Dia."""
         formatted_tasks = []
+        total = 0
+        unassigned = 0
         for task in tasks:
+            total += 1
             try:
-                is_completed = task.get('completed', False)
-
-                task_status = task.get('status')
-                if task_status:
-                    task_status = task_status.replace('Completed','Completada').replace('In Progress','En Progreso')
-                else:
-                    task_status = 'Completada' if is_completed else 'No iniciada'
-
-                task_modified_date = task.get('modified_at',None)
-                task_modified_date = datetime.fromisoformat(task_modified_date.replace('Z', '+00:00')) if task_modified_date else None
-                
-                if is_completed and task.get('completed_at'):
-                    task_end_date = datetime.fromisoformat(task['completed_at'].replace('Z', '+00:00'))
-                elif task.get('due_on'):
-                    task_end_date = datetime.fromisoformat(task['due_on'].replace('Z', '+00:00'))
-                else:
-                    task_end_date = task_modified_date
-
-
-                task_start_date = task.get('start_on',None)
-                if task_start_date:
-                    task_start_date = datetime.fromisoformat(task_start_date.replace('Z', '+00:00'))
-                    task_start_date = task_modified_date if task_modified_date.isoformat() < task_start_date.isoformat() else task_start_date
-                else:
-                    task_start_date = task_modified_date
-
-                if task.get('due_on'):
-                    if datetime.fromisoformat(task['due_on'].replace('Z', '+00:00')).isoformat() < task_start_date.isoformat():
-                        task_start_date = datetime.fromisoformat(task['due_on'].replace('Z', '+00:00'))
-
-                include_task = between_dates(task_modified_date,start_date,end_date) and (task_status in ['En Progreso','Completada'])
-
-                # Incluir la tarea si está dentro del rango de fechas
-                if include_task:
-                    self.logger.debug(f"Procesando tarea: {task['name']}")
-                    current_day = task_start_date.day
-
-                    last_worked_day = task_end_date.day
-                    if task_end_date.month > end_date.month:
-                        last_worked_day = end_date.day
-
-                    while current_day <= last_worked_day:
-                        # Formatear la tarea
-                        formatted_task = {
-                            'Dia': current_day,
-                            'Cliente': client_name,
-                            'Tarea': task['name'],
-                            'Estado': task_status
-                        }
-                        formatted_tasks.append(formatted_task.copy())
-                        current_day += 1
-                
+                client_name = matcher.match(self._extract_client_from_task(task, client_fields))
+                if client_name is None:
+                    unassigned += 1
+                    self.logger.debug("Tarea sin cliente configurado: %s", task.get('name', 'Sin nombre'))
+                    continue
+                formatted_tasks.extend(self.format_task(task, start_date, end_date, client_name))
             except Exception as e:
                 self.logger.error(f"Error procesando tarea: {task.get('name', 'Sin nombre')} - {str(e)}")
                 continue
-        
+
+        self.logger.debug(f"Se encontraron {total} tareas en total")
+        if unassigned:
+            self.logger.warning(f"Se omitieron {unassigned} tareas que no corresponden a ningún cliente configurado")
         self.logger.info(f"Se procesaron {len(formatted_tasks)} entradas de tareas exitosamente")
         return formatted_tasks
     
-    def _extract_client_from_task(self, task: Dict) -> str:
-        """Extrae el nombre del cliente de los campos personalizados o del proyecto."""
+    def _extract_client_from_task(self, task: Dict, field_names: Sequence[str] = CLIENT_FIELD_NAMES) -> List[str]:
+        """Candidatos a nombre de cliente: campos personalizados y luego los proyectos (completo y prefijo)."""
+        candidates = []
         # Buscar en campos personalizados
-        if task.get('custom_fields'):
-            for field in task['custom_fields']:
-                if field['name'].lower() in ['cliente', 'client', 'company']:
-                    return field.get('display_value', 'Sin Cliente')
-        
-        # Si no hay campo personalizado, intentar extraer del nombre del proyecto
-        if task.get('projects'):
-            project_name = task['projects'][0]['name']
+        for name in field_names:
+            value = task.get('custom_fields', {}).get(name.lower())
+            if value:
+                candidates.append(value)
+
+        # Luego el nombre del proyecto, completo o lo que está antes de ' - '
+        for project_name in task.get('projects') or []:
+            candidates.append(project_name)
             if ' - ' in project_name:
-                return project_name.split(' - ')[0]
-        
-        return 'Sin Cliente'
+                candidates.append(project_name.split(' - ')[0])
+
+        return candidates
 
 def save_tasks_to_csv(tasks: List[Dict], output_file: str):
     """Guarda las tareas en un archivo CSV."""
@@ -159,72 +258,97 @@ def save_tasks_to_csv(tasks: List[Dict], output_file: str):
         logger.error(f"Error al guardar el archivo CSV: {str(e)}")
         raise
 
-def main(output_file: str = 'horarios.csv') -> bool:
-    """Función principal para extraer tareas de Asana."""
+def extract_tasks(ctx: AppContext) -> Optional[List[Dict]]:
+    """Extrae las tareas de Asana y las devuelve en memoria. None si hubo un error."""
+    config = ctx.config
+    logger = ctx.logger
+    logger.info("Iniciando extracción de tareas de Asana")
+    
+    # Obtener configuración de Asana
+    asana_config = config.get('asana', {})
+    access_token = asana_config.get('access_token')
+    workspace_id = asana_config.get('workspace_id')
+    
+    if not access_token or not workspace_id:
+        logger.error("Falta configuración de Asana (access_token o workspace_id)")
+        return None
+    
+    # Obtener fechas del rango desde la configuración de time
+    time_config = config.get('time', {})
     try:
-        config = load_config()
-        logger = setup_logger(config)
-        logger.info("Iniciando extracción de tareas de Asana")
-        
-        # Obtener configuración de Asana
-        asana_config = config.get('asana', {})
-        access_token = asana_config.get('access_token')
-        workspace_id = asana_config.get('workspace_id')
+        year = time_config.get('year')
+        month = time_config.get('month')
+        start_day = time_config.get('start_day')
+        end_day = time_config.get('end_day')
         
-        if not access_token or not workspace_id:
-            logger.error("Falta configuración de Asana (access_token o workspace_id)")
-            return False
+        start_date = datetime(year, month, start_day)
+        end_date = datetime(year, month, end_day)
+    except (ValueError, TypeError) as e:
+        logger.error(f"Error al procesar las fechas desde la configuración time: {str(e)}")
+        return None
+    
+    logger.info(f"Período de búsqueda: {start_date.date()} hasta {end_date.date()}")
+    
+    # Inicializar el extractor
+    logger.debug("Inicializando extractor de Asana")
+    extractor = AsanaTaskExtractor(access_token, asana_config.get('page_size', DEFAULT_PAGE_SIZE))
+    
+    try:
+        # Obtener tareas
+        logger.info("Obteniendo tareas de Asana...")
+        tasks = extractor.get_my_tasks(
+            workspace_id, start_date, end_date,
+            ClientMatcher.from_config(config),
+            store_from_config(config),
+            asana_config.get('client_fields', CLIENT_FIELD_NAMES)
+        )
+        logger.info(f"Se obtuvieron {len(tasks)} entradas de tareas")
+
+        unique_tasks = set([task['Tarea']+'---'+task['Estado'] for task in tasks])
         
-        # Obtener fechas del rango desde la configuración de time
-        time_config = config.get('time', {})
-        try:
-            year = time_config.get('year')
-            month = time_config.get('month')
-            start_day = time_config.get('start_day')
-            end_day = time_config.get('end_day')
-            
-            start_date = datetime(year, month, start_day)
-            end_date = datetime(year, month, end_day)
-        except (ValueError, TypeError) as e:
-            logger.error(f"Error al procesar las fechas desde la configuración time: {str(e)}")
-            return False
+        # Imprimir resumen
+        total_tasks = len(unique_tasks)
+        completed_tasks = sum(1 for task in unique_tasks if task.split('---')[1] == 'Completada')
+        in_progress_tasks = total_tasks - completed_tasks
         
-        logger.info(f"Período de búsqueda: {start_date.date()} hasta {end_date.date()}")
+        logger.info("\nResumen de tareas:")
+        logger.info(f"Total de tareas únicas: {total_tasks}")
+        logger.info(f"Tareas completadas: {completed_tasks}")
+        logger.info(f"Tareas en progreso: {in_progress_tasks}")
+        for client_name, client_tasks in partition_by_client(tasks).items():
+            logger.info(f"Entradas para {client_name}: {len(client_tasks)}")
         
-        # Inicializar el extractor
-        logger.debug("Inicializando extractor de Asana")
-        extractor = AsanaTaskExtractor(access_token)
+        # Eliminar el campo Estado que no necesitamos en el output
+        for task in tasks:
+            task.pop('Estado', None)
+        return tasks
         
-        try:
-            # Obtener tareas
-            logger.info("Obteniendo tareas de Asana...")
-            tasks = extractor.get_my_tasks(workspace_id, start_date, end_date, 'trafilea')
-            logger.info(f"Se obtuvieron {len(tasks)} entradas de tareas")
-
-            unique_tasks = set([task['Tarea']+'---'+task['Estado'] for task in tasks])
-            
-            # Imprimir resumen
-            total_tasks = len(unique_tasks)
-            completed_tasks = sum(1 for task in unique_tasks if task.split('---')[1] == 'Completada')
-            in_progress_tasks = total_tasks - completed_tasks
-            
-            logger.info("\nResumen de tareas:")
-            logger.info(f"Total de tareas únicas: {total_tasks}")
-            logger.info(f"Tareas completadas: {completed_tasks}")
-            logger.info(f"Tareas en progreso: {in_progress_tasks}")
-            
-            # Guardar en CSV
-            save_tasks_to_csv(tasks, output_file)
-            logger.info("Proceso completado exitosamente")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error al procesar las tareas: {str(e)}", exc_info=True)
+    except Exception as e:
+        logger.error(f"Error al procesar las tareas: {str(e)}", exc_info=True)
+        return None
+
+def main(output_file: str = 'horarios.csv', ctx: Optional[AppContext] = None) -> bool:
+    """Función principal para extraer tareas de Asana y agregarlas al CSV."""
+    logger = logging.getLogger('clockify_automation')
+    try:
+        ctx = ctx or build_context()
+        logger = ctx.logger
+
+        tasks = extract_tasks(ctx)
+        if tasks is None:
             return False
 
+        # Guardar en CSV
+        save_tasks_to_csv(tasks, output_file)
+        logger.info("Proceso completado exitosamente")
+        return True
+
+    except ConfigError as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
         logger.error(f"Error en la extracción de Asana: {str(e)}", exc_info=True)
         return False
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
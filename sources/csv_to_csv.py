@@ -1,38 +1,55 @@
-from configuration.config import load_config
-from configuration.logger import setup_logger 
+from configuration.config import ConfigError
+from configuration.context import AppContext, build_context
+from configuration.periods import task_day
+from sources.task_records import write_tasks_csv
 
+import contextlib
 import csv
 import logging
-from typing import  Dict
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 import os
 
+# Filas por bloque al leer con pandas y al escribir el CSV de salida
+DEFAULT_CHUNK_SIZE = 10000
+
+class CsvFormatError(Exception):
+    """El CSV no tiene las columnas que pide el mapeo."""
+
+def required_columns(mapping: Mapping) -> List[str]:
+    """Columnas del CSV que usa el mapeo, en orden y sin repetir."""
+    columns = []
+    for map_config in mapping.values():
+        if map_config['type'] == 'column' and map_config['value'] not in columns:
+            columns.append(map_config['value'])
+    return columns
+
+def check_headers(headers: Optional[Iterable[str]], mapping: Mapping):
+    """Lanza CsvFormatError si faltan columnas requeridas según el mapeo."""
+    if headers is None:
+        raise CsvFormatError("El archivo CSV está vacío")
+    missing_fields = set(required_columns(mapping)) - set(headers)
+    if missing_fields:
+        raise CsvFormatError(f"Columnas requeridas faltantes en el CSV: {missing_fields}")
+
 def validate_csv_format(file_path: str, mapping: Dict) -> bool:
-    """Valida que el CSV tenga el formato correcto según el mapeo configurado."""
+    """Valida que el CSV tenga el formato correcto según el mapeo configurado (solo lee el encabezado y la primera fila)."""
     logger = logging.getLogger('clockify_automation')
     
     try:
         with open(file_path, 'r', encoding='utf-8') as csvfile:
             reader = csv.DictReader(csvfile)
-            headers = set(reader.fieldnames)
-            
-            # Verificar columnas requeridas según el mapeo
-            required_columns = set()
-            for field, map_config in mapping.items():
-                if map_config['type'] == 'column':
-                    required_columns.add(map_config['value'])
-            
-            if not required_columns.issubset(headers):
-                missing_fields = required_columns - headers
-                logger.error(f"Columnas requeridas faltantes en el CSV: {missing_fields}")
-                return False
-                
+            check_headers(reader.fieldnames, mapping)
+
             # Validar que haya al menos una fila de datos
-            if not any(row for row in reader):
+            if next(reader, None) is None:
                 logger.error("El archivo CSV está vacío")
                 return False
                 
         return True
         
+    except CsvFormatError as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
         logger.error(f"Error validando el archivo CSV: {str(e)}")
         return False
@@ -55,93 +72,227 @@ def map_row_to_task(row: Dict, mapping: Dict) -> Dict:
     
     return task
 
-def process_csv_tasks(input_file: str, output_file: str, mapping: Dict) -> bool:
-    """Procesa las tareas del CSV de entrada y las agrega al archivo de salida."""
+def _iter_rows_csv(csvfile, mapping: Mapping) -> Iterator[Dict]:
+    reader = csv.DictReader(csvfile)
+    check_headers(reader.fieldnames, mapping)
+    return iter(reader)
+
+def _iter_rows_pandas(input_file: str, mapping: Mapping, chunk_size: int) -> Iterator[Dict]:
+    """Lee por bloques con pandas, cargando solo las columnas del mapeo."""
+    import pandas as pd
+
+    columns = required_columns(mapping)
+    headers = pd.read_csv(input_file, nrows=0, encoding='utf-8').columns
+    check_headers(headers, mapping)
+    for chunk in pd.read_csv(input_file, usecols=columns, dtype=str, keep_default_na=False,
+                             chunksize=chunk_size, encoding='utf-8'):
+        yield from chunk.to_dict('records')
+
+def iter_csv_tasks(input_file: str, mapping: Mapping, period: Optional[Mapping] = None,
+                   stats: Optional[Dict] = None, engine: str = 'csv',
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Recorre el CSV una sola vez: valida el encabezado, mapea cada fila y la
+    entrega sin acumular el archivo en memoria. Los errores por fila se
+    cuentan en `stats` en lugar de loguearse uno por uno.
+    """
+    stats = stats if stats is not None else {}
+    stats.update({'rows': 0, 'tasks': 0, 'out_of_period': 0, 'errors': {}})
+
+    def count_error(reason: str):
+        stats['errors'][reason] = stats['errors'].get(reason, 0) + 1
+
+    with contextlib.ExitStack() as stack:
+        if engine == 'pandas':
+            rows = _iter_rows_pandas(input_file, mapping, chunk_size)
+        else:
+            rows = _iter_rows_csv(stack.enter_context(open(input_file, 'r', encoding='utf-8')), mapping)
+        for row in rows:
+            stats['rows'] += 1
+            try:
+                task = map_row_to_task(row, mapping)
+            except KeyError:
+                count_error('columna no encontrada')
+                continue
+            if any(value is None or str(value).strip() == '' for value in task.values()):
+                count_error('fila incompleta')
+                continue
+            try:
+                day = task_day(task['Dia'], period)
+            except ValueError:
+                count_error('fecha inválida')
+                continue
+            if day is None:
+                stats['out_of_period'] += 1
+                continue
+            task['Dia'] = day
+            stats['tasks'] += 1
+            yield task
+
+def log_csv_stats(input_file: str, stats: Dict):
+    logger = logging.getLogger('clockify_automation')
+    errors = sum(stats['errors'].values())
+    logger.info(f"Se encontraron {stats['tasks']} tareas válidas en {stats['rows']} filas de {input_file}")
+    if stats['out_of_period']:
+        logger.info(f"Se omitieron {stats['out_of_period']} filas fuera del período")
+    if errors:
+        detail = ", ".join(f"{reason}: {count}" for reason, count in sorted(stats['errors'].items()))
+        logger.warning(f"Se descartaron {errors} filas con errores ({detail})")
+
+def read_csv_tasks(input_file: str, mapping: Dict, period: Optional[Mapping] = None,
+                   engine: str = 'csv') -> Optional[List[Dict]]:
+    """
+    Lee y mapea las tareas del CSV de entrada en una sola pasada. None si el
+    archivo no es válido. Con `period`, las filas con fecha completa de otro
+    mes se descartan.
+
+    Devuelve una lista porque el pipeline agrupa las tareas por cliente antes
+    de planificar: la memoria crece con la cantidad de tareas mapeadas (no con
+    las filas crudas). Para volcar a un archivo sin acumular, usar
+    process_csv_tasks.
+    """
     logger = logging.getLogger('clockify_automation')
     
     try:
-        if not validate_csv_format(input_file, mapping):
-            return False
-            
         logger.info(f"Procesando tareas desde {input_file}")
+        stats = {}
+        tasks = list(iter_csv_tasks(input_file, mapping, period, stats, engine))
+        if not stats['rows']:
+            logger.error("El archivo CSV está vacío")
+            return None
+        log_csv_stats(input_file, stats)
+        return tasks
         
-        # Leer tareas del archivo de entrada
-        tasks = []
-        with open(input_file, 'r', encoding='utf-8') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for row in reader:
-                try:
-                    task = map_row_to_task(row, mapping)
-                    tasks.append(task)
-                except KeyError as e:
-                    logger.warning(f"Error mapeando fila, columna no encontrada: {str(e)}")
-                    continue
-                except Exception as e:
-                    logger.warning(f"Error procesando fila: {str(e)}")
-                    continue
-        
-        logger.info(f"Se encontraron {len(tasks)} tareas válidas en el archivo")
-        
-        # Agregar al archivo de salida
-        with open(output_file, 'a', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['Cliente', 'Tarea', 'Dia']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writerows(tasks)
-            
-        logger.info(f"Tareas agregadas exitosamente a {output_file}")
+    except CsvFormatError as e:
+        logger.error(str(e))
+        return None
+    except Exception as e:
+        logger.error(f"Error procesando el archivo CSV: {str(e)}", exc_info=True)
+        return None
+
+def process_csv_tasks(input_file: str, output_file: str, mapping: Dict, period: Optional[Mapping] = None,
+                      engine: str = 'csv') -> bool:
+    """
+    Procesa las tareas del CSV de entrada y las agrega al archivo de salida
+    por bloques, sin cargar el archivo completo en memoria.
+    """
+    logger = logging.getLogger('clockify_automation')
+
+    try:
+        stats = {}
+        written = write_tasks_csv(iter_csv_tasks(input_file, mapping, period, stats, engine),
+                                  output_file, append=True)
+        if not stats['rows']:
+            logger.error("El archivo CSV está vacío")
+            return False
+        log_csv_stats(input_file, stats)
+        logger.info(f"Se agregaron {written} tareas a {output_file}")
         return True
-        
+
+    except CsvFormatError as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
         logger.error(f"Error procesando el archivo CSV: {str(e)}", exc_info=True)
         return False
 
-def main(output_file: str = 'horarios.csv') -> bool:
-    """Función principal para procesar fuentes CSV."""
-    try:
-        config = load_config()
-        logger = setup_logger(config)
-        
-        logger.info("Iniciando procesamiento de fuentes CSV")
+def get_csv_sources(config: Mapping) -> List[Dict]:
+    """Fuentes CSV habilitadas en la configuración."""
+    return [
+        source for source in config['execution'].get('sources', [])
+        if source.get('type') == 'csv' and source.get('enabled', False)
+    ]
+
+def _source_settings(source: Mapping) -> Optional[Tuple[str, Mapping]]:
+    """Archivo y mapeo de una fuente CSV. None (y se loguea) si falta algo."""
+    logger = logging.getLogger('clockify_automation')
+    file_path = source.get('file_path')
+    mapping = source.get('mapping')
+    
+    if not file_path:
+        logger.error("Ruta de archivo CSV no especificada")
+        return None
         
-        # Obtener fuentes CSV habilitadas
-        csv_sources = [
-            source for source in config['execution'].get('sources', [])
-            if source.get('type') == 'csv' and source.get('enabled', False)
-        ]
+    if not mapping:
+        logger.error("Configuración de mapeo no especificada")
+        return None
         
+    if not os.path.exists(file_path):
+        logger.error(f"Archivo CSV no encontrado: {file_path}")
+        return None
+
+    return file_path, mapping
+
+def read_source(source: Dict, period: Optional[Mapping] = None) -> Optional[List[Dict]]:
+    """Valida la configuración de una fuente CSV y devuelve sus tareas. None si hubo un error."""
+    settings = _source_settings(source)
+    if settings is None:
+        return None
+
+    file_path, mapping = settings
+    logging.getLogger('clockify_automation').info(f"Procesando archivo CSV: {file_path}")
+    return read_csv_tasks(file_path, mapping, period, source.get('engine', 'csv'))
+
+def extract_tasks(ctx: AppContext) -> Optional[List[Dict]]:
+    """Lee todas las fuentes CSV habilitadas y devuelve sus tareas en memoria. None si alguna falló."""
+    logger = ctx.logger
+    logger.info("Iniciando procesamiento de fuentes CSV")
+
+    csv_sources = get_csv_sources(ctx.config)
+    if not csv_sources:
+        logger.info("No hay fuentes CSV habilitadas")
+        return []
+
+    # En modo rango la sección time solo trae year/month una vez acotada a un tramo
+    period = ctx.config['time'] if 'year' in ctx.config['time'] else None
+    tasks = []
+    success = True
+    for source in csv_sources:
+        source_tasks = read_source(source, period)
+        if source_tasks is None:
+            success = False
+            continue
+        tasks.extend(source_tasks)
+
+    return tasks if success else None
+
+def main(output_file: str = 'horarios.csv', ctx: Optional[AppContext] = None) -> bool:
+    """
+    Función principal para procesar fuentes CSV. Cada fuente se vuelca a
+    `output_file` fila por fila, sin juntar las tareas en memoria.
+    """
+    logger = logging.getLogger('clockify_automation')
+    try:
+        ctx = ctx or build_context()
+        logger = ctx.logger
+
+        csv_sources = get_csv_sources(ctx.config)
         if not csv_sources:
             logger.info("No hay fuentes CSV habilitadas")
             return True
-        
+
+        # Validar todas las fuentes antes de escribir, así un error no deja
+        # el archivo de salida con solo una parte de las fuentes
+        settings = [_source_settings(source) for source in csv_sources]
+        if any(setting is None or not validate_csv_format(*setting) for setting in settings):
+            return False
+
+        period = ctx.config['time'] if 'year' in ctx.config['time'] else None
         success = True
-        for source in csv_sources:
-            file_path = source.get('file_path')
-            mapping = source.get('mapping')
-            
-            if not file_path:
-                logger.error("Ruta de archivo CSV no especificada")
-                success = False
-                continue
-                
-            if not mapping:
-                logger.error("Configuración de mapeo no especificada")
-                success = False
-                continue
-                
-            if not os.path.exists(file_path):
-                logger.error(f"Archivo CSV no encontrado: {file_path}")
-                success = False
-                continue
-                
+        for source, (file_path, mapping) in zip(csv_sources, settings):
             logger.info(f"Procesando archivo CSV: {file_path}")
-            if not process_csv_tasks(file_path, output_file, mapping):
-                success = False
-        
+            success = process_csv_tasks(file_path, output_file, mapping, period,
+                                        source.get('engine', 'csv')) and success
+        if success:
+            logger.info(f"Tareas agregadas exitosamente a {output_file}")
         return success
         
+    except ConfigError as e:
+        logger.error(str(e))
+        return False
     except Exception as e:
         logger.error(f"Error en el procesamiento de CSV: {str(e)}", exc_info=True)
         return False
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main() 
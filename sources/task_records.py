@@ -0,0 +1,41 @@
+import csv
+import itertools
+import logging
+from typing import Dict, Iterable, List
+
+# Columnas del formato intermedio de tareas (horarios.csv)
+TASK_FIELDNAMES = ['Cliente', 'Tarea', 'Dia']
+
+def partition_by_client(tasks: Iterable[Dict]) -> Dict[str, List[Dict]]:
+    """Agrupa las tareas por cliente (sin distinguir mayúsculas) en una sola pasada."""
+    partitions: Dict[str, List[Dict]] = {}
+    for task in tasks:
+        partitions.setdefault(str(task['Cliente']).lower(), []).append(task)
+    return partitions
+
+def write_tasks_csv(tasks: Iterable[Dict], output_file: str, append: bool = False,
+                    chunk_size: int = 10000) -> int:
+    """
+    Escribe las tareas en formato horarios.csv por bloques de `chunk_size`
+    filas; acepta un iterador. Devuelve la cantidad de filas escritas.
+    """
+    logger = logging.getLogger('clockify_automation')
+    count = 0
+    tasks = iter(tasks)
+    with open(output_file, 'a' if append else 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=TASK_FIELDNAMES, extrasaction='ignore')
+        if not append:
+            writer.writeheader()
+        while True:
+            chunk = list(itertools.islice(tasks, chunk_size))
+            if not chunk:
+                break
+            writer.writerows(chunk)
+            count += len(chunk)
+    logger.debug(f"Se escribieron {count} tareas en {output_file}")
+    return count
+
+def read_tasks_csv(input_file: str) -> List[Dict]:
+    """Lee un archivo en formato horarios.csv."""
+    with open(input_file, 'r', encoding='utf-8') as csvfile:
+        return list(csv.DictReader(csvfile))
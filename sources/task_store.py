@@ -0,0 +1,202 @@
+import abc
+import datetime
+import itertools
+import logging
+import os
+import sqlite3
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional
+
+from configuration.periods import is_range_mode, parse_date, task_day
+from sources.task_records import partition_by_client, read_tasks_csv, write_tasks_csv
+
+class TaskStore(abc.ABC):
+    """
+    Almacenamiento intermedio de tareas (Cliente, Tarea, Dia). Las etapas
+    escriben con `write` y el scheduler consulta por cliente y rango de días.
+    Con `period`, `write` guarda solo los días del tramo (con `append`,
+    reemplazando las filas que ya tuviera ese tramo) y `tasks_for_client`
+    devuelve solo las tareas de ese año y mes.
+    """
+
+    @abc.abstractmethod
+    def write(self, tasks: Iterable[Dict], append: bool = False,
+              period: Optional[Mapping] = None) -> int:
+        """Guarda las tareas y devuelve cuántas se escribieron."""
+
+    @abc.abstractmethod
+    def tasks_for_client(self, client_name: str, start_day: Optional[int] = None,
+                         end_day: Optional[int] = None, period: Optional[Mapping] = None) -> List[Dict]:
+        """Tareas de un cliente, con 'Dia' como número de día del mes."""
+
+    def close(self):
+        pass
+
+class CsvTaskStore(TaskStore):
+    """
+    Formato horarios.csv. En el modo clásico la columna Dia guarda el número de
+    día, como siempre; en los tramos del modo rango guarda la fecha completa
+    ('YYYY-MM-DD') para que las tareas de un mes no aparezcan en otro. Las
+    filas con el número de día solo valen para cualquier período.
+    Cada consulta lee el archivo completo, una sola vez por instancia.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._partitions: Optional[Dict[str, List[Dict]]] = None
+
+    def write(self, tasks: Iterable[Dict], append: bool = False,
+              period: Optional[Mapping] = None) -> int:
+        self._partitions = None
+        if period and is_range_mode(period):
+            tasks = (
+                dict(task, Dia=datetime.date(period['year'], period['month'], day).isoformat())
+                if day is not None else task
+                for task, day in _in_period(tasks, period)
+            )
+        elif period:
+            tasks = (task for task, _ in _in_period(tasks, period))
+        if append and period and is_range_mode(period) and os.path.exists(self.path):
+            # Reanudar un rango vuelve a escribir el tramo: sus filas anteriores se reemplazan
+            kept = [task for task in read_tasks_csv(self.path) if not _stored_in_period(task, period)]
+            tmp_path = f"{self.path}.tmp"
+            written = write_tasks_csv(itertools.chain(kept, tasks), tmp_path) - len(kept)
+            os.replace(tmp_path, self.path)
+            return written
+        return write_tasks_csv(tasks, self.path, append=append)
+
+    def tasks_for_client(self, client_name: str, start_day: Optional[int] = None,
+                         end_day: Optional[int] = None, period: Optional[Mapping] = None) -> List[Dict]:
+        if self._partitions is None:
+            self._partitions = partition_by_client(read_tasks_csv(self.path))
+        tasks = []
+        for task in self._partitions.get(client_name.lower(), []):
+            try:
+                day = _day(task_day(task['Dia'], period))
+            except ValueError:
+                continue
+            if day is None:
+                continue
+            if (start_day is not None and day < start_day) or (end_day is not None and day > end_day):
+                continue
+            tasks.append(dict(task, Dia=day))
+        return tasks
+
+class SqliteTaskStore(TaskStore):
+    """
+    Tareas en SQLite con índice por (cliente, año, mes, día): el scheduler
+    trae solo las filas de un cliente y un rango de días, sin recorrer todo.
+    """
+
+    def __init__(self, path: str = 'tareas.db'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                client_key TEXT NOT NULL,
+                client TEXT NOT NULL,
+                task TEXT NOT NULL,
+                day INTEGER,
+                year INTEGER,
+                month INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_tasks_client_day ON tasks (client_key, year, month, day);
+        """)
+
+    def write(self, tasks: Iterable[Dict], append: bool = False,
+              period: Optional[Mapping] = None) -> int:
+        year = period.get('year') if period else None
+        month = period.get('month') if period else None
+        rows = (
+            (str(task['Cliente']).lower(), str(task['Cliente']), task['Tarea'], day, year, month)
+            for task, day in _in_period(tasks, period)
+        )
+        with self.connection:
+            if not append:
+                self.connection.execute("DELETE FROM tasks")
+            elif year is not None:
+                # Reanudar un rango vuelve a escribir el tramo: sus filas anteriores se reemplazan
+                self.connection.execute(
+                    "DELETE FROM tasks WHERE year = ? AND month = ? AND day BETWEEN ? AND ?",
+                    (year, month, period.get('start_day', 1), period.get('end_day', 31))
+                )
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT INTO tasks (client_key, client, task, day, year, month) VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            return self.connection.total_changes - before
+
+    def tasks_for_client(self, client_name: str, start_day: Optional[int] = None,
+                         end_day: Optional[int] = None, period: Optional[Mapping] = None) -> List[Dict]:
+        query = "SELECT client, task, day FROM tasks WHERE client_key = ?"
+        params: List = [client_name.lower()]
+        if period:
+            # Las tareas guardadas sin período valen para cualquiera
+            query += " AND (year IS NULL OR (year = ? AND month = ?))"
+            params += [period['year'], period['month']]
+        if start_day is not None:
+            query += " AND day >= ?"
+            params.append(start_day)
+        if end_day is not None:
+            query += " AND day <= ?"
+            params.append(end_day)
+        query += " ORDER BY id"
+        return [
+            {'Cliente': client, 'Tarea': task, 'Dia': day}
+            for client, task, day in self.connection.execute(query, params)
+        ]
+
+    def close(self):
+        self.connection.close()
+
+def _day(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+def _stored_in_period(task: Mapping, period: Mapping) -> bool:
+    """True si la fila del CSV tiene una fecha completa dentro del tramo."""
+    text = str(task.get('Dia', '')).strip()
+    if '-' not in text:
+        return False
+    try:
+        date = parse_date(text[:10])
+    except ValueError:
+        return False
+    return ((date.year, date.month) == (period['year'], period['month'])
+            and period.get('start_day', 1) <= date.day <= period.get('end_day', 31))
+
+def _in_period(tasks: Iterable[Dict], period: Optional[Mapping]) -> Iterator:
+    """
+    Pares (tarea, día) de las tareas dentro de los días del tramo. En modo
+    rango cada tramo agrega sus filas al mismo store, así no se repiten.
+    Las fechas completas de otro mes se descartan; las tareas sin un día
+    válido pasan con día None.
+    """
+    start_day = period.get('start_day') if period else None
+    end_day = period.get('end_day') if period else None
+    for task in tasks:
+        try:
+            value = task_day(task['Dia'], period if period and 'year' in period else None)
+        except ValueError:
+            value = task['Dia']
+        if value is None:
+            continue
+        day = _day(value)
+        if day is not None and ((start_day is not None and day < start_day)
+                                or (end_day is not None and day > end_day)):
+            continue
+        yield task, day
+
+# Extensiones reconocidas por open_task_store
+SQLITE_EXTENSIONS = ('.db', '.sqlite', '.sqlite3')
+
+def open_task_store(path: str) -> TaskStore:
+    """Elige el backend según la extensión: SQLite (.db, .sqlite) o CSV (el resto)."""
+    logger = logging.getLogger('clockify_automation')
+    if os.path.splitext(path)[1].lower() in SQLITE_EXTENSIONS:
+        logger.debug(f"Usando store de tareas SQLite: {path}")
+        return SqliteTaskStore(path)
+    logger.debug(f"Usando store de tareas CSV: {path}")
+    return CsvTaskStore(path)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Los módulos del repo se importan desde la raíz, como en `python app.py`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
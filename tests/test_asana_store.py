@@ -0,0 +1,55 @@
+from datetime import date
+
+from sources.asana_store import AsanaTaskStore
+
+KEY = 'ws-1:user-1:fields'
+MARCH = date(2025, 3, 1)
+
+def task(gid: str, modified_at: str, **fields) -> dict:
+    return dict({'gid': gid, 'name': f'Tarea {gid}', 'modified_at': modified_at}, **fields)
+
+def test_incremental_merge_advances_watermark(tmp_path):
+    store = AsanaTaskStore(str(tmp_path / 'asana.json'))
+    assert store.watermark(KEY, MARCH) is None
+
+    store.merge(KEY, [task('1', '2025-03-02T10:00:00Z'), task('2', '2025-03-05T10:00:00Z')], MARCH, full=True)
+    assert store.watermark(KEY, MARCH) == '2025-03-05T10:00:00Z'
+
+    # Una ejecución posterior solo trae lo modificado y lo combina por gid
+    reloaded = AsanaTaskStore(str(tmp_path / 'asana.json'))
+    reloaded.merge(KEY, [task('1', '2025-03-07T10:00:00Z', name='Renombrada')], MARCH)
+    assert reloaded.watermark(KEY, MARCH) == '2025-03-07T10:00:00Z'
+    assert sorted(t['name'] for t in reloaded.tasks(MARCH)) == ['Renombrada', 'Tarea 2']
+
+def test_watermark_needs_full_fetch_for_other_key_or_earlier_period(tmp_path):
+    store = AsanaTaskStore(str(tmp_path / 'asana.json'))
+    store.merge(KEY, [task('1', '2025-03-02T10:00:00Z')], MARCH, full=True)
+
+    assert store.watermark('ws-1:user-2:fields', MARCH) is None
+    assert store.watermark(KEY, date(2025, 2, 1)) is None
+    assert store.watermark(KEY, date(2025, 4, 1)) == '2025-03-02T10:00:00Z'
+
+def test_tasks_filters_like_asana_query(tmp_path):
+    store = AsanaTaskStore(str(tmp_path / 'asana.json'))
+    store.merge(KEY, [
+        task('viejo', '2025-02-20T10:00:00Z'),
+        task('completada', '2025-03-10T10:00:00Z', completed=True, completed_at='2025-02-27T10:00:00Z'),
+        task('abierta', '2025-03-10T10:00:00Z', completed=False)
+    ], date(2025, 2, 1), full=True)
+
+    assert [t['gid'] for t in store.tasks(MARCH)] == ['abierta']
+    assert len(store.tasks()) == 3
+
+def test_full_sync_drops_tasks_that_did_not_come_back(tmp_path):
+    store = AsanaTaskStore(str(tmp_path / 'asana.json'))
+    store.merge(KEY, [task('antes', '2025-02-10T10:00:00Z'), task('mia', '2025-03-02T10:00:00Z'),
+                      task('reasignada', '2025-03-03T10:00:00Z')], date(2025, 2, 1), full=True)
+
+    # Resincronización completa desde marzo: 'reasignada' ya no viene
+    store.merge(KEY, [task('mia', '2025-03-02T10:00:00Z')], MARCH, full=True)
+    assert sorted(t['gid'] for t in store.tasks()) == ['antes', 'mia']
+
+def test_full_sync_is_due_after_interval(tmp_path):
+    store = AsanaTaskStore(str(tmp_path / 'asana.json'), full_sync_interval=0)
+    store.merge(KEY, [task('1', '2025-03-02T10:00:00Z')], MARCH, full=True)
+    assert store.watermark(KEY, MARCH) is None
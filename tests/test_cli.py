@@ -0,0 +1,53 @@
+import json
+
+import yaml
+
+import cli
+import clockify.csv_to_clockify
+from configuration.periods import ChunkProgress, config_periods, range_key
+
+def write_config(tmp_path) -> str:
+    config = {
+        'workspace': {'name': 'WS', 'clients': [{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}]},
+        'time': {'start_date': '2025-03-03', 'end_date': '2025-03-23', 'chunk': 'week',
+                 'lunch_start': 12.5, 'lunch_end': 13.5},
+        'execution': {
+            'task_store': str(tmp_path / 'tareas.db'),
+            'chunk_progress_file': str(tmp_path / 'progress.json'),
+            'ledger_file': None,
+            'metrics': {'json_file': None},
+            'logging': {'console_level': 'WARNING', 'file_name': str(tmp_path / 'log.log')},
+            'sources': []
+        },
+        'clockify': {'api_key': 'test', 'cache_file': None}
+    }
+    path = tmp_path / 'config.yaml'
+    path.write_text(yaml.safe_dump(config), encoding='utf-8')
+    return str(path)
+
+def test_submit_shares_chunk_progress_with_run(tmp_path, monkeypatch):
+    config_file = write_config(tmp_path)
+    config = yaml.safe_load(open(config_file, encoding='utf-8'))
+    periods = config_periods(config)
+    ChunkProgress(str(tmp_path / 'progress.json')).mark_done(range_key(config), periods[0])
+
+    scheduled = []
+    monkeypatch.setattr(clockify.csv_to_clockify, 'main',
+                        lambda input_file, ctx: scheduled.append(ctx.config['time']['start_day']) or True)
+
+    assert cli.main(['--config', config_file, 'submit']) == 0
+    # La primera semana ya la completó `run`; las otras dos se envían y quedan marcadas
+    assert scheduled == [10, 17]
+    with open(tmp_path / 'progress.json', encoding='utf-8') as f:
+        assert len(json.load(f)[range_key(config)]) == 3
+
+    scheduled.clear()
+    assert cli.main(['--config', config_file, 'submit']) == 0
+    assert scheduled == []
+
+def test_schedule_does_not_mark_chunks(tmp_path, monkeypatch):
+    config_file = write_config(tmp_path)
+    monkeypatch.setattr(clockify.csv_to_clockify, 'main', lambda input_file, ctx: True)
+
+    assert cli.main(['--config', config_file, 'schedule']) == 0
+    assert not (tmp_path / 'progress.json').exists()
@@ -0,0 +1,67 @@
+import pytest
+
+from configuration.config import ConfigError, freeze, merge_config, validate_config
+from configuration.context import build_context
+
+def make_config(**overrides) -> dict:
+    config = {
+        'workspace': {'name': 'WS', 'clients': [{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}]},
+        'time': {'year': 2025, 'month': 3, 'start_day': 1, 'end_day': 31, 'lunch_start': 12.5, 'lunch_end': 13.5},
+        'execution': {'sources': []},
+        'clockify': {'api_key': 'test'}
+    }
+    return merge_config(config, overrides)
+
+def test_valid_config_has_no_errors():
+    assert validate_config(make_config()) == []
+    assert validate_config(make_config(time={'start_date': '2025-03-01', 'end_date': '2025-04-30',
+                                             'chunk': 'week'})) == []
+
+def test_collects_every_error():
+    config = make_config(time={'month': 'marzo', 'lunch_end': 'tarde'}, clockify={'api_key': ''})
+    del config['workspace']
+    errors = validate_config(config)
+    assert "Falta la sección 'workspace'" in errors
+    assert "'time.month' debe ser un entero" in errors
+    assert "'time.lunch_end' debe ser un número" in errors
+    assert "Falta 'clockify.api_key'" in errors
+
+@pytest.mark.parametrize('time_config, message', [
+    ({'start_day': 20, 'end_day': 10}, "'time.start_day' es posterior a 'time.end_day'"),
+    ({'month': 2, 'end_day': 30}, "Fechas inválidas en 'time'"),
+    ({'start_date': '2025-05-01', 'end_date': '2025-04-01'}, "'time.start_date' es posterior a 'time.end_date'"),
+    ({'start_date': '2025-03-01', 'end_date': '2025-03-31', 'chunk': 'day'}, "'time.chunk' debe ser uno de"),
+])
+def test_invalid_periods(time_config, message):
+    errors = validate_config(make_config(time=time_config))
+    assert any(error.startswith(message) for error in errors), errors
+
+def test_booleans_are_not_hours():
+    config = make_config(workspace={'clients': [{'name': 'Acme', 'project': 'Web', 'task': 'Dev',
+                                                 'start_time': True}]})
+    assert "'workspace.clients[0].start_time' debe ser un número" in validate_config(config)
+
+def test_asana_clients_must_exist_in_workspace():
+    config = make_config(
+        execution={'sources': [{'type': 'asana', 'enabled': True}]},
+        asana={'access_token': 't', 'workspace_id': '1', 'client_mapping': {'ACME Corp': ' acme '},
+               'default_client': 'Otro'}
+    )
+    assert validate_config(config) == ["El cliente 'Otro' de la configuración de Asana no está en 'workspace.clients'"]
+
+def test_disabled_sources_are_not_validated():
+    config = make_config(execution={'sources': [{'type': 'csv', 'enabled': False}]})
+    assert validate_config(config) == []
+
+def test_freeze_is_deep_and_read_only():
+    frozen = freeze(make_config())
+    with pytest.raises(TypeError):
+        frozen['time']['year'] = 2026
+    assert isinstance(frozen['workspace']['clients'], tuple)
+    with pytest.raises(TypeError):
+        frozen['workspace']['clients'][0]['name'] = 'Otro'
+
+def test_build_context_raises_before_connecting():
+    with pytest.raises(ConfigError) as info:
+        build_context(config=make_config(clockify={'api_key': ''}), connect=False)
+    assert info.value.errors == ["Falta 'clockify.api_key'"]
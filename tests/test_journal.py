@@ -0,0 +1,61 @@
+import json
+
+from benchmarks.standin import StandInClockifyClient
+from clockify.journal import SubmissionJournal, entry_hash
+from clockify.submission import replay_dead_letters
+
+ENTRY = {'description': 'Tarea', 'start': '2025-03-03T12:00:00Z', 'end': '2025-03-03T15:00:00Z'}
+OTHER = {'description': 'Otra', 'start': '2025-03-04T12:00:00Z', 'end': '2025-03-04T15:00:00Z'}
+
+def make_journal(tmp_path) -> SubmissionJournal:
+    return SubmissionJournal(str(tmp_path / 'journal.jsonl'), str(tmp_path / 'dead_letter.jsonl'))
+
+def make_config(tmp_path) -> dict:
+    return {'execution': {'journal_file': str(tmp_path / 'journal.jsonl'),
+                          'dead_letter_file': str(tmp_path / 'dead_letter.jsonl')}}
+
+def test_entry_hash_ignores_client_case_and_spaces():
+    assert entry_hash(' Acme ', ENTRY) == entry_hash('acme', ENTRY)
+    assert entry_hash('acme', ENTRY) != entry_hash('acme', OTHER)
+
+def test_successes_survive_a_restart(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_success('Acme', ENTRY, {'id': 'te-1'})
+    journal.record_failure('Acme', 'ws-1', OTHER, 'boom')
+
+    reloaded = make_journal(tmp_path)
+    assert reloaded.pending('Acme', [ENTRY, OTHER]) == [OTHER]
+    assert [record['entry'] for record in reloaded.load_dead_letters()] == [OTHER]
+
+def test_truncated_line_is_ignored(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_success('Acme', ENTRY, {'id': 'te-1'})
+    with open(tmp_path / 'journal.jsonl', 'a', encoding='utf-8') as f:
+        f.write('{"hash": "abc", "sta')
+
+    assert make_journal(tmp_path).is_done(entry_hash('Acme', ENTRY))
+
+def test_replay_submits_and_compacts_dead_letter(tmp_path):
+    journal = make_journal(tmp_path)
+    journal.record_failure('Acme', 'ws-1', ENTRY, 'boom')
+    journal.record_failure('Acme', 'ws-1', ENTRY, 'boom otra vez')
+    client = StandInClockifyClient([{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}])
+
+    assert replay_dead_letters(make_config(tmp_path), client)
+    assert [entry['description'] for entry in client.created] == ['Tarea']
+    assert (tmp_path / 'dead_letter.jsonl').read_text(encoding='utf-8') == ''
+
+    # Un segundo replay no tiene nada pendiente
+    assert replay_dead_letters(make_config(tmp_path), client)
+    assert len(client.created) == 1
+
+def test_replay_keeps_entries_that_fail_again(tmp_path):
+    make_journal(tmp_path).record_failure('Acme', 'ws-1', ENTRY, 'boom')
+
+    class FailingClient(StandInClockifyClient):
+        def create_time_entry(self, workspace_id, time_entry):
+            raise Exception('Clockify caído')
+
+    assert not replay_dead_letters(make_config(tmp_path), FailingClient([]))
+    lines = (tmp_path / 'dead_letter.jsonl').read_text(encoding='utf-8').splitlines()
+    assert [json.loads(line)['entry'] for line in lines] == [ENTRY]
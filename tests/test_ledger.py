@@ -0,0 +1,78 @@
+import os
+from dataclasses import replace
+
+from benchmarks.standin import StandInClockifyClient
+from clockify import clockify_api
+from clockify.csv_to_clockify import main as clockify_main
+from clockify.journal import entry_hash
+from clockify.ledger import (
+    Ledger, STATUS_ALREADY_SUBMITTED, STATUS_FAILED, STATUS_PLANNED, STATUS_SUBMITTED
+)
+from configuration.context import build_context
+
+ENTRIES = [
+    {'description': 'Tarea 1', 'start': '2025-03-03T12:00:00Z', 'end': '2025-03-03T15:00:00Z'},
+    {'description': 'Tarea 2', 'start': '2025-03-04T12:00:00Z', 'end': '2025-03-04T15:00:00Z'}
+]
+
+def test_plan_results_and_queries(tmp_path):
+    ledger = Ledger(str(tmp_path / 'ledger.db'))
+    run_id = ledger.start_run('ws-1', False, {'year': 2025, 'month': 3, 'start_day': 1, 'end_day': 31})
+    assert ledger.record_plan(run_id, 'Acme', ENTRIES) == 2
+    assert [row['status'] for row in ledger.entries_for('acme', status=STATUS_PLANNED)] == [STATUS_PLANNED] * 2
+
+    ledger.record_results(run_id, 'Acme', [
+        {'entry': ENTRIES[0], 'ok': True, 'response': {'id': 'te-1'}, 'error': None},
+        {'entry': ENTRIES[1], 'ok': False, 'response': None, 'error': 'boom'}
+    ])
+    submitted = ledger.entries_for('Acme', '2025-03-01', '2025-03-31')
+    assert [(row['description'], row['clockify_id']) for row in submitted] == [('Tarea 1', 'te-1')]
+    assert ledger.entries_for('Acme', status=STATUS_FAILED)[0]['error'] == 'boom'
+    assert ledger.submitted_hashes('ACME') == {entry_hash('Acme', ENTRIES[0])}
+    assert ledger.submitted_hashes('Acme', '2025-03-04', '2025-03-31') == set()
+    ledger.close()
+
+def test_mark_changes_status_of_one_run_only(tmp_path):
+    ledger = Ledger(str(tmp_path / 'ledger.db'))
+    first = ledger.start_run('ws-1', False)
+    second = ledger.start_run('ws-1', False)
+    ledger.record_plan(first, 'Acme', ENTRIES)
+    ledger.record_plan(second, 'Acme', ENTRIES)
+    assert ledger.mark(second, 'Acme', ENTRIES[:1], STATUS_ALREADY_SUBMITTED) == 1
+
+    statuses = [(row['run_id'], row['status']) for row in ledger.entries_for('Acme', status=None)]
+    assert statuses.count((second, STATUS_ALREADY_SUBMITTED)) == 1
+    assert statuses.count((first, STATUS_PLANNED)) == 2
+    ledger.close()
+
+def test_rerun_skips_entries_the_ledger_recorded_as_submitted(tmp_path):
+    config = {
+        'workspace': {'name': 'Benchmark', 'clients': [{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}]},
+        'time': {'year': 2025, 'month': 3, 'start_day': 3, 'end_day': 4, 'lunch_start': 12.5, 'lunch_end': 13.5},
+        'execution': {
+            'dry_run': False,
+            'overlap_policy': 'off',
+            'ledger_file': str(tmp_path / 'ledger.db'),
+            'journal_file': str(tmp_path / 'journal.jsonl'),
+            'dead_letter_file': str(tmp_path / 'dead_letter.jsonl'),
+            'metrics': {'json_file': None},
+            'logging': {'console_level': 'WARNING', 'file_name': str(tmp_path / 'log.log')},
+            'sources': []
+        },
+        'clockify': {'api_key': 'test', 'cache_file': None}
+    }
+    tasks = {'acme': [{'Cliente': 'Acme', 'Tarea': 'Tarea', 'Dia': 3}, {'Cliente': 'Acme', 'Tarea': 'Tarea', 'Dia': 4}]}
+    standin = StandInClockifyClient([{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}])
+    clockify_api.set_default_client(standin)
+    try:
+        ctx = replace(build_context(config=config, connect=False), clockify=standin)
+        assert clockify_main(tasks, ctx=ctx)
+        created = len(standin.created)
+        assert created > 0
+
+        # Sin journal, el ledger evita volver a enviar lo que Clockify ya aceptó
+        os.remove(tmp_path / 'journal.jsonl')
+        assert clockify_main(tasks, ctx=ctx)
+        assert len(standin.created) == created
+    finally:
+        clockify_api.set_default_client(None)
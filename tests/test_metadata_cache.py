@@ -0,0 +1,76 @@
+import json
+import os
+
+import pytest
+
+from benchmarks.standin_server import StandInState, start_server
+from clockify.clockify_api import ClockifyClient
+from clockify.metadata_cache import MetadataCache
+
+class CountingClient:
+    def __init__(self):
+        self.workspaces = [{'id': 'ws-1', 'name': 'Principal'}]
+        self.clients = [{'client': {'id': 'cl-1', 'name': 'Acme'}, 'projects': [{'id': 'pr-1', 'name': 'Web'}]}]
+        self.calls = {'workspaces': 0, 'clients': 0}
+
+    def get_workspaces(self):
+        self.calls['workspaces'] += 1
+        return [dict(workspace) for workspace in self.workspaces]
+
+    def get_clients(self, workspace_id):
+        self.calls['clients'] += 1
+        return [dict(client, projects=list(client['projects'])) for client in self.clients]
+
+def test_fresh_snapshot_is_reused_across_instances(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    client = CountingClient()
+    assert MetadataCache(client, path=path).get_workspace_by_name(' principal ')['id'] == 'ws-1'
+    assert MetadataCache(client, path=path).get_workspace_by_name('Principal')['id'] == 'ws-1'
+    assert client.calls['workspaces'] == 1
+
+def test_expired_snapshot_is_downloaded_again(tmp_path):
+    path = str(tmp_path / 'cache.json')
+    client = CountingClient()
+    MetadataCache(client, path=path).get_workspace_by_name('Principal')
+    MetadataCache(client, ttl=0, path=path).get_workspace_by_name('Principal')
+    assert client.calls['workspaces'] == 2
+
+def test_miss_refreshes_once_per_interval(tmp_path):
+    client = CountingClient()
+    cache = MetadataCache(client, path=None, refresh_interval=60)
+    assert cache.get_workspace_by_name('Nuevo') is None
+    assert cache.get_workspace_by_name('Nuevo') is None
+    # Carga inicial + un único refresco forzado dentro del intervalo
+    assert client.calls['workspaces'] == 2
+
+def test_missing_project_refreshes_clients(tmp_path):
+    client = CountingClient()
+    cache = MetadataCache(client, path=None)
+    assert cache.get_project_by_name('ws-1', 'Acme', 'Web')['id'] == 'pr-1'
+    client.clients[0]['projects'].append({'id': 'pr-2', 'name': 'App'})
+    assert cache.get_project_by_name('ws-1', 'Acme', 'App')['id'] == 'pr-2'
+
+def test_failed_fetch_leaves_cache_file_untouched(tmp_path):
+    path = tmp_path / 'cache.json'
+    # Snapshot vencido: la cache intenta descargar de nuevo y el servidor falla
+    path.write_text(json.dumps({'workspaces': {'fetched_at': 0, 'items': [{'id': 'ws-1', 'name': 'Test'}]}}))
+    before = path.read_bytes()
+    server = start_server(StandInState('Test', []), error_rate=1.0, seed=0)
+    client = ClockifyClient('test', max_retries=0, cache_file=None,
+                            api_url=f'{server.base_url}/api/v1', global_api_url=server.base_url)
+    try:
+        with client:
+            with pytest.raises(Exception):
+                MetadataCache(client, ttl=60, path=str(path)).get_workspace_by_name('Test')
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert path.read_bytes() == before
+    assert not os.path.exists(f'{path}.tmp')
+
+def test_error_saved_by_older_version_is_ignored(tmp_path):
+    path = tmp_path / 'cache.json'
+    path.write_text(json.dumps({'workspaces': {'fetched_at': 9e18, 'items': {'message': 'Error', 'code': 503}}}))
+    client = CountingClient()
+    assert MetadataCache(client, path=str(path)).get_workspace_by_name('Principal')['id'] == 'ws-1'
@@ -0,0 +1,59 @@
+from clockify.intervals import IntervalIndex
+from clockify.overlap import ExistingEntryIndex, build_existing_index, filter_existing, generated_interval
+
+def existing(start: str, end: str, description: str = 'Existente') -> dict:
+    return {'description': description, 'timeInterval': {'start': start, 'end': end}}
+
+def generated(start: str, end: str, description: str = 'Generada') -> dict:
+    # Horario local: create_time_entry le suma 3 horas para pasarlo a UTC
+    return {'description': description, 'start': start, 'end': end}
+
+def test_touching_edges_do_not_overlap():
+    index = IntervalIndex([(10, 20)])
+    assert not index.overlaps(0, 10)
+    assert not index.overlaps(20, 30)
+    assert index.overlaps(19, 30)
+    assert index.contains(20)
+
+def test_filter_keeps_entries_that_only_touch():
+    index = ExistingEntryIndex([existing('2025-03-03T15:00:00Z', '2025-03-03T16:00:00Z')])
+    before = generated('2025-03-03T11:00:00Z', '2025-03-03T12:00:00Z')
+    after = generated('2025-03-03T13:00:00Z', '2025-03-03T14:00:00Z')
+    one_minute_in = generated('2025-03-03T11:00:00Z', '2025-03-03T12:01:00Z')
+
+    assert filter_existing([before, after, one_minute_in], index) == [before, after]
+
+def test_entry_spanning_several_days_blocks_the_middle_day():
+    index = ExistingEntryIndex([existing('2025-03-01T20:00:00Z', '2025-03-04T02:00:00Z')])
+    assert filter_existing([generated('2025-03-03T09:00:00Z', '2025-03-03T10:00:00Z')], index) == []
+    assert len(filter_existing([generated('2025-03-04T09:00:00Z', '2025-03-04T10:00:00Z')], index)) == 1
+
+def test_duplicates_ignore_case_and_running_timers_are_skipped():
+    index = ExistingEntryIndex([
+        existing('2025-03-03T12:00:00Z', '2025-03-03T15:00:00Z', 'Tarea'),
+        {'description': 'Timer', 'timeInterval': {'start': '2025-03-03T18:00:00Z', 'end': None}}
+    ])
+    assert index.size == 1
+    assert index.is_duplicate(*generated_interval(generated('2025-03-03T09:00:00Z', '2025-03-03T12:00:00Z')),
+                              ' tarea ')
+    # El timer sin fin no bloquea nada
+    assert len(filter_existing([generated('2025-03-03T15:00:00Z', '2025-03-03T16:00:00Z')], index)) == 1
+
+def test_flag_policy_keeps_overlapping_entries():
+    index = ExistingEntryIndex([existing('2025-03-03T12:00:00Z', '2025-03-03T15:00:00Z')])
+    entry = generated('2025-03-03T10:00:00Z', '2025-03-03T11:00:00Z')
+    assert filter_existing([entry], index, 'skip') == []
+    assert filter_existing([entry], index, 'flag') == [entry]
+
+def test_existing_entries_are_requested_from_the_previous_day():
+    class RecordingClient:
+        def get_user(self):
+            return {'id': 'user-1'}
+
+        def iter_time_entries(self, workspace_id, user_id, start=None, end=None):
+            self.params = (start, end)
+            return iter([])
+
+    client = RecordingClient()
+    build_existing_index(client, 'ws-1', 2025, 3, 3, 5)
+    assert client.params == ('2025-03-02T03:00:00Z', '2025-03-06T03:00:00Z')
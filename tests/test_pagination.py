@@ -0,0 +1,39 @@
+import pytest
+
+from benchmarks.standin_server import StandInState, start_server
+from clockify.clockify_api import ClockifyClient
+
+CLIENTS = [{'name': f'Cliente {index}', 'project': f'Proyecto {index}', 'task': 'Desarrollo'}
+           for index in range(7)]
+
+@pytest.fixture
+def server():
+    # El stand-in limita las páginas a 3 items aunque se pidan más
+    server = start_server(StandInState('Test', CLIENTS), max_page_size=3)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+@pytest.mark.parametrize('prefetch', [True, False])
+def test_paginate_when_server_caps_page_size(server, prefetch):
+    client = ClockifyClient('test', page_size=10, prefetch=prefetch, cache_file=None,
+                            api_url=f'{server.base_url}/api/v1', global_api_url=server.base_url)
+    with client:
+        names = [item['client']['name'] for item in client.iter_clients('ws-1')]
+        projects = list(client.iter_projects('ws-1'))
+
+    assert names == [client['name'] for client in CLIENTS]
+    assert len(projects) == len(CLIENTS)
+
+def test_paginate_stops_on_last_page_header(monkeypatch):
+    client = ClockifyClient('test', page_size=2, prefetch=False, cache_file=None)
+    pages = {1: (['a', 'b'], False), 2: (['c'], True)}
+    requested = []
+
+    def get_page(url, params):
+        requested.append(params['page'])
+        return pages[params['page']]
+
+    monkeypatch.setattr(client, '_get_page', get_page)
+    assert list(client._paginate('http://clockify.test/items')) == ['a', 'b', 'c']
+    assert requested == [1, 2]
@@ -0,0 +1,66 @@
+import datetime
+import json
+
+import pytest
+
+from configuration.periods import (
+    ChunkProgress, config_periods, is_range_mode, period_id, range_key, split_range, task_day, with_period
+)
+
+def ids(periods):
+    return [period_id(period) for period in periods]
+
+def test_month_chunks_never_cross_a_month():
+    periods = split_range(datetime.date(2025, 1, 15), datetime.date(2025, 3, 10))
+    assert ids(periods) == ['2025-01-15/2025-01-31', '2025-02-01/2025-02-28', '2025-03-01/2025-03-10']
+
+def test_week_chunks_run_monday_to_sunday_and_split_at_month_end():
+    # 2025-03-26 es miércoles; el 31 es lunes
+    periods = split_range(datetime.date(2025, 3, 26), datetime.date(2025, 4, 8), 'week')
+    assert ids(periods) == ['2025-03-26/2025-03-30', '2025-03-31/2025-03-31',
+                            '2025-04-01/2025-04-06', '2025-04-07/2025-04-08']
+
+def test_single_day_and_unknown_chunk():
+    assert ids(split_range(datetime.date(2024, 2, 29), datetime.date(2024, 2, 29))) == ['2024-02-29/2024-02-29']
+    with pytest.raises(ValueError):
+        split_range(datetime.date(2025, 3, 1), datetime.date(2025, 3, 2), 'day')
+
+def test_classic_config_is_a_single_period():
+    config = {'time': {'year': 2025, 'month': 3, 'start_day': 3, 'end_day': 14}}
+    assert not is_range_mode(config['time'])
+    assert ids(config_periods(config)) == ['2025-03-03/2025-03-14']
+
+def test_with_period_keeps_range_mode():
+    config = {'time': {'start_date': '2025-03-01', 'end_date': '2025-04-30', 'lunch_start': 12.5}}
+    period = config_periods(config)[1]
+    time_config = with_period(config, period)['time']
+    assert is_range_mode(time_config)
+    assert (time_config['month'], time_config['start_day'], time_config['lunch_start']) == (4, 1, 12.5)
+    assert range_key(config) == '2025-03-01/2025-04-30'
+
+def test_task_day_accepts_days_and_dates():
+    march = {'year': 2025, 'month': 3}
+    assert task_day('7', march) == '7'
+    assert task_day('2025-03-07', march) == 7
+    assert task_day('2025-04-07', march) is None
+    with pytest.raises(ValueError):
+        task_day('2025-13-01', march)
+
+def test_chunk_progress_persists_per_range(tmp_path):
+    path = str(tmp_path / 'progress.json')
+    first, second = split_range(datetime.date(2025, 3, 1), datetime.date(2025, 4, 30))
+    progress = ChunkProgress(path)
+    progress.mark_done('rango-a', first)
+    progress.mark_done('rango-a', first)
+
+    reloaded = ChunkProgress(path)
+    assert reloaded.is_done('rango-a', first)
+    assert not reloaded.is_done('rango-a', second)
+    assert not reloaded.is_done('rango-b', first)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f) == {'rango-a': ['2025-03-01/2025-03-31']}
+
+def test_corrupt_progress_file_starts_over(tmp_path):
+    path = tmp_path / 'progress.json'
+    path.write_text('{"rango-a": [', encoding='utf-8')
+    assert ChunkProgress(str(path)).data == {}
@@ -0,0 +1,63 @@
+import csv
+
+import pytest
+
+import app
+import clockify.csv_to_clockify
+from configuration.context import build_context
+from sources.task_store import open_task_store
+
+SECOND_WEEK = {'year': 2025, 'month': 3, 'start_day': 10, 'end_day': 16}
+
+def make_config(tmp_path, store_name: str) -> dict:
+    source = tmp_path / 'fuente.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Cliente', 'Descripcion', 'Fecha'])
+        writer.writerow(['Acme', 'Semana 1', '2025-03-04'])
+        writer.writerow(['Acme', 'Semana 2', '2025-03-11'])
+    return {
+        'workspace': {'name': 'WS', 'clients': [{'name': 'Acme', 'project': 'Web', 'task': 'Dev'}]},
+        'time': {'start_date': '2025-03-03', 'end_date': '2025-03-16', 'chunk': 'week',
+                 'lunch_start': 12.5, 'lunch_end': 13.5},
+        'execution': {
+            'dry_run': False,
+            'task_store': str(tmp_path / store_name),
+            'chunk_progress_file': str(tmp_path / 'progress.json'),
+            'ledger_file': None,
+            'metrics': {'json_file': None},
+            'logging': {'console_level': 'WARNING', 'file_name': str(tmp_path / 'log.log')},
+            'sources': [{'type': 'csv', 'enabled': True, 'file_path': str(source), 'mapping': {
+                'client': {'type': 'column', 'value': 'Cliente'},
+                'task': {'type': 'column', 'value': 'Descripcion'},
+                'day': {'type': 'column', 'value': 'Fecha'}
+            }}]
+        },
+        'clockify': {'api_key': 'test', 'cache_file': None}
+    }
+
+@pytest.mark.parametrize('store_name', ['tareas.csv', 'tareas.db'])
+def test_resumed_chunk_is_not_duplicated_in_store(tmp_path, monkeypatch, store_name):
+    config = make_config(tmp_path, store_name)
+    submitted = []
+
+    def fail_second_week(tasks_by_client, ctx):
+        submitted.append(ctx.config['time']['start_day'])
+        return ctx.config['time']['start_day'] != 10
+
+    # Primera ejecución: el envío de la segunda semana falla después de extraerla
+    monkeypatch.setattr(clockify.csv_to_clockify, 'main', fail_second_week)
+    assert not app.run_pipeline(build_context(config=config, connect=False))
+
+    # Al reanudar, la primera semana se salta y la segunda se vuelve a extraer
+    monkeypatch.setattr(clockify.csv_to_clockify, 'main', lambda tasks_by_client, ctx: True)
+    assert app.run_pipeline(build_context(config=config, connect=False))
+
+    store = open_task_store(str(tmp_path / store_name))
+    try:
+        assert [task['Tarea'] for task in store.tasks_for_client('Acme', 10, 16, SECOND_WEEK)] == ['Semana 2']
+        assert [task['Tarea'] for task in store.tasks_for_client('Acme', 1, 31, {'year': 2025, 'month': 3})] == \
+            ['Semana 1', 'Semana 2']
+    finally:
+        store.close()
+    assert submitted == [3, 10]
@@ -0,0 +1,39 @@
+import threading
+
+from benchmarks.standin_server import StandInState, start_server
+from clockify.clockify_api import ClockifyClient
+from clockify.rate_limit import TokenBucket
+from clockify.submission import submit_time_entries
+
+CLIENTS = [{'name': 'Cliente', 'project': 'Proyecto', 'task': 'Desarrollo'}]
+
+class CountingBucket(TokenBucket):
+    def __init__(self, rate: float):
+        super().__init__(rate)
+        self.acquired = 0
+        self.count_lock = threading.Lock()
+
+    def acquire(self):
+        with self.count_lock:
+            self.acquired += 1
+        super().acquire()
+
+def test_every_http_attempt_takes_a_token():
+    # Con errores simulados hay reintentos: cada uno tiene que pasar por el limitador
+    server = start_server(StandInState('Test', CLIENTS), error_rate=0.5, seed=0)
+    bucket = CountingBucket(1000)
+    client = ClockifyClient('test', cache_file=None, backoff_base=0.001, backoff_max=0.01, max_retries=20,
+                            bucket=bucket, api_url=f'{server.base_url}/api/v1', global_api_url=server.base_url)
+    entries = [{'description': f'Tarea {index}', 'start': f'2025-03-03T{index:02d}:00:00Z',
+                'end': f'2025-03-03T{index:02d}:30:00Z'} for index in range(10)]
+    try:
+        with client:
+            workspaces = client.get_workspaces()
+            results = submit_time_entries(workspaces[0]['id'], entries, client=client, max_workers=4)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert all(result['ok'] for result in results)
+    assert server.stats['503'] > 0
+    assert bucket.acquired == sum(server.stats.values())
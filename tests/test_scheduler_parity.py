@@ -0,0 +1,57 @@
+import pytest
+
+from benchmarks.generate import make_clients, make_tasks, make_time_config
+from benchmarks.standin import StandInClockifyClient
+from clockify import csv_to_clockify
+from clockify.clockify_api import set_default_client
+from clockify.time_utils import hours_to_minutes
+
+pytest.importorskip('pandas')
+
+def schedule(engine, client, tasks, time_config):
+    return csv_to_clockify.get_scheduler(engine)(
+        entries_wo_time=tasks,
+        workspace_id='ws-bench',
+        year=time_config['year'],
+        month=time_config['month'],
+        start_day=time_config['start_day'],
+        end_day=time_config['end_day'],
+        start_time=hours_to_minutes(client['start_time']),
+        end_time=hours_to_minutes(client['end_time']),
+        lunch_start=hours_to_minutes(time_config['lunch_start']),
+        lunch_end=hours_to_minutes(time_config['lunch_end']),
+        client=client
+    )
+
+@pytest.mark.parametrize('tasks_per_day', [1, 3])
+@pytest.mark.parametrize('end_time', [18, 24])
+def test_pandas_engine_matches_python_engine(end_time, tasks_per_day):
+    clients = make_clients(3)
+    for client in clients:
+        client['end_time'] = end_time
+    # Con una tarea por día, el último bloque termina en el end_time (a medianoche con 24)
+    time_config = make_time_config(31)
+    tasks = make_tasks(clients, tasks_per_day, time_config)
+    set_default_client(StandInClockifyClient(clients))
+    try:
+        for client in clients:
+            client_tasks = [task for task in tasks if task['Cliente'] == client['name']]
+            expected = schedule('python', client, client_tasks, time_config)
+            assert expected
+            assert schedule('pandas', client, client_tasks, time_config) == expected
+    finally:
+        set_default_client(None)
+
+def test_pandas_engine_rolls_midnight_over_to_next_day():
+    client = make_clients(1)[0]
+    client.update({'start_time': 20, 'end_time': 24, 'daily_meetings': []})
+    time_config = make_time_config(31)
+    set_default_client(StandInClockifyClient([client]))
+    try:
+        entries = schedule('pandas', client, [{'Cliente': client['name'], 'Tarea': 'Cierre', 'Dia': 31}],
+                           time_config)
+    finally:
+        set_default_client(None)
+    assert [(entry['start'], entry['end']) for entry in entries] == [
+        ('2025-03-31T20:00:00Z', '2025-04-01T00:00:00Z')
+    ]
@@ -0,0 +1,48 @@
+import pytest
+
+from sources.task_records import write_tasks_csv
+from sources.task_store import open_task_store
+
+# Tramos del modo rango: la sección time conserva start_date/end_date
+RANGE = {'start_date': '2025-03-01', 'end_date': '2025-04-30', 'chunk': 'week'}
+MARCH_WEEK_1 = dict(RANGE, year=2025, month=3, start_day=1, end_day=9)
+MARCH_WEEK_2 = dict(RANGE, year=2025, month=3, start_day=10, end_day=16)
+APRIL = dict(RANGE, year=2025, month=4, start_day=1, end_day=30)
+CLASSIC = {'year': 2025, 'month': 3, 'start_day': 1, 'end_day': 31}
+
+def task(name: str, day) -> dict:
+    return {'Cliente': 'Acme', 'Tarea': name, 'Dia': day}
+
+@pytest.fixture(params=['tareas.csv', 'tareas.db'])
+def store(request, tmp_path):
+    store = open_task_store(str(tmp_path / request.param))
+    yield store
+    store.close()
+
+def test_tasks_stay_in_their_period(store):
+    # Cada tramo semanal extrae el mes completo y lo agrega al mismo store
+    march = [task('Marzo 3', 3), task('Marzo 12', 12)]
+    store.write(march, period=MARCH_WEEK_1)
+    store.write(march, append=True, period=MARCH_WEEK_2)
+    store.write([task('Abril 12', 12)], append=True, period=APRIL)
+
+    assert [t['Tarea'] for t in store.tasks_for_client('acme', 1, 31, {'year': 2025, 'month': 3})] == \
+        ['Marzo 3', 'Marzo 12']
+    assert [(t['Tarea'], t['Dia']) for t in store.tasks_for_client('Acme', 1, 30, APRIL)] == [('Abril 12', 12)]
+    assert [t['Tarea'] for t in store.tasks_for_client('Acme', 1, 9, MARCH_WEEK_1)] == ['Marzo 3']
+
+def test_csv_with_plain_days_is_valid_for_any_period(tmp_path):
+    path = str(tmp_path / 'horarios.csv')
+    write_tasks_csv([task('Uno', '3'), task('Dos', '20')], path)
+    store = open_task_store(path)
+
+    assert [(t['Tarea'], t['Dia']) for t in store.tasks_for_client('Acme', 1, 10, APRIL)] == [('Uno', 3)]
+
+def test_classic_mode_keeps_plain_day_numbers(tmp_path):
+    path = tmp_path / 'horarios.csv'
+    store = open_task_store(str(path))
+    store.write([task('Uno', 3), task('Dos', '20')], period=CLASSIC)
+
+    assert path.read_text(encoding='utf-8').splitlines() == ['Cliente,Tarea,Dia', 'Acme,Uno,3', 'Acme,Dos,20']
+    assert [(t['Tarea'], t['Dia']) for t in store.tasks_for_client('Acme', 1, 31, CLASSIC)] == \
+        [('Uno', 3), ('Dos', 20)]